@@ -18,6 +18,8 @@ class PlayerFields:
     USER: str = "user"
     DISPLAY_NAME: str = "display_name"
     AVATAR: str = "avatar"
+    RATING: str = "rating"
+    RATED_MATCHES: str = "rated_matches"
     CREATED_AT: str = "created_at"
     UPDATED_AT: str = "updated_at"
 
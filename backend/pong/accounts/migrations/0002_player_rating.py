@@ -0,0 +1,22 @@
+# Generated by Django 5.1.4 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("accounts", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="player",
+            name="rating",
+            field=models.FloatField(default=1500.0),
+        ),
+        migrations.AddField(
+            model_name="player",
+            name="rated_matches",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -5,26 +5,31 @@ from django.db.models import (
     CASCADE,
     CharField,
     DateTimeField,
+    FloatField,
     ImageField,
     Model,
     OneToOneField,
+    PositiveIntegerField,
 )
 from django.db.models.signals import post_delete
 from django.dispatch import receiver
 
-from . import identicon
+from . import identicon, rating
 
 
 class Player(Model):
     """
     Playerモデル
     Userモデルと1対1の関係を持つ
+    ratingとrated_matchesはリモート対戦の結果が確定するたびに更新する
     """
 
     # related_name: 紐づいている他のモデルから逆参照する際の名前(user.playerでPlayerを取得)
     user = OneToOneField(User, on_delete=CASCADE, related_name="player")
     display_name = CharField(max_length=255)
     avatar = ImageField(upload_to="avatars/", blank=True, null=True)
+    rating = FloatField(default=rating.INITIAL_RATING)
+    rated_matches = PositiveIntegerField(default=0)
     created_at = DateTimeField(auto_now_add=True)
     updated_at = DateTimeField(auto_now=True)
 
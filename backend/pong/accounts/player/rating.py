@@ -0,0 +1,52 @@
+from typing import Final
+
+# Eloレーティングの初期値
+INITIAL_RATING: Final[float] = 1500.0
+# レーティングの差がこの値だと、上位のプレーヤーの期待勝率が約91%になる
+SCALE: Final[float] = 400.0
+# 試合数が少ないうちはレーティングを大きく動かし、早く実力に近づける
+PROVISIONAL_MATCHES: Final[int] = 30
+PROVISIONAL_K_FACTOR: Final[float] = 40.0
+K_FACTOR: Final[float] = 20.0
+
+
+def expected_score(rating: float, opponent_rating: float) -> float:
+    """
+    ratingのプレーヤーがopponent_ratingのプレーヤーに勝つ期待値(0〜1)を返す。
+    """
+    return 1.0 / (1.0 + 10.0 ** ((opponent_rating - rating) / SCALE))
+
+
+def k_factor(rated_matches: int) -> float:
+    """
+    1試合でレーティングが動く最大幅を返す。
+    """
+    if rated_matches < PROVISIONAL_MATCHES:
+        return PROVISIONAL_K_FACTOR
+    return K_FACTOR
+
+
+def updated_ratings(
+    winner_rating: float,
+    winner_matches: int,
+    loser_rating: float,
+    loser_matches: int,
+) -> tuple[float, float]:
+    """
+    1試合の結果から、勝者と敗者の新しいレーティングを返す。
+    過去の試合は見ずに、現在のレーティングと試合数だけで計算する。
+
+    Args:
+        winner_rating (float): 勝者の現在のレーティング
+        winner_matches (int): 勝者のこれまでのレーティング対象の試合数
+        loser_rating (float): 敗者の現在のレーティング
+        loser_matches (int): 敗者のこれまでのレーティング対象の試合数
+
+    Returns:
+        tuple[float, float]: (勝者の新しいレーティング, 敗者の新しいレーティング)
+    """
+    expected = expected_score(winner_rating, loser_rating)
+    return (
+        winner_rating + k_factor(winner_matches) * (1.0 - expected),
+        loser_rating - k_factor(loser_matches) * (1.0 - expected),
+    )
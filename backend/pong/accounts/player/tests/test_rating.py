@@ -0,0 +1,41 @@
+from django.test import SimpleTestCase
+
+from .. import rating
+
+
+class RatingTestCase(SimpleTestCase):
+    def test_expected_score(self) -> None:
+        """
+        同じレーティングなら期待値が0.5で、差が大きいほど上位の期待値が1に近づくか
+        """
+        self.assertAlmostEqual(rating.expected_score(1500, 1500), 0.5)
+        self.assertAlmostEqual(
+            rating.expected_score(1900, 1500), 1 / 1.1, places=6
+        )
+        self.assertAlmostEqual(
+            rating.expected_score(1500, 1900)
+            + rating.expected_score(1900, 1500),
+            1.0,
+        )
+
+    def test_updated_ratings_move_by_k_factor(self) -> None:
+        """
+        同じレーティング同士では、勝者と敗者がK/2ずつ動くか
+        """
+        winner, loser = rating.updated_ratings(1500, 0, 1500, 0)
+        self.assertAlmostEqual(winner, 1500 + rating.PROVISIONAL_K_FACTOR / 2)
+        self.assertAlmostEqual(loser, 1500 - rating.PROVISIONAL_K_FACTOR / 2)
+
+        matches = rating.PROVISIONAL_MATCHES
+        winner, loser = rating.updated_ratings(1500, matches, 1500, matches)
+        self.assertAlmostEqual(winner, 1500 + rating.K_FACTOR / 2)
+        self.assertAlmostEqual(loser, 1500 - rating.K_FACTOR / 2)
+
+    def test_upset_moves_more_than_expected_win(self) -> None:
+        """
+        格下が勝った場合の方が、格上が勝った場合よりレーティングが大きく動くか
+        """
+        favorite, underdog = rating.updated_ratings(1800, 50, 1400, 50)
+        upset_winner, upset_loser = rating.updated_ratings(1400, 50, 1800, 50)
+        self.assertLess(favorite - 1800, upset_winner - 1400)
+        self.assertGreater(1800 - upset_loser, 1400 - underdog)
@@ -7,6 +7,7 @@ class MatchFields:
     ID: str = "id"
     ROUND_ID: str = "round_id"
     STATUS: str = "status"
+    REPLAY: str = "replay"
     CREATED_AT: str = "created_at"
     UPDATED_AT: str = "updated_at"
 
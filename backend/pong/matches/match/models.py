@@ -17,6 +17,7 @@ class Match(models.Model):
             - on_going: 進行中
             - completed: 終了
             - canceled: 中止
+        replay: 試合の乱数シードとパドルの入力ログ (ws.match.replay)。試合終了時に保存される。
         created_at : 試合が作成された日時。
         updated_at : 試合が更新された日時。
     """
@@ -34,6 +35,7 @@ class Match(models.Model):
         ],
         default=constants.MatchFields.StatusEnum.NOT_STARTED.value,
     )
+    replay = models.BinaryField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
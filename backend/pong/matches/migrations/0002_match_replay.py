@@ -0,0 +1,17 @@
+# Generated by Django 5.1.4 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("matches", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="match",
+            name="replay",
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
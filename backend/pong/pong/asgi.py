@@ -9,16 +9,25 @@ https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 
 import os
 
-from channels.routing import ProtocolTypeRouter, URLRouter  # type: ignore
+from channels.routing import (  # type: ignore
+    ChannelNameRouter,
+    ProtocolTypeRouter,
+    URLRouter,
+)
 from channels.security.websocket import (  # type: ignore
     AllowedHostsOriginValidator,
 )
 from django.core.asgi import get_asgi_application
 
+import ws.lifespan
+import ws.match.game_worker
 import ws.routing
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "pong.settings")
 
+# lifespanが呼ばれないdaphneやrunworkerでも、終了時にバッファしているスコアをDBに書き込む
+ws.lifespan.install_shutdown_drain()
+
 
 application = ProtocolTypeRouter(
     {
@@ -28,5 +37,14 @@ application = ProtocolTypeRouter(
             # TODO: JWTAuthMiddlewareを作成して使用する
             URLRouter(ws.routing.websocket_urlpatterns),
         ),
+        # サーバーの終了時にバッファしているスコアをDBに書き込む
+        "lifespan": ws.lifespan.lifespan_application,
+        # `manage.py runworker game-worker-<index>`で起動する試合専用のプロセス
+        "channel": ChannelNameRouter(
+            {
+                channel: ws.match.game_worker.GameWorkerConsumer.as_asgi()
+                for channel in ws.match.game_worker.worker_channels()
+            }
+        ),
     }
 )
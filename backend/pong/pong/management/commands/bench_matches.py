@@ -0,0 +1,75 @@
+import asyncio
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from ws.match.benchmarks import headless
+
+
+class Command(BaseCommand):
+    """
+    `python manage.py bench_matches`で実行
+    MatchManagerを画面もRedisもなしで同時にN試合動かし、1プロセスで捌ける試合数を計測するコマンド
+    - max: 待機せずに全マッチを可能な限り速く進める
+    - realtime: GameClockで実際のSIMULATION_RATEのペースで進める
+    試合数ごとにmatch ticks/s、送信したメッセージ数/s、1ティックの処理時間のパーセンタイル、
+    イベントループの遅延、1試合あたりのメモリを表示する。
+    """
+
+    help = "Benchmark headless matches at max speed and at real simulation rate pacing"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--matches",
+            type=int,
+            nargs="+",
+            default=[1, 10, 100, 500, 1000],
+            help="The numbers of concurrent matches to benchmark",
+        )
+        parser.add_argument(
+            "--ticks",
+            type=int,
+            default=600,
+            help="The number of ticks to run in max mode",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=5.0,
+            help="The number of seconds to run in realtime mode",
+        )
+        parser.add_argument(
+            "--mode",
+            choices=["max", "realtime", "both"],
+            default="both",
+            help="Which benchmark to run",
+        )
+        parser.add_argument(
+            "--protocol",
+            choices=["JSON", "BINARY"],
+            default="JSON",
+            help="The PLAY frame protocol the benchmark clients request",
+        )
+
+    def handle(self, *args: tuple, **kwargs: dict) -> None:
+        mode = kwargs["mode"]
+        protocol = kwargs["protocol"]
+        self.stdout.write(headless.BenchResult.header())
+        for num_matches in kwargs["matches"]:  # type: ignore
+            if mode in ("max", "both"):
+                result = asyncio.run(
+                    headless.run_max_speed(
+                        num_matches,
+                        kwargs["ticks"],  # type: ignore
+                        protocol,  # type: ignore
+                    )
+                )
+                self.stdout.write(result.row())
+            if mode in ("realtime", "both"):
+                result = asyncio.run(
+                    headless.run_realtime(
+                        num_matches,
+                        kwargs["duration"],  # type: ignore
+                        protocol,  # type: ignore
+                    )
+                )
+                self.stdout.write(result.row())
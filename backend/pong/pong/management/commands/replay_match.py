@@ -0,0 +1,71 @@
+from typing import Any, Optional
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+
+from matches.match.models import Match
+from ws.match import replay
+
+
+class Command(BaseCommand):
+    """
+    `python manage.py replay_match <match_id> [--tick N] [--every N]`で実行
+    DBに保存された試合のリプレイを再シミュレーションし、指定したティックの状態を表示するコマンド
+    - --tick: 表示するティック、省略すると試合終了時
+    - --every: 指定すると0ティック目からNティックごとの状態を全て表示する
+    """
+
+    help = "Re-simulate a finished match from its stored input log"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "match_id",
+            type=int,
+            help="The id of the match to replay",
+        )
+        parser.add_argument(
+            "--tick",
+            type=int,
+            default=None,
+            help="The tick to show, defaults to the end of the match",
+        )
+        parser.add_argument(
+            "--every",
+            type=int,
+            default=None,
+            help="Show every N-th tick up to --tick",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        match_id = int(options["match_id"])
+        data = (
+            Match.objects.filter(id=match_id)
+            .values_list("replay", flat=True)
+            .first()
+        )
+        if data is None:
+            raise CommandError(f"Match {match_id} has no replay")
+        try:
+            match_replay = replay.Replay.from_bytes(bytes(data))
+        except ValueError as e:
+            raise CommandError(f"Invalid replay: {e}")
+
+        self.stdout.write(
+            f"match={match_id} seed={match_replay.seed} "
+            f"ticks={match_replay.tick_count} "
+            f"inputs={len(match_replay.inputs)} bytes={len(data)}"
+        )
+        every: Optional[int] = options["every"]
+        end: Optional[int] = options["tick"]
+        if every is None:
+            core = match_replay.frame_at(
+                match_replay.tick_count if end is None else end
+            )
+            self.stdout.write(repr(core))
+            return
+        for tick, core in enumerate(match_replay.frames(end)):
+            if tick % every == 0:
+                self.stdout.write(f"{tick:>6} {core!r}")
@@ -265,6 +265,13 @@ CHANNEL_LAYERS = {
 
 ASGI_APPLICATION = "pong.asgi.application"
 
+# リモート対戦を実行する専用プロセス(game worker)の数。0ならWebSocketのプロセスで実行する。
+# 1以上の場合は`python manage.py runworker game-worker-<index>`を0からN-1まで起動する。
+GAME_WORKERS = env.int("GAME_WORKERS", 0)
+
+# トーナメントの参加人数。2のべき乗でない場合は上位シードが1回戦を不戦勝で勝ち上がる。
+TOURNAMENT_BRACKET_SIZE = env.int("TOURNAMENT_BRACKET_SIZE", 4)
+
 
 # Django CORS headers
 # https://github.com/adamchainz/django-cors-headers
@@ -2,7 +2,10 @@ import dataclasses
 from enum import Enum
 from typing import Final
 
-MAX_PARTICIPATIONS: Final[int] = 4
+from django.conf import settings
+
+# トーナメントの参加人数(ブラケットのサイズ)。2以上なら2のべき乗でなくてもよい。
+MAX_PARTICIPATIONS: Final[int] = settings.TOURNAMENT_BRACKET_SIZE
 
 
 @dataclasses.dataclass(frozen=True)
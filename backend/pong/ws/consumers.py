@@ -9,6 +9,7 @@ from .chat import handler as chat_handler
 from .login import handler as login_handler
 from .match import handler as match_handler
 from .share import constants as ws_constants
+from .share import direct_channel_layer, frame_sender
 from .share import serializers as ws_serializers
 from .tournament import handler as tournament_handler
 
@@ -17,11 +18,21 @@ logger = logging.getLogger(__name__)
 
 class MultiEventConsumer(AsyncJsonWebsocketConsumer):
     async def connect(self) -> None:
+        # PLAYステージのフレームは最新のものだけをクライアントへ送る
+        self.frame_sender = frame_sender.LatestFrameSender(
+            self._send_frame, self.channel_name
+        )
         # それぞれのイベントのハンドラを作成
         self.login_handler = login_handler.LoginHandler(
             self.channel_layer, self.channel_name
         )
-        self.match_handler = match_handler.MatchHandler(self.channel_name)
+        # ローカル対戦のフレームはRedisを経由せずにこのConsumerへ直接届ける
+        self.direct_channel_layer = direct_channel_layer.DirectChannelLayer(
+            self
+        )
+        self.match_handler = match_handler.MatchHandler(
+            self.channel_name, self.direct_channel_layer
+        )
         self.tournament_handler = tournament_handler.TournamentHandler(
             self.channel_layer,
             self.channel_name,
@@ -35,6 +46,10 @@ class MultiEventConsumer(AsyncJsonWebsocketConsumer):
         logger.debug(f"accept: {self.channel_name}")
 
     async def disconnect(self, close_code: int) -> None:
+        self.direct_channel_layer.close()
+        self.frame_sender.close()
+        if self.frame_sender.dropped_frames:
+            logger.info(f"frame stats: {self.frame_sender!r}")
         await self.login_handler.logout()
         await self.match_handler.cleanup()
         await self.tournament_handler.exit()
@@ -82,8 +97,29 @@ class MultiEventConsumer(AsyncJsonWebsocketConsumer):
 
     async def group_message(self, event: dict) -> None:
         message = event["message"]
+        await self.frame_sender.flush()
         await self.send_json(message)
 
+    async def text_frame(self, event: dict) -> None:
+        # グループ送信でエンコード済みのJSONの文字列をそのまま送信する
+        await self.frame_sender.flush()
+        await self.send(text_data=event["text"])
+
+    async def match_frame(self, event: dict) -> None:
+        # MatchManagerがエンコード済みのフレームを、送信待ちのフレームと置き換えて送信する
+        # キーフレームは後の差分フレームの基準になるので置き換えない
+        frame = event["bytes"] if "bytes" in event else event["text"]
+        self.frame_sender.offer(
+            frame, event.get("sent_at"), event.get("keyframe", False)
+        )
+
     async def websocket_send(self, event: dict) -> None:
         message = event.get("text", "")
+        await self.frame_sender.flush()
         await self.send_json(message)
+
+    async def _send_frame(self, frame: frame_sender.Frame) -> None:
+        if isinstance(frame, bytes):
+            await self.send(bytes_data=frame)
+        else:
+            await self.send(text_data=frame)
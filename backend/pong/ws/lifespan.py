@@ -0,0 +1,45 @@
+import atexit
+import os
+import signal
+import threading
+
+from .match import score_sink
+
+
+async def lifespan_application(scope: dict, receive, send) -> None:  # type: ignore
+    """
+    ASGIのlifespanプロトコルを処理するアプリケーション。
+    サーバーの終了時にScoreSinkに残っているスコアを全てDBに書き込む。
+    lifespanに対応していないサーバー(daphne)や`manage.py runworker`では呼び出されないため、
+    その場合はinstall_shutdown_drain()で登録した処理が書き込む。
+    """
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await score_sink.global_score_sink.close()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+def install_shutdown_drain() -> None:
+    """
+    プロセスの終了時にScoreSinkに残っているスコアを同期的にDBに書き込むように登録する。
+        - atexit: daphne(SIGTERMとSIGINTはTwistedが処理して正常に終了する)や、
+          Ctrl-Cで終了した場合
+        - SIGTERM: シグナルハンドラが設定されていない`manage.py runworker`の場合。
+          書き込んだ後はデフォルトの動作に戻してプロセスを終了する。
+    """
+    atexit.register(score_sink.global_score_sink.drain)
+    if (
+        threading.current_thread() is threading.main_thread()
+        and signal.getsignal(signal.SIGTERM) is signal.SIG_DFL
+    ):
+        signal.signal(signal.SIGTERM, _drain_and_terminate)
+
+
+def _drain_and_terminate(signum: int, frame: object) -> None:
+    score_sink.global_score_sink.drain()
+    signal.signal(signum, signal.SIG_DFL)
+    os.kill(os.getpid(), signum)
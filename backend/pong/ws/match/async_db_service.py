@@ -6,6 +6,7 @@ from django.db import DatabaseError, transaction
 
 import utils.result
 from accounts.player import models as player_models
+from accounts.player import rating
 from matches import constants
 from matches.match import models as match_models
 from matches.participation import models as participation_models
@@ -14,8 +15,11 @@ from matches.score import models as score_models
 logger = logging.getLogger(__name__)
 CreateMatchResult = utils.result.Result[dict, dict]
 UpdateMatchResult = utils.result.Result[dict, dict]
+UpdateMatchReplayResult = utils.result.Result[dict, dict]
 CreateParticipationResult = utils.result.Result[dict, dict]
+CreateRoundMatchesResult = utils.result.Result[dict, dict]
 CreateScoreResult = utils.result.Result[dict, dict]
+BulkCreateScoresResult = utils.result.Result[dict, dict]
 UpdateParticipationResult = utils.result.Result[dict, dict]
 
 
@@ -57,6 +61,33 @@ def update_match_status(match_id: int, status: str) -> UpdateMatchResult:
     )
 
 
+@database_sync_to_async
+def update_match_replay(
+    match_id: int, replay: bytes
+) -> UpdateMatchReplayResult:
+    """
+    試合のリプレイ(乱数シードとパドルの入力ログ)を保存する。
+    """
+    try:
+        updated = match_models.Match.objects.filter(id=match_id).update(
+            replay=replay
+        )
+    except DatabaseError as e:
+        logger.error(f"DatabaseError: {e}")
+        return UpdateMatchReplayResult.error({"DatabaseError": str(e)})
+    if updated == 0:
+        logger.error(f"DoesNotExist: Match {match_id}")
+        return UpdateMatchReplayResult.error(
+            {"DoesNotExist": f"Match {match_id} does not exist"}
+        )
+    return UpdateMatchReplayResult.ok(
+        {
+            constants.MatchFields.ID: match_id,
+            constants.MatchFields.REPLAY: len(replay),
+        }
+    )
+
+
 @database_sync_to_async
 def create_participation(
     match_id: int, user_id: int, team: str, is_win: bool = False
@@ -84,20 +115,81 @@ def create_participation(
     )
 
 
+@database_sync_to_async
+def create_round_matches(
+    round_id: int, matchups: list[tuple[int, int]]
+) -> CreateRoundMatchesResult:
+    """
+    ラウンドの全ての試合と参加レコードを1つのトランザクションでまとめて作成する。
+    試合の数によらず、プレーヤーの取得・試合の作成・参加レコードの作成の3回のクエリで済む。
+
+    Args:
+        round_id: 試合を作成するラウンドのid
+        matchups: (チーム1のuser_id, チーム2のuser_id)のリスト
+
+    Returns:
+        match_ids: matchupsと同じ順番の試合のid
+    """
+    user_ids = {user_id for matchup in matchups for user_id in matchup}
+    try:
+        with transaction.atomic():
+            player_ids = dict(
+                player_models.Player.objects.filter(
+                    user_id__in=user_ids
+                ).values_list("user_id", "id")
+            )
+            missing = user_ids - player_ids.keys()
+            if missing:
+                raise player_models.Player.DoesNotExist(
+                    f"Player matching user_id {sorted(missing)} does not exist"
+                )
+
+            matches = match_models.Match.objects.bulk_create(
+                [match_models.Match(round_id=round_id) for _ in matchups]
+            )
+            participation_models.Participation.objects.bulk_create(
+                [
+                    participation_models.Participation(
+                        match_id=match.id,
+                        player_id=player_ids[user_id],
+                        team=team.value,
+                    )
+                    for match, matchup in zip(matches, matchups)
+                    for team, user_id in zip(
+                        constants.ParticipationFields.TeamEnum, matchup
+                    )
+                ]
+            )
+    except player_models.Player.DoesNotExist as e:
+        logger.error(f"DoesNotExist: {e}")
+        return CreateRoundMatchesResult.error({"DoesNotExist": str(e)})
+    except DatabaseError as e:
+        logger.error(f"DatabaseError: {e}")
+        return CreateRoundMatchesResult.error({"DatabaseError": str(e)})
+    return CreateRoundMatchesResult.ok(
+        {"match_ids": [match.id for match in matches]}
+    )
+
+
 @database_sync_to_async
 def update_participation_is_win(
     match_id: int, user_id: int
 ) -> UpdateParticipationResult:
     """
     試合に勝利したプレーヤーのis_winカラムをtrueに更新する
+    同じトランザクションで勝者と敗者のレーティングを更新する。
+    過去の試合は読まずに、両者の現在のレーティングと試合数だけから計算する。
+    既に勝者が記録されている試合ではレーティングを更新しない。
     """
     try:
         with transaction.atomic():
-            participation = participation_models.Participation.objects.get(
+            participation = participation_models.Participation.objects.select_for_update().get(
                 match_id=match_id, player__user_id=user_id
             )
-            participation.is_win = True
-            participation.save()
+            if not participation.is_win:
+                participation.is_win = True
+                participation.save()
+                _update_ratings(participation)
     except participation_models.Participation.DoesNotExist as e:
         logger.error(f"DoesNotExist: {e}")
         return UpdateParticipationResult.error({"DoesNotExist": str(e)})
@@ -112,6 +204,47 @@ def update_participation_is_win(
     )
 
 
+def _update_ratings(
+    winner_participation: participation_models.Participation,
+) -> None:
+    """
+    勝者の参加レコードから対戦相手を探し、両者のレーティングを更新する。
+    トランザクションの中で呼ぶ。対戦相手がいない場合は何もしない。
+    """
+    loser_participation = (
+        participation_models.Participation.objects.filter(
+            match_id=winner_participation.match_id
+        )
+        .exclude(id=winner_participation.id)
+        .first()
+    )
+    if loser_participation is None:
+        return
+
+    # 同時に終わった試合とのデッドロックを避けるため、id順にロックする
+    players = {
+        player.id: player
+        for player in player_models.Player.objects.select_for_update()
+        .filter(
+            id__in=[
+                winner_participation.player_id,
+                loser_participation.player_id,
+            ]
+        )
+        .order_by("id")
+    }
+    winner = players[winner_participation.player_id]
+    loser = players[loser_participation.player_id]
+    winner.rating, loser.rating = rating.updated_ratings(
+        winner.rating, winner.rated_matches, loser.rating, loser.rated_matches
+    )
+    winner.rated_matches += 1
+    loser.rated_matches += 1
+    player_models.Player.objects.bulk_update(
+        [winner, loser], ["rating", "rated_matches"]
+    )
+
+
 @database_sync_to_async
 def create_score(
     match_id: int, user_id: int, pos_x: int, pos_y: int
@@ -144,3 +277,68 @@ def create_score(
             constants.ScoreFields.POS_Y: score.pos_y,
         }
     )
+
+
+def bulk_create_scores_sync(
+    scores: list[tuple[int, int, int, int]],
+    participation_ids: dict[tuple[int, int], int],
+) -> BulkCreateScoresResult:
+    """
+    複数のスコアを1回のbulk_createでまとめて作成する。
+    イベントループが止まった後のプロセスの終了時にも使うため、同期関数として定義する。
+
+    Args:
+        scores: (match_id, user_id, pos_x, pos_y)のリスト
+        participation_ids: 取得済みの{ (match_id, user_id): participation_id }
+            含まれない参加情報は1回のクエリでまとめて取得する。
+
+    Returns:
+        created: 作成したスコアの数
+        skipped: 参加情報が見つからず作成しなかったスコアの数
+        participation_ids: 新しく取得した参加情報のid
+    """
+    missing = {
+        (match_id, user_id)
+        for match_id, user_id, _, _ in scores
+        if (match_id, user_id) not in participation_ids
+    }
+    try:
+        with transaction.atomic():
+            new_ids: dict[tuple[int, int], int] = {}
+            if missing:
+                rows = participation_models.Participation.objects.filter(
+                    match_id__in={match_id for match_id, _ in missing},
+                    player__user_id__in={user_id for _, user_id in missing},
+                ).values_list("id", "match_id", "player__user_id")
+                new_ids = {
+                    (match_id, user_id): participation_id
+                    for participation_id, match_id, user_id in rows
+                }
+
+            score_objects = []
+            for match_id, user_id, pos_x, pos_y in scores:
+                key = (match_id, user_id)
+                participation_id = participation_ids.get(key, new_ids.get(key))
+                if participation_id is None:
+                    continue
+                score_objects.append(
+                    score_models.Score(
+                        match_participation_id=participation_id,
+                        pos_x=pos_x,
+                        pos_y=pos_y,
+                    )
+                )
+            score_models.Score.objects.bulk_create(score_objects)
+    except DatabaseError as e:
+        logger.error(f"DatabaseError: {e}")
+        return BulkCreateScoresResult.error({"DatabaseError": str(e)})
+    return BulkCreateScoresResult.ok(
+        {
+            "created": len(score_objects),
+            "skipped": len(scores) - len(score_objects),
+            "participation_ids": new_ids,
+        }
+    )
+
+
+bulk_create_scores = database_sync_to_async(bulk_create_scores_sync)
@@ -0,0 +1,254 @@
+import random
+from typing import Final, Optional, Sequence, Union
+
+import numpy as np
+import numpy.typing as npt
+
+from .pong_logic import PongCore
+
+IntArray = npt.NDArray[np.int64]
+BoolArray = npt.NDArray[np.bool_]
+
+# パドル入力の値 (1ティックあたりの移動方向)
+MOVE_UP: Final[int] = -1
+MOVE_NONE: Final[int] = 0
+MOVE_DOWN: Final[int] = 1
+
+# step()が返す得点チームの値
+SCORED_NONE: Final[int] = 0
+SCORED_ONE: Final[int] = 1
+SCORED_TWO: Final[int] = 2
+
+
+class BatchPongEngine:
+    """
+    N試合分のPongをまとめて進めるクラス。
+    ボット・負荷試験・オフラインのリプレイなど、画面を持たない試合の大量実行に使う。
+
+    ボール・パドル・速度・得点をそれぞれ長さNのNumPy配列(struct-of-arrays)で保持し、
+    PongCoreのmove_ball(swept collision), check_scoreと同じ処理を配列演算で行う。
+
+    試合ごとにrandom.Randomを持ち、得点時のボールの向きはPongCoreと同じ順番で引くので、
+    同じシードと同じ入力を与えればPongCore(rng=random.Random(seed))と完全に一致する。
+    終了した試合はそれ以降のstep()で更新されない。
+    """
+
+    HEIGHT: Final[int] = PongCore.HEIGHT
+    WIDTH: Final[int] = PongCore.WIDTH
+    PADDLE_HEIGHT: Final[int] = PongCore.PADDLE_HEIGHT
+    PADDLE_WIDTH: Final[int] = PongCore.PADDLE_WIDTH
+    PADDLE_SPEED: Final[int] = PongCore.PADDLE_SPEED
+    BALL_SIZE: Final[int] = PongCore.BALL_SIZE
+    BALL_SPEED: Final[int] = PongCore.BALL_SPEED
+    WINNING_SCORE: Final[int] = PongCore.WINNING_SCORE
+
+    def __init__(
+        self, num_matches: int, seeds: Optional[Sequence[int]] = None
+    ) -> None:
+        """
+        Args:
+            num_matches (int): 同時に進める試合数
+            seeds (Optional[Sequence[int]]): 試合ごとの乱数シード、Noneならシードなし
+        """
+        if seeds is not None and len(seeds) != num_matches:
+            raise ValueError("seeds must have the same length as num_matches")
+
+        n = num_matches
+        core = PongCore()
+        self.num_matches = n
+        self.paddle1_x: IntArray = np.full(n, core.paddle1_pos.x, np.int64)
+        self.paddle1_y: IntArray = np.full(n, core.paddle1_pos.y, np.int64)
+        self.paddle2_x: IntArray = np.full(n, core.paddle2_pos.x, np.int64)
+        self.paddle2_y: IntArray = np.full(n, core.paddle2_pos.y, np.int64)
+        self.ball_x: IntArray = np.full(n, core.ball_pos.x, np.int64)
+        self.ball_y: IntArray = np.full(n, core.ball_pos.y, np.int64)
+        self.speed_x: IntArray = np.full(n, core.ball_speed.x, np.int64)
+        self.speed_y: IntArray = np.full(n, core.ball_speed.y, np.int64)
+        self.score1: IntArray = np.zeros(n, np.int64)
+        self.score2: IntArray = np.zeros(n, np.int64)
+        self.rngs: list[random.Random] = (
+            [random.Random(seed) for seed in seeds]
+            if seeds is not None
+            else [random.Random() for _ in range(n)]
+        )
+
+    def __str__(self) -> str:
+        return (
+            f"BatchPongEngine(num_matches={self.num_matches}, "
+            f"finished={int(self.game_end().sum())})"
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"BatchPongEngine(num_matches={self.num_matches!r}, "
+            f"score1={self.score1!r}, score2={self.score2!r})"
+        )
+
+    def step(
+        self,
+        paddle1_moves: Optional[npt.ArrayLike] = None,
+        paddle2_moves: Optional[npt.ArrayLike] = None,
+    ) -> npt.NDArray[np.int8]:
+        """
+        全試合を1フレーム進める。
+        パドル入力を反映してから、PongCore.update_game_state()と同じ順番で更新する。
+
+        Args:
+            paddle1_moves: 試合ごとのパドル1の入力 (MOVE_UP | MOVE_NONE | MOVE_DOWN)
+            paddle2_moves: 試合ごとのパドル2の入力 (MOVE_UP | MOVE_NONE | MOVE_DOWN)
+
+        Returns:
+            試合ごとの得点チーム (SCORED_NONE | SCORED_ONE | SCORED_TWO)
+        """
+        active = ~self.game_end()
+        if paddle1_moves is not None:
+            self._move_paddles(self.paddle1_y, paddle1_moves, active)
+        if paddle2_moves is not None:
+            self._move_paddles(self.paddle2_y, paddle2_moves, active)
+        self.move_ball(active)
+        return self.check_score(active)
+
+    def _move_paddles(
+        self, paddle_y: IntArray, moves: npt.ArrayLike, active: BoolArray
+    ) -> None:
+        """
+        パドルを入力方向に動かし、フィールド内に収める。
+        """
+        next_y = paddle_y + np.asarray(moves, np.int64) * self.PADDLE_SPEED
+        np.clip(next_y, 0, self.HEIGHT - self.PADDLE_HEIGHT, out=next_y)
+        np.copyto(paddle_y, next_y, where=active)
+
+    def move_ball(self, active: BoolArray) -> None:
+        """
+        ボールの移動処理 (PongCore.move_ball, PongCore.check_collisions)
+        全試合について「パドルに当たった場合」と「当たらなかった場合」の両方を計算し、選択する。
+        """
+        # パドルとの衝突時刻 t = num / den (PongCore.check_collisions)
+        left = self.speed_x < 0
+        paddle_y = np.where(left, self.paddle1_y, self.paddle2_y)
+        contact_x = np.where(
+            left,
+            self.paddle1_x + self.PADDLE_WIDTH,
+            self.paddle2_x - self.BALL_SIZE,
+        )
+        num = np.where(left, self.ball_x - contact_x, contact_x - self.ball_x)
+        den = np.abs(self.speed_x)
+        impact_y, impact_speed_y = self._reflect_on_walls(
+            self.ball_y * den + self.speed_y * num, self.speed_y, den
+        )
+        hit = (
+            active
+            & (num >= 0)
+            & (num <= den)
+            & (paddle_y * den <= impact_y + self.BALL_SIZE * den)
+            & (impact_y <= (paddle_y + self.PADDLE_HEIGHT) * den)
+        )
+
+        # パドルに当たった場合: 衝突時刻から反射した向きに進む
+        hit_pos_y = (impact_y // den + self.BALL_SIZE // 2) - (
+            paddle_y + self.PADDLE_HEIGHT // 2
+        )
+        reflected_speed_y = impact_speed_y + hit_pos_y // (
+            self.PADDLE_HEIGHT // 2
+        )
+        hit_y, hit_speed_y = self._reflect_on_walls(
+            impact_y + reflected_speed_y * (den - num), reflected_speed_y, den
+        )
+
+        # 当たらなかった場合: 上下の壁だけを考えて進む
+        miss_y, miss_speed_y = self._reflect_on_walls(
+            self.ball_y + self.speed_y, self.speed_y, np.int64(1)
+        )
+
+        moved_x = self.ball_x + self.speed_x
+        np.copyto(
+            self.ball_x,
+            np.where(hit, 2 * contact_x - moved_x, moved_x),
+            where=active,
+        )
+        np.copyto(
+            self.ball_y, np.where(hit, hit_y // den, miss_y), where=active
+        )
+        np.copyto(
+            self.speed_y,
+            np.where(hit, hit_speed_y, miss_speed_y),
+            where=active,
+        )
+        np.negative(self.speed_x, out=self.speed_x, where=hit)
+
+    def _reflect_on_walls(
+        self,
+        scaled_y: IntArray,
+        speed_y: IntArray,
+        den: Union[IntArray, np.int64],
+    ) -> tuple[IntArray, IntArray]:
+        """
+        上下の壁を超えた分を折り返し、y方向の速度を反転させる。
+        (PongCore._reflect_on_walls)
+        """
+        max_y = (self.HEIGHT - self.BALL_SIZE) * den
+        low = scaled_y <= 0
+        high = ~low & (scaled_y >= max_y)
+        reflected_y = np.where(
+            low, -scaled_y, np.where(high, 2 * max_y - scaled_y, scaled_y)
+        )
+        return reflected_y, np.where(low | high, -speed_y, speed_y)
+
+    def check_score(self, active: BoolArray) -> npt.NDArray[np.int8]:
+        """
+        ボールが得点ラインを超えたか判定 (PongCore.check_score)
+        """
+        scored2 = active & (self.ball_x + self.BALL_SIZE <= 0)
+        scored1 = active & ~scored2 & (self.ball_x >= self.WIDTH)
+        self.score1 += scored1
+        self.score2 += scored2
+
+        scored = np.zeros(self.num_matches, np.int8)
+        scored[scored1] = SCORED_ONE
+        scored[scored2] = SCORED_TWO
+        # 得点は稀なので、ボールのリセットは該当する試合だけ個別に行う
+        for i in np.flatnonzero(scored):
+            self.reset_ball(int(i))
+        return scored
+
+    def reset_ball(self, index: int) -> None:
+        """
+        指定した試合のボールを開始位置に動かす (PongCore.reset_ball)
+        """
+        self.ball_x[index] = self.WIDTH // 2 - self.BALL_SIZE // 2
+        self.ball_y[index] = self.HEIGHT // 2 - self.BALL_SIZE // 2
+
+        # PongCoreと同じ順番で乱数を引く
+        rng = self.rngs[index]
+        self.speed_x[index] = self.BALL_SPEED * rng.choice([-1, 1])
+        self.speed_y[index] = self.BALL_SPEED * rng.choice([-1, 1])
+
+    def game_end(self) -> BoolArray:
+        """
+        試合ごとに終了したかを返す。
+        """
+        return (self.score1 >= self.WINNING_SCORE) | (
+            self.score2 >= self.WINNING_SCORE
+        )
+
+    def snapshot(self, index: int) -> dict:
+        """
+        指定した試合の状態をPongCoreと比較できる形で返す。
+        """
+        return {
+            "paddle1": (
+                int(self.paddle1_x[index]),
+                int(self.paddle1_y[index]),
+            ),
+            "paddle2": (
+                int(self.paddle2_x[index]),
+                int(self.paddle2_y[index]),
+            ),
+            "ball": (int(self.ball_x[index]), int(self.ball_y[index])),
+            "ball_speed": (
+                int(self.speed_x[index]),
+                int(self.speed_y[index]),
+            ),
+            "score1": int(self.score1[index]),
+            "score2": int(self.score2[index]),
+        }
@@ -0,0 +1,72 @@
+"""
+PongLogicの1ティックあたりのコストを計測するマイクロベンチマーク
+
+`python -m ws.match.benchmarks.bench_pong_logic [--ticks N]`で実行
+
+- async: 非同期の互換クラス(PongLogic)を通して1ティック進める
+- sync : 同期のPongCoreを直接呼び出して1ティック進める
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Final
+
+from ws.match.constants import Team
+from ws.match.pong_logic import PongCore, PongLogic
+
+DEFAULT_TICKS: Final[int] = 200_000
+SEED: Final[int] = 42
+
+
+async def _run_async(ticks: int) -> float:
+    """
+    PongLogicを使ってticksフレーム進め、かかった時間(秒)を返す。
+    """
+    logic = PongLogic()
+    start = time.perf_counter()
+    for i in range(ticks):
+        await logic.move_paddle_up(Team.ONE.value)
+        await logic.move_paddle_down(Team.TWO.value)
+        await logic.update_game_state()
+        if await logic.game_end():
+            logic = PongLogic()
+    return time.perf_counter() - start
+
+
+def _run_sync(ticks: int) -> float:
+    """
+    PongCoreを使ってticksフレーム進め、かかった時間(秒)を返す。
+    """
+    core = PongCore()
+    start = time.perf_counter()
+    for i in range(ticks):
+        core.move_paddle_up(Team.ONE.value)
+        core.move_paddle_down(Team.TWO.value)
+        core.update_game_state()
+        if core.game_end():
+            core = PongCore()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ticks", type=int, default=DEFAULT_TICKS)
+    args = parser.parse_args()
+
+    random.seed(SEED)
+    async_elapsed = asyncio.run(_run_async(args.ticks))
+    random.seed(SEED)
+    sync_elapsed = _run_sync(args.ticks)
+
+    for name, elapsed in (("async", async_elapsed), ("sync", sync_elapsed)):
+        print(
+            f"{name:>5}: {elapsed / args.ticks * 1e9:8.1f} ns/tick "
+            f"({args.ticks / elapsed:,.0f} ticks/s)"
+        )
+    print(f"speedup: {async_elapsed / sync_elapsed:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""
+MatchManagerとPongCoreを画面もRedisもなしで動かすベンチマーク用のヘルパー
+
+- NullChannelLayer: 送信されたメッセージを数えるだけのチャネルレイヤー
+- スクリプト入力: ボールを追いかけるボットがパドルを操作する
+- run_max_speed(): 待機せずに全マッチを可能な限り速く進める
+- run_realtime(): GameClockで実際のSIMULATION_RATEのペースで進める
+
+`python manage.py bench_matches`から実行する。
+"""
+
+import asyncio
+import dataclasses
+import time
+import tracemalloc
+from typing import Final
+
+from ws.share import channel_handler, player_data
+
+from .. import constants as match_constants
+from .. import game_clock, match_manager
+from ..pong_logic import PongCore
+
+# ボットが狙う位置をマッチごとにずらす幅。大きいほど失点しやすい。
+BOT_OFFSET_RANGE: Final[int] = PongCore.PADDLE_HEIGHT
+LOOP_LAG_INTERVAL: Final[float] = 0.01
+
+
+class NullChannelLayer:
+    """
+    何も送信せず、送信回数だけを数えるチャネルレイヤー
+    """
+
+    def __init__(self) -> None:
+        self.sent_messages: int = 0
+
+    async def send(self, channel: str, message: dict) -> None:
+        self.sent_messages += 1
+
+    async def group_send(self, group: str, message: dict) -> None:
+        self.sent_messages += 1
+
+    async def group_add(self, group: str, channel: str) -> None:
+        pass
+
+    async def group_discard(self, group: str, channel: str) -> None:
+        pass
+
+
+@dataclasses.dataclass
+class BenchResult:
+    mode: str
+    num_matches: int
+    match_ticks: int
+    sent_messages: int
+    elapsed: float
+    tick_latencies: list[float]
+    loop_lags: list[float]
+    memory_per_match: float
+
+    @property
+    def ticks_per_second(self) -> float:
+        return self.match_ticks / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def messages_per_second(self) -> float:
+        return self.sent_messages / self.elapsed if self.elapsed > 0 else 0.0
+
+    def row(self) -> str:
+        """
+        結果を表の1行として返す。
+        """
+        return (
+            f"{self.mode:>8} {self.num_matches:>7} "
+            f"{self.ticks_per_second:>14,.0f} "
+            f"{self.messages_per_second:>10,.0f} "
+            f"{_percentile(self.tick_latencies, 50) * 1000:>8.3f} "
+            f"{_percentile(self.tick_latencies, 95) * 1000:>8.3f} "
+            f"{_percentile(self.tick_latencies, 99) * 1000:>8.3f} "
+            f"{_percentile(self.loop_lags, 99) * 1000:>10.3f} "
+            f"{max(self.loop_lags, default=0.0) * 1000:>10.3f} "
+            f"{self.memory_per_match / 1024:>10.2f}"
+        )
+
+    @staticmethod
+    def header() -> str:
+        return (
+            f"{'mode':>8} {'matches':>7} {'match ticks/s':>14} {'msgs/s':>10} "
+            f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+            f"{'lag p99 ms':>10} {'lag max ms':>10} {'KiB/match':>10}"
+        )
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    """
+    最近傍法でパーセンタイルを計算する。
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(len(ordered) * percent / 100))
+    return ordered[index]
+
+
+def _create_managers(
+    num_matches: int,
+    layer: NullChannelLayer,
+    protocol: str = match_constants.Protocol.JSON.value,
+) -> list[match_manager.MatchManager]:
+    """
+    NullChannelLayerに送信するローカル対戦のMatchManagerを作成する。
+    INITでprotocolを選んだ状態にする。
+    """
+    managers = []
+    for i in range(num_matches):
+        player = player_data.PlayerData(
+            channel_name=f"bench.{i}", user_id=None, participation_name=None
+        )
+        manager = match_manager.MatchManager(
+            None, player, None, match_constants.Mode.LOCAL.value
+        )
+        manager.channel_handler = channel_handler.ChannelHandler(layer, None)
+        manager.protocols[player.channel_name] = protocol
+        managers.append(manager)
+    return managers
+
+
+async def _apply_scripted_input(
+    manager: match_manager.MatchManager, offset: int
+) -> None:
+    """
+    ボールの位置(+offset)を追いかけるように両チームのパドルを動かす。
+    """
+    core = manager.pong_logic
+    target = core.ball_pos.y + core.BALL_SIZE // 2 + offset
+    for team, paddle_pos in (
+        (match_constants.Team.ONE.value, core.paddle1_pos),
+        (match_constants.Team.TWO.value, core.paddle2_pos),
+    ):
+        center = paddle_pos.y + core.PADDLE_HEIGHT // 2
+        if center < target - core.PADDLE_SPEED:
+            await manager.paddle_down(team)
+        elif center > target + core.PADDLE_SPEED:
+            await manager.paddle_up(team)
+
+
+def _pending_sends(
+    managers: list[match_manager.MatchManager],
+) -> list[asyncio.Task]:
+    """
+    MatchManagerがバックグラウンドで実行している送信のタスクを返す。
+    """
+    return [
+        task
+        for manager in managers
+        for task in (manager.play_send_task, manager.spectator_send_task)
+        if task is not None and not task.done()
+    ]
+
+
+def _bot_offset(index: int) -> int:
+    return index % BOT_OFFSET_RANGE - BOT_OFFSET_RANGE // 2
+
+
+async def _measure_loop_lag(stop: asyncio.Event, lags: list[float]) -> None:
+    """
+    一定間隔でsleepし、予定より遅れて再開した時間をイベントループの遅延として記録する。
+    """
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+        lags.append(max(0.0, loop.time() - start - LOOP_LAG_INTERVAL))
+
+
+def measure_memory_per_match(num_matches: int) -> float:
+    """
+    MatchManagerを1つ作成するのに必要なメモリ(バイト)を計測する。
+    """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        managers = _create_managers(num_matches, NullChannelLayer())
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del managers
+    return (after - before) / num_matches
+
+
+async def run_max_speed(
+    num_matches: int,
+    ticks: int,
+    protocol: str = match_constants.Protocol.JSON.value,
+) -> BenchResult:
+    """
+    待機せずに全マッチをticksフレーム進める。
+    1フレームごとにイベントループに制御を返すので、その間の遅延も計測する。
+    終了したマッチは新しいPongCoreで続行する。
+    """
+    layer = NullChannelLayer()
+    managers = _create_managers(num_matches, layer, protocol)
+    latencies: list[float] = []
+    lags: list[float] = []
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(_measure_loop_lag(stop, lags))
+
+    start = time.perf_counter()
+    for _ in range(ticks):
+        tick_start = time.perf_counter()
+        for i, manager in enumerate(managers):
+            await _apply_scripted_input(manager, _bot_offset(i))
+            manager._on_tick(1)
+            if manager.game_finished.is_set():
+                manager.pong_logic = PongCore()
+                manager.game_finished.clear()
+        latencies.append(time.perf_counter() - tick_start)
+        await asyncio.sleep(0)
+    # 送信中のフレームも数えるため、バックグラウンドの送信が終わるのを待つ
+    await asyncio.gather(*_pending_sends(managers))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await lag_task
+    return BenchResult(
+        mode="max",
+        num_matches=num_matches,
+        match_ticks=num_matches * ticks,
+        sent_messages=layer.sent_messages,
+        elapsed=elapsed,
+        tick_latencies=latencies,
+        loop_lags=lags,
+        memory_per_match=measure_memory_per_match(num_matches),
+    )
+
+
+async def _send_scripted_inputs(
+    managers: list[match_manager.MatchManager], stop: asyncio.Event
+) -> None:
+    """
+    クライアントからの入力を模して、ティックごとに全マッチにスクリプト入力を送る。
+    """
+    while not stop.is_set():
+        for i, manager in enumerate(managers):
+            await _apply_scripted_input(manager, _bot_offset(i))
+        await asyncio.sleep(game_clock.GameClock.TICK_INTERVAL)
+
+
+async def run_realtime(
+    num_matches: int,
+    duration: float,
+    protocol: str = match_constants.Protocol.JSON.value,
+) -> BenchResult:
+    """
+    実際の試合と同じようにREADYからGameClockでマッチを進め、duration秒間計測する。
+    """
+    clock = game_clock.global_game_clock
+    layer = NullChannelLayer()
+    managers = _create_managers(num_matches, layer, protocol)
+    lags: list[float] = []
+    stop = asyncio.Event()
+
+    run_tasks = [asyncio.create_task(manager.run()) for manager in managers]
+    for manager in managers:
+        await manager.handle_ready_action(manager.player1)
+
+    clock.recent_tick_durations.clear()
+    start_messages = layer.sent_messages
+    start_ticks = sum(manager.tick for manager in managers)
+    start = time.perf_counter()
+    lag_task = asyncio.create_task(_measure_loop_lag(stop, lags))
+    input_task = asyncio.create_task(_send_scripted_inputs(managers, stop))
+    await asyncio.sleep(duration)
+    elapsed = time.perf_counter() - start
+    match_ticks = sum(manager.tick for manager in managers) - start_ticks
+    sent_messages = layer.sent_messages - start_messages
+    latencies = list(clock.recent_tick_durations)
+
+    stop.set()
+    await asyncio.gather(lag_task, input_task)
+    for manager in managers:
+        await manager.player_exited(manager.player1)
+    await asyncio.gather(*run_tasks, return_exceptions=True)
+
+    return BenchResult(
+        mode="realtime",
+        num_matches=num_matches,
+        match_ticks=match_ticks,
+        sent_messages=sent_messages,
+        elapsed=elapsed,
+        tick_latencies=latencies,
+        loop_lags=lags,
+        memory_per_match=measure_memory_per_match(num_matches),
+    )
@@ -0,0 +1,79 @@
+import struct
+from typing import Final
+
+from .frame_encoder import KEYFRAME_KEY, SEQ_KEY, TICK_KEY
+from .pong_logic import PongCore
+
+# フレームの種類 (先頭1バイト)
+PLAY_FRAME_TYPE: Final[int] = 1
+
+# PLAYフレームのレイアウト (リトルエンディアン、27バイト)
+#   uint8  フレームの種類
+#   uint32 フレーム番号
+#   uint32 シミュレーションのティック番号
+#   int16  paddle1.x, paddle1.y, paddle2.x, paddle2.y, ball.x, ball.y
+#   int16  ball_speed.x, ball_speed.y
+#   uint8  score1, score2
+PLAY_FRAME: Final[struct.Struct] = struct.Struct("<BIIhhhhhhhhBB")
+
+
+def pack_play_frame(seq: int, tick: int, core: PongCore) -> bytes:
+    """
+    試合状態を固定レイアウトのバイナリフレームに変換する。
+
+    Args:
+        seq (int): フレーム番号
+        tick (int): シミュレーションのティック番号
+        core (PongCore): 送信する試合状態
+
+    Returns:
+        bytes: WebSocketのバイナリメッセージとしてそのまま送れるフレーム
+    """
+    return PLAY_FRAME.pack(
+        PLAY_FRAME_TYPE,
+        seq,
+        tick,
+        core.paddle1_pos.x,
+        core.paddle1_pos.y,
+        core.paddle2_pos.x,
+        core.paddle2_pos.y,
+        core.ball_pos.x,
+        core.ball_pos.y,
+        core.ball_speed.x,
+        core.ball_speed.y,
+        core.score1,
+        core.score2,
+    )
+
+
+def unpack_play_frame(frame: bytes) -> dict:
+    """
+    バイナリフレームをJSONのPLAYステージのデータと同じ形に戻す。
+    バイナリフレームは常に全ての状態を含むのでkeyframeはTrueになる。
+    """
+    (
+        _,
+        seq,
+        tick,
+        paddle1_x,
+        paddle1_y,
+        paddle2_x,
+        paddle2_y,
+        ball_x,
+        ball_y,
+        ball_speed_x,
+        ball_speed_y,
+        score1,
+        score2,
+    ) = PLAY_FRAME.unpack(frame)
+    return {
+        SEQ_KEY: seq,
+        KEYFRAME_KEY: True,
+        TICK_KEY: tick,
+        "paddle1": {"x": paddle1_x, "y": paddle1_y},
+        "paddle2": {"x": paddle2_x, "y": paddle2_y},
+        "ball": {"x": ball_x, "y": ball_y},
+        "ball_speed": {"x": ball_speed_x, "y": ball_speed_y},
+        "score1": score1,
+        "score2": score2,
+    }
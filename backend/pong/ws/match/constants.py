@@ -10,6 +10,8 @@ class Stage(ws_constants.BaseEnum):
     READY = "READY"
     PLAY = "PLAY"
     END = "END"
+    # 試合に参加せずに観戦する
+    SPECTATE = "SPECTATE"
 
 
 class Mode(ws_constants.BaseEnum):
@@ -26,3 +28,48 @@ class Team(ws_constants.BaseEnum):
 class Move(ws_constants.BaseEnum):
     UP = "UP"
     DOWN = "DOWN"
+
+
+# 物理演算を進める頻度(Hz)。GameClockのティックレートになる。
+# PongCoreの速度は1ティックあたりの移動量なので、変更すると試合の速さも変わる。
+SIMULATION_RATE: Final[int] = 60
+
+# PLAYステージのフレームを送信する頻度(Hz)。モードごとに設定する。
+# SIMULATION_RATEを割り切れない値の場合は最も近い間隔に丸める。
+BROADCAST_RATES: Final[dict[str, int]] = {
+    Mode.LOCAL.value: 30,
+    Mode.REMOTE.value: 30,
+}
+
+
+# 観戦者にフレームを送信する頻度(Hz)。プレーヤーへの送信とは別に間引いて送る。
+SPECTATOR_BROADCAST_RATE: Final[int] = 15
+
+# 全員のREADYを待つ時間(秒)。過ぎたらREADYを送っていないプレーヤーの負けにする。
+READY_TIMEOUT: Final[float] = 60.0
+
+# 試合中にパドルの入力がない時間(秒)。過ぎたら入力のないプレーヤーの負けにする。
+IDLE_TIMEOUT: Final[float] = 120.0
+
+# game workerが試合の開始(match.started)を返すまで待つ時間(秒)。
+# 過ぎたらworkerが動いていないか、match.startが期限切れになったとみなして試合を中止する。
+WORKER_START_TIMEOUT: Final[float] = 10.0
+
+# 終了したMatchManagerをMatchManagerRegistryから削除するまでの時間(秒)。
+# 終了直後に届くENDなどのメッセージを受け付けるために少しだけ残す。
+REAP_GRACE: Final[float] = 5.0
+
+# MatchManagerRegistryが登録されたMatchManagerを確認する間隔(秒)
+SWEEP_INTERVAL: Final[float] = 30.0
+
+# run()が実行されないまま操作がない時間(秒)。過ぎたMatchManagerはリークとして削除する。
+LEAK_TIMEOUT: Final[float] = 2 * READY_TIMEOUT
+
+
+class Protocol(ws_constants.BaseEnum):
+    """
+    PLAYステージの試合状態を受け取る形式。INITステージでクライアントが選択する。
+    """
+
+    JSON = "JSON"
+    BINARY = "BINARY"
@@ -0,0 +1,87 @@
+from typing import Final, Optional
+
+SEQ_KEY: Final[str] = "seq"
+KEYFRAME_KEY: Final[str] = "keyframe"
+TICK_KEY: Final[str] = "tick"
+
+
+class DeltaFrameEncoder:
+    """
+    PLAYステージで毎フレーム送る試合状態を差分に変換するクラス。
+
+    keyframe_intervalフレームごとに全ての状態(キーフレーム)を送り、
+    それ以外のフレームでは直前のキーフレームから変化したフィールドだけを送る。
+    差分は直前のフレームではなくキーフレームに対して取るので、
+    途中のフレームがChannelLayerで失われてもクライアントの状態は壊れない。
+
+    全てのフレームに連番(seq)とキーフレームかどうか(keyframe)を付与する。
+    クライアントは受け取ったキーフレームを保持し、差分を上書きして状態を復元する。
+    """
+
+    KEYFRAME_INTERVAL: Final[int] = 60
+
+    def __init__(
+        self, keyframe_interval: int = KEYFRAME_INTERVAL, delta: bool = True
+    ) -> None:
+        """
+        Args:
+            keyframe_interval (int): キーフレームを送る間隔(フレーム数)
+            delta (bool): Falseなら常に全ての状態を送る
+        """
+        self.keyframe_interval = keyframe_interval
+        self.delta = delta
+        self.seq: int = 0
+        self.keyframe: Optional[dict] = None
+        self.force_keyframe: bool = False
+
+    def __str__(self) -> str:
+        return f"DeltaFrameEncoder(seq={self.seq}, delta={self.delta})"
+
+    def __repr__(self) -> str:
+        return (
+            f"DeltaFrameEncoder(keyframe_interval={self.keyframe_interval!r}, "
+            f"delta={self.delta!r}, seq={self.seq!r})"
+        )
+
+    def request_keyframe(self) -> None:
+        """
+        次のフレームを必ずキーフレームにする。
+        途中からクライアントが参加した場合などに使う。
+        """
+        self.force_keyframe = True
+
+    def encode(self, state: dict) -> dict:
+        """
+        試合状態をフレームに変換する。
+
+        Args:
+            state (dict): 全ての試合状態
+
+        Returns:
+            dict: キーフレームなら全ての状態、それ以外は変化したフィールドのみ。
+                どちらにもseqとkeyframeが含まれる。
+        """
+        seq = self.seq
+        self.seq += 1
+
+        is_keyframe = (
+            not self.delta
+            or self.keyframe is None
+            or self.force_keyframe
+            or seq % self.keyframe_interval == 0
+        )
+        if is_keyframe:
+            self.keyframe = state
+            self.force_keyframe = False
+            frame = dict(state)
+        else:
+            keyframe = self.keyframe or {}
+            frame = {
+                key: value
+                for key, value in state.items()
+                if keyframe.get(key) != value
+            }
+
+        frame[SEQ_KEY] = seq
+        frame[KEYFRAME_KEY] = is_keyframe
+        return frame
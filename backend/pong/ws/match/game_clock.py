@@ -0,0 +1,154 @@
+import asyncio
+import collections
+import logging
+from typing import Callable, Final, Optional
+
+from . import constants as match_constants
+
+logger = logging.getLogger(__name__)
+
+# 1回の呼び出しで進めるフレーム数を受け取るコールバック
+# クロックを止めないように同期的に処理し、送信などのI/Oは各自のタスクで行う。
+TickCallback = Callable[[int], None]
+
+
+class GameClock:
+    """
+    プロセス内で実行中の全マッチを1つの固定タイムステップで進めるクラス。
+
+    MatchManagerごとにsleepするタイマーを持つ代わりに、このクラスが1つのループで
+    登録された全てのコールバックを同じティックで呼び出す。
+
+    - ドリフト補正: 次のティック時刻は開始時刻からの絶対時刻で管理し、sleepの誤差を蓄積させない。
+    - キャッチアップ: 処理が遅れた場合は遅れたフレーム数をまとめてコールバックに渡す。
+      ただしMAX_CATCH_UP_TICKSを超えた分は破棄し、時刻を現在に合わせ直す。
+    - オーバーラン: 1ティックの処理時間がTICK_INTERVALを超えた回数と最大値を記録する。
+      コールバックは同期的に呼び出すので、処理時間にはネットワークの送信時間を含まない。
+
+    コールバックは登録されている間のみループが動き、全て解除されるとループは終了する。
+    """
+
+    TICK_INTERVAL: Final[float] = 1 / match_constants.SIMULATION_RATE
+    MAX_CATCH_UP_TICKS: Final[int] = 5
+    # パーセンタイル計算用に保持する直近のティック処理時間の数
+    RECENT_TICKS: Final[int] = 600
+
+    def __init__(self, tick_interval: float = TICK_INTERVAL) -> None:
+        self.tick_interval = tick_interval
+        self.subscribers: dict[int, TickCallback] = {}
+        self.task: Optional[asyncio.Task] = None
+
+        # 計測値
+        self.tick_count: int = 0
+        self.skipped_ticks: int = 0
+        self.overrun_count: int = 0
+        self.last_tick_duration: float = 0.0
+        self.max_overrun: float = 0.0
+        self.recent_tick_durations: collections.deque[float] = (
+            collections.deque(maxlen=self.RECENT_TICKS)
+        )
+
+    def __str__(self) -> str:
+        return (
+            f"GameClock(tick_interval={self.tick_interval}, "
+            f"subscribers={len(self.subscribers)})"
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"GameClock(tick_interval={self.tick_interval!r}, "
+            f"subscribers={len(self.subscribers)!r}, stats={self.stats()!r})"
+        )
+
+    def register(self, key: int, callback: TickCallback) -> None:
+        """
+        ティックごとに呼び出すコールバックを登録し、必要であればループを開始する。
+        同じkeyで登録済みの場合は上書きする。
+
+        Args:
+            key (int): 登録を識別するキー(MatchManagerのid()など)
+            callback (TickCallback): 進めるフレーム数を受け取るコールバック
+        """
+        self.subscribers[key] = callback
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+
+    def unregister(self, key: int) -> None:
+        """
+        コールバックの登録を解除する。存在しない場合は何もしない。
+        """
+        self.subscribers.pop(key, None)
+
+    def stats(self) -> dict:
+        """
+        ティックの計測値を返す。
+        """
+        return {
+            "subscribers": len(self.subscribers),
+            "tick_count": self.tick_count,
+            "skipped_ticks": self.skipped_ticks,
+            "overrun_count": self.overrun_count,
+            "last_tick_duration": self.last_tick_duration,
+            "max_overrun": self.max_overrun,
+        }
+
+    async def _run(self) -> None:
+        """
+        固定タイムステップのメインループ。
+        登録されたコールバックがなくなったら終了する。
+        """
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time() + self.tick_interval
+        while self.subscribers:
+            now = loop.time()
+            if now < next_tick:
+                await asyncio.sleep(next_tick - now)
+                continue
+
+            # 遅れたフレーム数を計算し、上限を超えた分は破棄する
+            behind = int((now - next_tick) // self.tick_interval) + 1
+            steps = min(behind, self.MAX_CATCH_UP_TICKS)
+            if behind > steps:
+                self.skipped_ticks += behind - steps
+                next_tick = now + self.tick_interval
+                logger.warning(
+                    f"Skipped {behind - steps} ticks "
+                    f"({len(self.subscribers)} subscribers)"
+                )
+            else:
+                next_tick += steps * self.tick_interval
+
+            start = loop.time()
+            self._tick(steps)
+            self._record_tick_duration(loop.time() - start)
+
+    def _tick(self, steps: int) -> None:
+        """
+        登録された全てのコールバックを順に呼び出す。
+        1つのコールバックの例外が他のマッチに影響しないようにする。
+        """
+        self.tick_count += steps
+        for callback in list(self.subscribers.values()):
+            try:
+                callback(steps)
+            except Exception as e:
+                logger.error(f"Error in tick callback: {e}")
+
+    def _record_tick_duration(self, duration: float) -> None:
+        """
+        1ティックの処理時間を記録し、オーバーランした回数と最大値を更新する。
+        """
+        self.last_tick_duration = duration
+        self.recent_tick_durations.append(duration)
+        overrun = duration - self.tick_interval
+        if overrun > 0:
+            self.overrun_count += 1
+            self.max_overrun = max(self.max_overrun, overrun)
+            logger.debug(
+                f"Tick overrun: {overrun * 1000:.2f}ms "
+                f"({len(self.subscribers)} subscribers)"
+            )
+
+
+# === グローバルな GameClock インスタンス ===
+global_game_clock = GameClock()
@@ -0,0 +1,416 @@
+import asyncio
+import bisect
+import dataclasses
+import hashlib
+import logging
+from typing import Any, Coroutine, Final, Optional, Union
+
+from channels.consumer import AsyncConsumer  # type: ignore
+from channels.layers import (  # type: ignore
+    BaseChannelLayer,
+    get_channel_layer,
+)
+from django.conf import settings
+
+from matches import constants as match_db_constants
+
+from ..share import player_data
+from . import async_db_service as match_service
+from . import constants as match_constants
+from . import manager_registry, match_manager
+
+logger = logging.getLogger(__name__)
+
+# 試合を実行する専用プロセス(game worker)が受信するチャネル名の接頭辞
+# f"{WORKER_CHANNEL_PREFIX}-{index}"のチャネルを`manage.py runworker`で起動する。
+WORKER_CHANNEL_PREFIX: Final[str] = "game-worker"
+
+
+def worker_channels(num_workers: Optional[int] = None) -> list[str]:
+    """
+    game workerのチャネル名を全て返す。Noneならsettings.GAME_WORKERSの数。
+    """
+    if num_workers is None:
+        num_workers = settings.GAME_WORKERS
+    return [f"{WORKER_CHANNEL_PREFIX}-{index}" for index in range(num_workers)]
+
+
+def is_enabled() -> bool:
+    """
+    リモート対戦をgame workerで実行するか
+    """
+    return settings.GAME_WORKERS > 0
+
+
+class HashRing:
+    """
+    match_idを担当するgame workerを決めるコンシステントハッシュ。
+    ノードごとにVIRTUAL_NODES個の点をリングに置き、キーのハッシュ値の次の点のノードを返す。
+    ノードの数が変わっても、担当が変わるキーはおよそ1/ノード数だけになる。
+    """
+
+    VIRTUAL_NODES: Final[int] = 64
+
+    def __init__(
+        self, nodes: list[str], virtual_nodes: int = VIRTUAL_NODES
+    ) -> None:
+        if not nodes:
+            raise ValueError("HashRing needs at least one node")
+        points = sorted(
+            (_hash(f"{node}#{index}"), node)
+            for node in nodes
+            for index in range(virtual_nodes)
+        )
+        self.keys = [point for point, _ in points]
+        self.nodes = [node for _, node in points]
+
+    def __repr__(self) -> str:
+        return f"HashRing(nodes={sorted(set(self.nodes))!r})"
+
+    def get(self, key: Union[int, str]) -> str:
+        """
+        キーを担当するノードを返す。
+        """
+        index = bisect.bisect(self.keys, _hash(str(key))) % len(self.keys)
+        return self.nodes[index]
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], "big")
+
+
+_hash_rings: dict[int, HashRing] = {}  # { ワーカー数: HashRing }
+
+
+def worker_channel_for(match_id: int) -> str:
+    """
+    試合を担当するgame workerのチャネル名を返す。
+    どのプロセスから呼んでも同じ結果になる。
+    """
+    num_workers = settings.GAME_WORKERS
+    if num_workers not in _hash_rings:
+        _hash_rings[num_workers] = HashRing(worker_channels(num_workers))
+    return _hash_rings[num_workers].get(match_id)
+
+
+def _player_to_dict(
+    player: Optional[player_data.PlayerData],
+) -> Optional[dict]:
+    return dataclasses.asdict(player) if player is not None else None
+
+
+def _player_from_dict(
+    data: Optional[dict],
+) -> Optional[player_data.PlayerData]:
+    return player_data.PlayerData(**data) if data is not None else None
+
+
+class GameWorkerConsumer(AsyncConsumer):
+    """
+    game workerのプロセスで試合を実行するConsumer。
+
+    `manage.py runworker game-worker-<index>`で起動し、担当する試合のMatchManagerを
+    このプロセスのMatchManagerRegistryに登録する。
+    フレームはMatchManagerがChannelLayer(Redis)のグループに送るので、
+    WebSocketのプロセスと同じようにクライアントに届く。
+
+    受け取るメッセージ:
+        - match.start: MatchManagerを作成して試合を開始する。
+          開始したらmatch.startedを、終了したら結果をreply_channelに返す。
+        - match.init / match.ready / match.input / match.exit: Consumerからの入力
+        - match.spectate / match.unspectate: 観戦の開始と終了
+
+    runworkerは1つのチャネルのメッセージを1つずつ処理するので、DBへの書き込みや送信を待つ
+    match.start / match.init / match.ready / match.exitはバックグラウンドのタスクで実行し、
+    他の試合の入力を止めないようにする。match.inputはその場で入力キューに追加する。
+    同じ試合の処理はMatchManagerRegistryの試合ごとのロックを受け取った順に取るので、順番は変わらない。
+    観戦の開始と終了はロックを取らないため、同じ観戦者の順番を保つようにその場で処理する。
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.background_tasks: set[asyncio.Task] = set()
+
+    async def match_start(self, message: dict) -> None:
+        match_id: int = message[match_constants.MATCH_ID]
+        reply_channel: str = message["reply_channel"]
+        manager = match_manager.MatchManager(
+            match_id=match_id,
+            player1=_player_from_dict(message["player1"]),  # type: ignore
+            player2=_player_from_dict(message["player2"]),
+            mode=match_constants.Mode.REMOTE.value,
+            tournament_id=message["tournament_id"],
+            tournament_channel=reply_channel,
+        )
+        await manager_registry.global_registry.register_match_manager(
+            match_id, manager
+        )
+        await self.channel_layer.send(reply_channel, {"type": "match.started"})
+        # 試合の終了を待たずに次のメッセージを処理する
+        self._run_in_background(self._run_match(manager, reply_channel))
+
+    async def match_init(self, message: dict) -> None:
+        self._run_in_background(
+            manager_registry.global_registry.init_action(
+                message[match_constants.MATCH_ID],
+                _player_from_dict(message["player"]),  # type: ignore
+                message[match_constants.Protocol.key()],
+            )
+        )
+
+    async def match_ready(self, message: dict) -> None:
+        self._run_in_background(
+            manager_registry.global_registry.ready_action(
+                message[match_constants.MATCH_ID],
+                _player_from_dict(message["player"]),  # type: ignore
+            )
+        )
+
+    async def match_input(self, message: dict) -> None:
+        manager = await manager_registry.global_registry.get_match(
+            message[match_constants.MATCH_ID]
+        )
+        if manager is not None:
+            manager.push_input(
+                message[match_constants.Team.key()],
+                message[match_constants.Move.key()],
+            )
+
+    async def match_exit(self, message: dict) -> None:
+        self._run_in_background(
+            manager_registry.global_registry.exit_match(
+                message[match_constants.MATCH_ID],
+                _player_from_dict(message["player"]),  # type: ignore
+            )
+        )
+
+    async def match_spectate(self, message: dict) -> None:
+        await manager_registry.global_registry.spectate_action(
+            message[match_constants.MATCH_ID],
+            message["channel_name"],
+            message[match_constants.Protocol.key()],
+        )
+
+    async def match_unspectate(self, message: dict) -> None:
+        await manager_registry.global_registry.leave_spectator(
+            message[match_constants.MATCH_ID], message["channel_name"]
+        )
+
+    def _run_in_background(self, coroutine: Coroutine[Any, Any, None]) -> None:
+        """
+        処理をバックグラウンドのタスクで実行する。
+        タスクは終わるまで保持し、失敗した場合はログに残す。
+        """
+        task = asyncio.create_task(coroutine)
+        self.background_tasks.add(task)
+        task.add_done_callback(self._on_background_task_done)
+
+    def _on_background_task_done(self, task: asyncio.Task) -> None:
+        self.background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Error: {task.exception()}")
+
+    async def _run_match(
+        self, manager: match_manager.MatchManager, reply_channel: str
+    ) -> None:
+        winner = None
+        try:
+            winner = await manager.run()
+        except Exception as e:
+            logger.error(f"Error: {e}")
+        await self.channel_layer.send(
+            reply_channel,
+            {"type": "match.result", "winner": _player_to_dict(winner)},
+        )
+
+
+class RemoteMatchManager:
+    """
+    game workerで実行する試合をTournamentManagerから操作するためのクラス。
+    MatchManagerと同じようにrun()で試合を実行し、勝者を返す。
+
+    試合中の得点はgame workerからmatch.scoreとして届き、
+    このプロセスのTournamentManagerのトーナメントの状態に追加する。
+
+    start_timeout秒以内にgame workerからmatch.startedが届かない場合は、
+    試合を中止(CANCELED)してNoneを返す。
+    """
+
+    def __init__(
+        self,
+        match_id: int,
+        player1: player_data.PlayerData,
+        player2: player_data.PlayerData,
+        tournament_id: Optional[int] = None,
+        channel_layer: Optional[BaseChannelLayer] = None,
+        start_timeout: float = match_constants.WORKER_START_TIMEOUT,
+    ) -> None:
+        self.match_id = match_id
+        self.player1 = player1
+        self.player2 = player2
+        self.tournament_id = tournament_id
+        self.channel_layer = (
+            channel_layer if channel_layer is not None else get_channel_layer()
+        )
+        self.worker_channel = worker_channel_for(match_id)
+        self.start_timeout = start_timeout
+
+    def __repr__(self) -> str:
+        return (
+            f"RemoteMatchManager(match_id={self.match_id!r}, "
+            f"worker_channel={self.worker_channel!r})"
+        )
+
+    async def run(self) -> Optional[player_data.PlayerData]:
+        """
+        担当のgame workerで試合を開始し、終了を待って勝者を返す。
+        game workerが試合を開始しなかった場合は試合を中止してNoneを返す。
+        """
+        reply_channel = await self.channel_layer.new_channel()
+        await self.channel_layer.send(
+            self.worker_channel,
+            {
+                "type": "match.start",
+                match_constants.MATCH_ID: self.match_id,
+                "player1": _player_to_dict(self.player1),
+                "player2": _player_to_dict(self.player2),
+                "tournament_id": self.tournament_id,
+                "reply_channel": reply_channel,
+            },
+        )
+        try:
+            await asyncio.wait_for(
+                self._wait_started(reply_channel), self.start_timeout
+            )
+        except asyncio.TimeoutError:
+            logger.error(
+                f"Error: {self.worker_channel} did not start match {self.match_id}"
+            )
+            await self._cancel_match()
+            return None
+
+        # ws.tournamentはこのモジュールをimportしているので、循環importを避けてここでimportする
+        from ws.tournament import (
+            manager_registry as tournament_manager_registry,
+        )
+
+        while True:
+            message = await self.channel_layer.receive(reply_channel)
+            if message["type"] == "match.score":
+                if self.tournament_id is not None:
+                    await tournament_manager_registry.global_tournament_registry.add_match_score(
+                        self.tournament_id,
+                        self.match_id,
+                        message["user_id"],
+                        message["pos_x"],
+                        message["pos_y"],
+                    )
+            elif message["type"] == "match.result":
+                return _player_from_dict(message["winner"])
+
+    async def _wait_started(self, reply_channel: str) -> None:
+        while True:
+            message = await self.channel_layer.receive(reply_channel)
+            if message["type"] == "match.started":
+                return
+
+    async def _cancel_match(self) -> None:
+        update_result = await match_service.update_match_status(
+            self.match_id,
+            match_db_constants.MatchFields.StatusEnum.CANCELED.value,
+        )
+        if update_result.is_error:
+            logger.error(f"Error: {update_result.unwrap_error()}")
+
+
+class GameWorkerClient:
+    """
+    Consumerからの入力を試合を担当するgame workerに転送するクラス。
+    MatchManagerRegistryと同じ関数を持ち、MatchHandlerはどちらも同じように使う。
+    """
+
+    def __init__(
+        self, channel_layer: Optional[BaseChannelLayer] = None
+    ) -> None:
+        self.channel_layer = (
+            channel_layer if channel_layer is not None else get_channel_layer()
+        )
+
+    async def init_action(
+        self, match_id: int, player: player_data.PlayerData, protocol: str
+    ) -> None:
+        await self._send(
+            match_id,
+            "match.init",
+            {
+                "player": _player_to_dict(player),
+                match_constants.Protocol.key(): protocol,
+            },
+        )
+
+    async def ready_action(
+        self, match_id: int, player: player_data.PlayerData
+    ) -> None:
+        await self._send(
+            match_id, "match.ready", {"player": _player_to_dict(player)}
+        )
+
+    async def paddle_up(self, match_id: int, team: str) -> None:
+        await self._send_input(match_id, team, match_constants.Move.UP.value)
+
+    async def paddle_down(self, match_id: int, team: str) -> None:
+        await self._send_input(match_id, team, match_constants.Move.DOWN.value)
+
+    async def exit_match(
+        self, match_id: int, player: player_data.PlayerData
+    ) -> None:
+        await self._send(
+            match_id, "match.exit", {"player": _player_to_dict(player)}
+        )
+
+    async def spectate_action(
+        self, match_id: int, channel_name: str, protocol: str
+    ) -> None:
+        await self._send(
+            match_id,
+            "match.spectate",
+            {
+                "channel_name": channel_name,
+                match_constants.Protocol.key(): protocol,
+            },
+        )
+
+    async def leave_spectator(self, match_id: int, channel_name: str) -> None:
+        await self._send(
+            match_id, "match.unspectate", {"channel_name": channel_name}
+        )
+
+    async def _send_input(self, match_id: int, team: str, move: str) -> None:
+        await self._send(
+            match_id,
+            "match.input",
+            {
+                match_constants.Team.key(): team,
+                match_constants.Move.key(): move,
+            },
+        )
+
+    async def _send(
+        self, match_id: int, message_type: str, data: dict
+    ) -> None:
+        await self.channel_layer.send(
+            worker_channel_for(match_id),
+            {"type": message_type, match_constants.MATCH_ID: match_id, **data},
+        )
+
+
+def get_match_registry() -> (
+    Union[manager_registry.MatchManagerRegistry, GameWorkerClient]
+):
+    """
+    リモート対戦の入力を渡す先を返す。
+    game workerを使う場合はGameWorkerClient、使わない場合はこのプロセスのMatchManagerRegistry。
+    """
+    if is_enabled():
+        return GameWorkerClient()
+    return manager_registry.global_registry
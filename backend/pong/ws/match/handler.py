@@ -1,10 +1,12 @@
 import asyncio
 from typing import Optional
 
+from channels.layers import BaseChannelLayer  # type: ignore
+
 from ..share import constants as ws_constants
 from ..share import player_data
 from . import constants as match_constants
-from . import manager_registry, match_manager
+from . import game_worker, match_manager
 from . import serializers as match_serializers
 
 
@@ -13,23 +15,35 @@ class MatchHandler:
     Pongゲーム時にクライアントとの通信を処理するクラス。
     """
 
-    def __init__(self, channel_name: str):
+    def __init__(
+        self,
+        channel_name: str,
+        local_channel_layer: Optional[BaseChannelLayer] = None,
+    ):
         """
         MatchHandlerの初期化。
 
-        :param channel_layer: チャネルレイヤー
         :param channel_name: チャネル名
+        :param local_channel_layer: ローカル対戦のMatchManagerが使うチャネルレイヤー。
+            同じプロセスのConsumerに直接届けるDirectChannelLayerを渡すとRedisを経由しない。
         """
+        self.local_channel_layer = local_channel_layer
+        # リモート対戦の入力の渡し先。game workerを使う場合はそのプロセスに転送する
+        self.match_registry = game_worker.get_match_registry()
         self.stage: Optional[match_constants.Stage] = None
         self.stage_handlers = {
             match_constants.Stage.INIT.value: self._handle_init,
             match_constants.Stage.READY.value: self._handle_ready,
             match_constants.Stage.PLAY.value: self._handle_play,
             match_constants.Stage.END.value: self._handle_end,
+            match_constants.Stage.SPECTATE.value: self._handle_spectate,
         }
         self.is_local_play: bool = True
         self.match_id: int = 0
         self.match_manager: Optional[match_manager.MatchManager] = None
+        self.local_match_task: Optional[asyncio.Task] = None
+        # 観戦中の試合のid、観戦していなければ0
+        self.spectating_match_id: int = 0
         self.player_data: player_data.PlayerData = player_data.PlayerData(
             channel_name=channel_name,
             user_id=None,
@@ -101,22 +115,31 @@ class MatchHandler:
         # localなら来ないので、例外でないようにgetで取得
         match_id: int = data.get(match_constants.MATCH_ID, 0)
         mode: str = data[match_constants.Mode.key()]
+        protocol: str = data.get(
+            match_constants.Protocol.key(), match_constants.Protocol.JSON.value
+        )
         # プレイモードによって所属させるグループを変える
         if mode == match_constants.Mode.LOCAL.value:
             self.is_local_play = True
             # マッチマネジャーを作成して、ローカルゲームのセットアップを行う。
             self.match_manager = match_manager.MatchManager(
-                match_id, self.player_data, None, mode
+                match_id,
+                self.player_data,
+                None,
+                mode,
+                channel_layer=self.local_channel_layer,
             )
             self.local_match_task = asyncio.create_task(
                 self.match_manager.run()
             )
-            await self.match_manager.handle_init_action(self.player_data)
+            await self.match_manager.handle_init_action(
+                self.player_data, protocol
+            )
         elif mode == match_constants.Mode.REMOTE.value:
             self.is_local_play = False
             self.match_id = match_id
-            await manager_registry.global_registry.init_action(
-                self.match_id, self.player_data
+            await self.match_registry.init_action(
+                self.match_id, self.player_data, protocol
             )
 
         # TODO: remoteの場合のグループ作成方法は別で考える
@@ -134,7 +157,7 @@ class MatchHandler:
         if self.is_local_play and self.match_manager is not None:
             await self.match_manager.handle_ready_action(self.player_data)
         else:
-            await manager_registry.global_registry.ready_action(
+            await self.match_registry.ready_action(
                 self.match_id, self.player_data
             )
 
@@ -158,19 +181,47 @@ class MatchHandler:
                 await self.match_manager.paddle_down(team)
         else:
             if move == match_constants.Move.UP.value:
-                await manager_registry.global_registry.paddle_up(
-                    self.match_id, team
-                )
+                await self.match_registry.paddle_up(self.match_id, team)
             elif move == match_constants.Move.DOWN.value:
-                await manager_registry.global_registry.paddle_down(
-                    self.match_id, team
-                )
+                await self.match_registry.paddle_down(self.match_id, team)
+
+    async def _handle_spectate(self, data: dict) -> None:
+        """
+        SPECTATEステージのメッセージが送られてきたときの処理
+        リモート対戦の観戦を開始する。観戦中の別の試合があれば先に終了する。
+
+        :param data: 観戦する試合のidとフレームの形式
+        """
+        match_id: int = data[match_constants.MATCH_ID]
+        protocol: str = data.get(
+            match_constants.Protocol.key(), match_constants.Protocol.JSON.value
+        )
+        if self.spectating_match_id not in (0, match_id):
+            await self._leave_spectator()
+        self.stage = match_constants.Stage.SPECTATE
+        self.spectating_match_id = match_id
+        await self.match_registry.spectate_action(
+            match_id, self.player_data.channel_name, protocol
+        )
+
+    async def _leave_spectator(self) -> None:
+        if self.spectating_match_id == 0:
+            return
+        await self.match_registry.leave_spectator(
+            self.spectating_match_id, self.player_data.channel_name
+        )
+        self.spectating_match_id = 0
 
     async def _handle_end(self, data: dict) -> None:
         """
         ENDステージのメッセージが送られてきたときの処理
         プレーヤーがmatchを退出したときの処理を行う。
+        観戦中であれば観戦を終了する。
         """
+        if self.spectating_match_id != 0:
+            await self.cleanup()
+            return
+
         if self.is_local_play:
             if self.local_match_task and not self.local_match_task.done():
                 self.local_match_task.cancel()  # タスクをキャンセル
@@ -180,7 +231,7 @@ class MatchHandler:
                 except asyncio.CancelledError:
                     pass
         else:
-            await manager_registry.global_registry.exit_match(
+            await self.match_registry.exit_match(
                 self.match_id, self.player_data
             )
 
@@ -191,8 +242,13 @@ class MatchHandler:
         ゲーム終了後のクリーンナップ処理
         グループから削除し、状態を初期化する
         """
+        # ENDを送らずに切断した場合もローカル対戦のタスクを残さない
+        if self.local_match_task and not self.local_match_task.done():
+            self.local_match_task.cancel()
+        self.local_match_task = None
+        await self._leave_spectator()
         if self.match_id != 0:
-            await manager_registry.global_registry.exit_match(
+            await self.match_registry.exit_match(
                 self.match_id, self.player_data
             )
         self.stage = None
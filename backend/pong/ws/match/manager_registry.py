@@ -1,10 +1,15 @@
 import asyncio
+import logging
+import time
 from typing import Optional
 
 from ws.share import player_data
 
+from . import constants as match_constants
 from . import match_manager
 
+logger = logging.getLogger(__name__)
+
 
 class MatchManagerRegistry:
     """
@@ -14,13 +19,35 @@ class MatchManagerRegistry:
     ローカル対戦の場合はMatchHandlerが作成し、MatchManagerを登録する。
 
     試合が始まったら、Consumerの入力をこのクラスを通してMatchManagerに渡す。
+
+    ロックは試合ごとに持ち、DB操作を待つinit/ready/exitが他の試合を止めないようにする。
+    パドルの入力はロックを取らずにMatchManagerの入力キューに追加する。
+
+    MatchManagerのrun()が終了したらreap_grace秒後に登録を削除する。
+    登録がある間はsweep_interval秒ごとに全てのMatchManagerを確認し、
+    run()が実行されないまま放置されたもの(リーク)を削除する。
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        reap_grace: float = match_constants.REAP_GRACE,
+        sweep_interval: float = match_constants.SWEEP_INTERVAL,
+        leak_timeout: float = match_constants.LEAK_TIMEOUT,
+    ) -> None:
         self.managers: dict[
             int, match_manager.MatchManager
-        ] = {}  # { tournament_id: TournamentManager }
-        self.lock = asyncio.Lock()
+        ] = {}  # { match_id: MatchManager }
+        self.locks: dict[int, asyncio.Lock] = {}  # { match_id: Lock }
+        self.reap_grace = reap_grace
+        self.sweep_interval = sweep_interval
+        self.leak_timeout = leak_timeout
+        self.sweep_task: Optional[asyncio.Task] = None
+        # { match_id: 試合の終了を待って登録を削除するタスク }
+        self.reapers: dict[int, asyncio.Task] = {}
+
+        # 計測値
+        self.reaped_count: int = 0
+        self.leaked_count: int = 0
 
     async def register_match_manager(
         self, match_id: int, manager: match_manager.MatchManager
@@ -29,18 +56,95 @@ class MatchManagerRegistry:
         渡されたmatch_idでMatchManagerを登録
         すでに登録済みなら無視する。
         """
-        async with self.lock:
-            if match_id not in self.managers:
-                self.managers[match_id] = manager
+        if match_id not in self.managers:
+            self.managers[match_id] = manager
+            self.locks[match_id] = asyncio.Lock()
+            self.reapers[match_id] = asyncio.create_task(
+                self._reap_when_finished(match_id, manager)
+            )
+            if self.sweep_task is None or self.sweep_task.done():
+                self.sweep_task = asyncio.create_task(self._sweep_loop())
 
     async def delete_match(self, match_id: int) -> None:
         """
         渡されたmatch_idのMatchManagerがあれば削除する
         存在しない場合は何もしない
         """
-        async with self.lock:
-            if match_id in self.managers:
-                del self.managers[match_id]
+        self._remove(match_id)
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """
+        終了してからreap_grace秒経ったMatchManagerと、リークしたMatchManagerを削除する。
+
+        Returns:
+            int: 削除したMatchManagerの数
+        """
+        now = time.monotonic() if now is None else now
+        deleted = 0
+        for match_id, manager in list(self.managers.items()):
+            if manager.finished_at is not None:
+                if now - manager.finished_at < self.reap_grace:
+                    continue
+                self.reaped_count += 1
+            elif manager.is_leaked(now, self.leak_timeout):
+                logger.warning(f"Leaked MatchManager: {match_id}")
+                self.leaked_count += 1
+            else:
+                continue
+            self._remove(match_id)
+            deleted += 1
+        return deleted
+
+    def stats(self, now: Optional[float] = None) -> dict:
+        """
+        登録されているMatchManagerの状態ごとの数と、削除した数を返す。
+            - live: 終了していない
+            - completed_unreaped: 終了したが、まだ削除していない
+            - leaked: run()が実行されないまま放置されている(次のsweepで削除する)
+        """
+        now = time.monotonic() if now is None else now
+        live = completed = leaked = 0
+        for manager in self.managers.values():
+            if manager.finished_at is not None:
+                completed += 1
+            elif manager.is_leaked(now, self.leak_timeout):
+                leaked += 1
+            else:
+                live += 1
+        return {
+            "live": live,
+            "completed_unreaped": completed,
+            "leaked": leaked,
+            "reaped": self.reaped_count,
+            "leaked_reaped": self.leaked_count,
+        }
+
+    def _remove(self, match_id: int) -> None:
+        self.managers.pop(match_id, None)
+        self.locks.pop(match_id, None)
+        reaper = self.reapers.pop(match_id, None)
+        if reaper is not None and reaper is not asyncio.current_task():
+            reaper.cancel()
+
+    async def _reap_when_finished(
+        self, match_id: int, manager: match_manager.MatchManager
+    ) -> None:
+        """
+        MatchManagerのrun()が終了してからreap_grace秒後に登録を削除する。
+        """
+        await manager.finished.wait()
+        await asyncio.sleep(self.reap_grace)
+        if self.managers.get(match_id) is manager:
+            self.reaped_count += 1
+            self._remove(match_id)
+
+    async def _sweep_loop(self) -> None:
+        """
+        登録がなくなるまでsweep_interval秒ごとにsweep()を実行する。
+        """
+        while self.managers:
+            await asyncio.sleep(self.sweep_interval)
+            self.sweep()
 
     async def get_match(
         self, match_id: int
@@ -56,35 +160,54 @@ class MatchManagerRegistry:
     ###########################################################
 
     async def init_action(
-        self, match_id: int, player: player_data.PlayerData
+        self, match_id: int, player: player_data.PlayerData, protocol: str
     ) -> None:
-        async with self.lock:
-            if match_id in self.managers:
-                await self.managers[match_id].handle_init_action(player)
+        manager = self.managers.get(match_id)
+        if manager is None:
+            return
+        async with self.locks[match_id]:
+            await manager.handle_init_action(player, protocol)
 
     async def ready_action(
         self, match_id: int, player: player_data.PlayerData
     ) -> None:
-        async with self.lock:
-            if match_id in self.managers:
-                await self.managers[match_id].handle_ready_action(player)
+        manager = self.managers.get(match_id)
+        if manager is None:
+            return
+        async with self.locks[match_id]:
+            await manager.handle_ready_action(player)
 
     async def paddle_up(self, match_id: int, team: str) -> None:
-        async with self.lock:
-            if match_id in self.managers:
-                await self.managers[match_id].paddle_up(team)
+        manager = self.managers.get(match_id)
+        if manager is not None:
+            manager.push_input(team, match_constants.Move.UP.value)
 
     async def paddle_down(self, match_id: int, team: str) -> None:
-        async with self.lock:
-            if match_id in self.managers:
-                await self.managers[match_id].paddle_down(team)
+        manager = self.managers.get(match_id)
+        if manager is not None:
+            manager.push_input(team, match_constants.Move.DOWN.value)
+
+    async def spectate_action(
+        self, match_id: int, channel_name: str, protocol: str
+    ) -> None:
+        # 観戦者の参加・退出はプレーヤーの処理を待たせないようにロックを取らない
+        manager = self.managers.get(match_id)
+        if manager is not None:
+            await manager.handle_spectate_action(channel_name, protocol)
+
+    async def leave_spectator(self, match_id: int, channel_name: str) -> None:
+        manager = self.managers.get(match_id)
+        if manager is not None:
+            await manager.handle_leave_spectator(channel_name)
 
     async def exit_match(
         self, match_id: int, player: player_data.PlayerData
     ) -> None:
-        async with self.lock:
-            if match_id in self.managers:
-                await self.managers[match_id].player_exited(player)
+        manager = self.managers.get(match_id)
+        if manager is None:
+            return
+        async with self.locks[match_id]:
+            await manager.player_exited(player)
 
 
 # === グローバルな MatchManagerRegistry インスタンス ===
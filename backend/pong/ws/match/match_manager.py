@@ -1,17 +1,24 @@
 import asyncio
+import collections
 import logging
-from typing import Final, Optional
+import random
+import secrets
+import time
+from typing import Final, Optional, Union
 
-from channels.layers import get_channel_layer  # type: ignore
+from channels.layers import (  # type: ignore
+    BaseChannelLayer,
+    get_channel_layer,
+)
 
 from matches import constants as match_db_constants
-from ws.tournament import manager_registry as tournament_manager_registry
 
 from ..share import channel_handler, player_data
 from ..share import constants as ws_constants
 from . import async_db_service as match_service
+from . import binary_frame, frame_encoder, game_clock, replay, score_sink
 from . import constants as match_constants
-from .pong_logic import PongLogic
+from .pong_logic import PongCore
 
 logger = logging.getLogger(__name__)
 
@@ -21,15 +28,42 @@ class MatchManager:
     Pongのゲーム進行・DB操作を担当するクラス
 
     トーナメント進行クラスに作成され、マッチの進行を行う。
-    実際のロジックはPongLogicクラスが担当しこのクラスはそれを操作する。
+    実際のロジックはPongCoreクラスが担当しこのクラスはそれを直接(同期的に)操作する。
 
-    Consumerからの入力を関数を通して受け取り、PongLogicインスタンスを操作する。
-    60FPSでゲーム情報をChannelLayerを通してConsumerに送信する。
+    Consumerからの入力を関数を通して受け取り、PongCoreインスタンスを操作する。
+    物理演算はSIMULATION_RATEで進め、ゲーム情報はモードごとのBROADCAST_RATESで
+    ChannelLayerを通してConsumerに送信する。
+    得点時と試合終了時は間隔に関わらずすぐに送信する。
+    クライアントが送信の間を補間できるように、フレームにはティック番号とボールの速度を含める。
+
+    パドルの入力はロックを取らずに試合ごとの入力キュー(上限INPUT_QUEUE_SIZE)に追加し、
+    ティックの最初にチームごとの移動量にまとめて適用する。
+
+    マッチごとに乱数シードを持ち、パドルの入力をティック番号と共にInputLogに記録する。
+    リモート対戦では試合終了時にシードと入力をリプレイとしてDBに保存し、
+    replay.Replayで任意のティックの状態を再シミュレーションできる。
+
+    リモート対戦は観戦できる。観戦者はf"pong_{match_id}_spectators"のグループに入り、
+    プレーヤーとは別にSPECTATOR_BROADCAST_RATEへ間引いたフレームを受け取る。
+    観戦者への送信はバックグラウンドで行い、前の送信が終わっていなければそのフレームは捨てるので、
+    観戦者が増えてもプレーヤーへの送信とティックの処理は遅れない。
+
+    READYをready_timeout秒待っても揃わない場合と、試合中にidle_timeout秒パドルの入力がない場合は
+    そのプレーヤーの負け(途中退出と同じ扱い)にして試合を終了する。
+    run()が終了したらfinishedをセットし、MatchManagerRegistryはそれを待って登録を削除する。
 
     ChannelLayerのグループ名はf"pong_{match_id}"とする。
+
+    フレームの進行はプロセス共通のGameClockが行い、このクラスはティックごとの処理を登録する。
+    PLAYステージの状態はINITでクライアントが選んだ形式(Protocol)ごとに1ティック1回だけ作成する。
+        - JSON: DeltaFrameEncoderで前回のキーフレームからの差分に変換してf"pong_{match_id}_json"へ送信
+        - BINARY: 固定レイアウトのバイナリフレームをf"pong_{match_id}_binary"へ送信
     """
 
-    FPS: Final[float] = 1 / 60
+    # Falseにすると毎フレーム全ての状態を送る
+    DELTA_FRAMES: Final[bool] = True
+    # 1ティックの間に溜められるパドル入力の数。超えた場合は古い入力から捨てる。
+    INPUT_QUEUE_SIZE: Final[int] = 32
 
     def __init__(
         self,
@@ -38,6 +72,11 @@ class MatchManager:
         player2: Optional[player_data.PlayerData],
         mode: str,
         tournament_id: Optional[int] = None,
+        broadcast_rate: Optional[int] = None,
+        channel_layer: Optional[BaseChannelLayer] = None,
+        ready_timeout: Optional[float] = None,
+        idle_timeout: Optional[float] = None,
+        tournament_channel: Optional[str] = None,
     ) -> None:
         """
         Args:
@@ -45,26 +84,123 @@ class MatchManager:
             player1 (PlayerData): player1の情報
             player2 (Optional[PlayerData]): player2の情報、ローカルならNone
             mode (str): "local" | "remote"のどちらか
+            broadcast_rate (Optional[int]): フレームの送信頻度(Hz)、Noneならモードの既定値
+            channel_layer (Optional[BaseChannelLayer]): 送信に使うチャネルレイヤー、
+                Noneなら設定されたChannelLayer(Redis)
+            ready_timeout (Optional[float]): READYを待つ秒数、Noneなら既定値
+            idle_timeout (Optional[float]): 試合中に入力を待つ秒数、Noneなら既定値
+            tournament_channel (Optional[str]): game workerで実行する場合に
+                得点を知らせるTournamentManager側のチャネル名
         """
         self.match_id = match_id
         self.player1 = player1
         self.player2 = player2
         self.mode = mode
 
-        self.pong_logic = PongLogic()
+        self.seed = secrets.randbits(64)
+        self.pong_logic = PongCore(rng=random.Random(self.seed))
+        self.input_log = replay.InputLog(self.seed)
+        self.input_queue: collections.deque[tuple[str, str]] = (
+            collections.deque(maxlen=self.INPUT_QUEUE_SIZE)
+        )
+        self.dropped_inputs: int = 0
         self.group_name = f"pong_{match_id}"  # 一意
         self.player1_ready: bool = False
         self.player2_ready: bool = False
         self.waiting_player_ready = asyncio.Event()
+        self.game_finished = asyncio.Event()
         self.canceled = False
         self.remained_player: Optional[player_data.PlayerData] = None
         self.channel_handler = channel_handler.ChannelHandler(
-            get_channel_layer(), None
+            channel_layer
+            if channel_layer is not None
+            else get_channel_layer(),
+            None,
         )
         self.waiting_player_num = (
             1 if self.mode == match_constants.Mode.LOCAL.value else 2
         )
         self.tournament_id = tournament_id
+        self.tournament_channel = tournament_channel
+        self.frame_encoder = frame_encoder.DeltaFrameEncoder(
+            delta=self.DELTA_FRAMES
+        )
+        # PLAYステージのフレームを受け取る形式ごとのグループ名
+        self.play_group_names: dict[str, str] = {
+            protocol.value: f"{self.group_name}_{protocol.value.lower()}"
+            for protocol in match_constants.Protocol
+        }
+        self.protocols: dict[str, str] = {}  # { channel_name: protocol }
+        self.frame_count: int = 0
+
+        # 観戦者のグループ名と、観戦者ごとのフレームの形式
+        self.spectator_group_name = f"{self.group_name}_spectators"
+        self.spectator_frame_group_names: dict[str, str] = {
+            protocol.value: f"{self.spectator_group_name}_{protocol.value.lower()}"
+            for protocol in match_constants.Protocol
+        }
+        self.spectator_protocols: dict[
+            str, str
+        ] = {}  # { channel_name: protocol }
+        self.spectator_frame_encoder = frame_encoder.DeltaFrameEncoder(
+            delta=self.DELTA_FRAMES
+        )
+        self.spectator_frame_count: int = 0
+        self.spectator_interval = max(
+            1,
+            round(
+                match_constants.SIMULATION_RATE
+                / match_constants.SPECTATOR_BROADCAST_RATE
+            ),
+        )
+        self.next_spectator_tick: int = 0
+        self.spectator_send_task: Optional[asyncio.Task] = None
+        self.dropped_spectator_frames: int = 0
+
+        # 作成した順に送信を待っているPLAYステージのフレームと、それを送信するタスク
+        self.pending_play_frames: collections.deque[Union[bytes, dict]] = (
+            collections.deque()
+        )
+        self.play_send_task: Optional[asyncio.Task] = None
+
+        # 得点をTournamentManagerに知らせている実行中のタスク
+        self.tournament_notifications: set[asyncio.Task] = set()
+
+        # 物理演算のティック数と、次にフレームを送信するティック
+        self.broadcast_rate = (
+            broadcast_rate or match_constants.BROADCAST_RATES[mode]
+        )
+        self.broadcast_interval = max(
+            1,
+            round(match_constants.SIMULATION_RATE / self.broadcast_rate),
+        )
+        self.tick: int = 0
+        self.next_broadcast_tick: int = 0
+
+        # タイムアウトとMatchManagerRegistryが削除を判断するための状態
+        self.ready_timeout = (
+            match_constants.READY_TIMEOUT
+            if ready_timeout is None
+            else ready_timeout
+        )
+        idle_timeout = (
+            match_constants.IDLE_TIMEOUT
+            if idle_timeout is None
+            else idle_timeout
+        )
+        self.idle_timeout_ticks = max(
+            1, round(idle_timeout * match_constants.SIMULATION_RATE)
+        )
+        # { team: 最後にパドルの入力を適用したティック }
+        self.last_input_ticks: dict[str, int] = {
+            match_constants.Team.ONE.value: 0,
+            match_constants.Team.TWO.value: 0,
+        }
+        self.idle_team: Optional[str] = None
+        self.running: bool = False
+        self.last_activity: float = time.monotonic()
+        self.finished_at: Optional[float] = None
+        self.finished = asyncio.Event()
 
     async def run(self) -> Optional[player_data.PlayerData]:
         """
@@ -76,8 +212,23 @@ class MatchManager:
                 - 試合がキャンセルされた場合： 残ったプレーヤ―のデータを勝利者として返す。
                 - 正常に終了した場合： 勝利プレーヤ―のデータを返す。
         """
+        self.running = True
+        try:
+            return await self._run()
+        finally:
+            self.running = False
+            self.finished_at = time.monotonic()
+            self.finished.set()
+
+    async def _run(self) -> Optional[player_data.PlayerData]:
         # プレーヤーが準備完了のメッセージを送信するのを待つ
-        await self.waiting_player_ready.wait()
+        try:
+            await asyncio.wait_for(
+                self.waiting_player_ready.wait(), self.ready_timeout
+            )
+        except asyncio.TimeoutError:
+            # READYを送っていないプレーヤーの負けにする
+            await self.player_exited(self._unready_player())
 
         if self.canceled:
             # 残っている方のPlayerDataを勝者として返す。
@@ -86,6 +237,14 @@ class MatchManager:
         # PongLogic開始
         await self._start_game()
 
+        if self.idle_team is not None:
+            # 入力がなかったチームのプレーヤーの負けにする
+            await self.player_exited(
+                self.player1
+                if self.idle_team == match_constants.Team.ONE.value
+                else self.player2  # type: ignore
+            )
+
         if self.canceled:
             # 残っている方のPlayerDataを勝者として返す。
             return self.remained_player
@@ -94,21 +253,28 @@ class MatchManager:
         await self._end_game()
 
         # 勝者チームのデータを返り値として返す。
-        win_team = await self.pong_logic.get_winner()
+        win_team = self.pong_logic.get_winner()
         return (
             self.player1
             if win_team == match_constants.Team.ONE.value
             else self.player2
         )
 
-    async def handle_init_action(self, player: player_data.PlayerData) -> None:
+    async def handle_init_action(
+        self,
+        player: player_data.PlayerData,
+        protocol: str = match_constants.Protocol.JSON.value,
+    ) -> None:
         """
         consumerから渡されたinit メッセージの処理、返信を行う関数。
         consumerから呼び出されるinit actions
 
         Args:
-            player_channel: プレーヤーのchannel_name
+            player (PlayerData): INITを送ってきたプレーヤー
+            protocol (str): PLAYステージのフレームを受け取る形式 "JSON" | "BINARY"
         """
+        previous_protocol = self.protocols.get(player.channel_name)
+        self.protocols[player.channel_name] = protocol
         is_remote = (
             True if self.mode == match_constants.Mode.REMOTE.value else False
         )
@@ -122,11 +288,24 @@ class MatchManager:
             await self.channel_handler.add_to_group(
                 self.group_name, player.channel_name
             )
+            if previous_protocol is not None and previous_protocol != protocol:
+                await self.channel_handler.remove_from_group(
+                    self.play_group_names[previous_protocol],
+                    player.channel_name,
+                )
+            await self.channel_handler.add_to_group(
+                self.play_group_names[protocol], player.channel_name
+            )
+            # 新しく参加したクライアントが状態を復元できるようにする
+            self.frame_encoder.request_keyframe()
 
         message = self._build_message(
             match_constants.Stage.INIT.value,
             {
                 match_constants.Team.key(): team,
+                match_constants.Protocol.key(): protocol,
+                "tick_rate": match_constants.SIMULATION_RATE,
+                "broadcast_rate": self.broadcast_rate,
                 "display_name1": self.player1.participation_name
                 if is_remote and self.player1 is not None
                 else None,
@@ -158,6 +337,7 @@ class MatchManager:
         consumerから呼び出されるready actions
         consumerから渡されたready メッセージの処理、返信を行う関数。
         """
+        self.last_activity = time.monotonic()
         # readyメッセージを送ってきたプレーヤーのカウント
         if player.channel_name == self.player1.channel_name:
             self.player1_ready = True
@@ -209,74 +389,452 @@ class MatchManager:
 
     async def _send_match_state(self) -> None:
         """
-        60FPSでPongLogicの状態を更新・取得し、Consumerに送信
-        """
-        last_update = asyncio.get_event_loop().time()
-        while not await self.pong_logic.game_end():
-            await asyncio.sleep(self.FPS)
-            current_time = asyncio.get_event_loop().time()
-            delta = current_time - last_update
-            if delta >= self.FPS:
-                # Pongを更新する前のボールの位置を保存
-                pos_x, pos_y = (
-                    self.pong_logic.ball_pos.x,
-                    self.pong_logic.ball_pos.y,
+        GameClockにティック処理を登録し、ゲームが終了するまで待機する。
+        タスクがキャンセルされた場合も登録は必ず解除する。
+        """
+        self.game_finished.clear()
+        game_clock.global_game_clock.register(id(self), self._on_tick)
+        try:
+            await self.game_finished.wait()
+        finally:
+            game_clock.global_game_clock.unregister(id(self))
+        # 最後のフレームを送り終えてから試合を終了する
+        if self.play_send_task is not None:
+            await self.play_send_task
+
+    def _on_tick(self, steps: int) -> None:
+        """
+        GameClockから1ティックごとに呼び出され、PongLogicの状態を更新する。
+        broadcast_intervalティックごと、または得点・試合終了時に最新の状態をConsumerに送信する。
+        処理が遅れた場合はstepsフレーム分まとめて進める。
+        送信はバックグラウンドのタスクで行い、GameClockを待たせない。
+
+        Args:
+            steps (int): 進めるフレーム数
+        """
+        if self.game_finished.is_set():
+            return
+
+        self._apply_inputs()
+        idle_team = self._find_idle_team()
+        if idle_team is not None:
+            # run()が入力のなかったチームの負けとして試合を終了する
+            self.idle_team = idle_team
+            self.game_finished.set()
+            return
+
+        scored = False
+        for _ in range(steps):
+            self.tick += 1
+            # Pongを更新する前のボールの位置を保存
+            pos_x, pos_y = (
+                self.pong_logic.ball_pos.x,
+                self.pong_logic.ball_pos.y,
+            )
+            # Pongを更新
+            score_team: Optional[str] = self.pong_logic.update_game_state()
+            if score_team is not None:
+                scored = True
+                self._handle_score(score_team, pos_x, pos_y)
+            if self.pong_logic.game_end():
+                break
+
+        # consumerに送るメッセージを送信
+        if (
+            self.tick >= self.next_broadcast_tick
+            or scored
+            or self.pong_logic.game_end()
+        ):
+            self.next_broadcast_tick = self.tick + self.broadcast_interval
+            self._send_play_frame()
+
+        # 観戦者には間引いたフレームをバックグラウンドで送信
+        if self.spectator_protocols and (
+            self.tick >= self.next_spectator_tick
+            or scored
+            or self.pong_logic.game_end()
+        ):
+            self.next_spectator_tick = self.tick + self.spectator_interval
+            self._send_spectator_frame()
+
+        if self.pong_logic.game_end():
+            self.game_finished.set()
+
+    def _send_play_frame(self) -> None:
+        """
+        PLAYステージのフレームを形式ごとに1ティック1回だけ作成し、バックグラウンドで送信する。
+        その形式を選んだクライアントがいなければ作成しない。
+        差分のフレームは順番に届く必要があるので、作成した順に1つのタスクで送る。
+        """
+        protocols = set(self.protocols.values())
+
+        if match_constants.Protocol.BINARY.value in protocols:
+            self.pending_play_frames.append(
+                binary_frame.pack_play_frame(
+                    self.frame_count, self.tick, self.pong_logic
                 )
-                # Pongを更新
-                score_team: Optional[
-                    str
-                ] = await self.pong_logic.update_game_state()
+            )
 
-                # consumerに送るメッセージを送信
-                game_state = self._build_message(
+        if match_constants.Protocol.JSON.value in protocols:
+            self.pending_play_frames.append(
+                self._build_message(
                     match_constants.Stage.PLAY.value,
-                    {
-                        "paddle1": {
-                            "x": self.pong_logic.paddle1_pos.x,
-                            "y": self.pong_logic.paddle1_pos.y,
-                        },
-                        "paddle2": {
-                            "x": self.pong_logic.paddle2_pos.x,
-                            "y": self.pong_logic.paddle2_pos.y,
-                        },
-                        "ball": {
-                            "x": self.pong_logic.ball_pos.x,
-                            "y": self.pong_logic.ball_pos.y,
-                        },
-                        "score1": self.pong_logic.score1,
-                        "score2": self.pong_logic.score2,
-                    },
+                    self.frame_encoder.encode(self._play_state()),
                 )
-                await self._send_message(game_state)
-
-                # スコアの変動を確認
-                if (
-                    score_team is not None
-                    and self.mode == match_constants.Mode.REMOTE.value
-                    and self.player1 is not None
-                    and self.player2 is not None
-                ):
-                    # スコアテーブルをバックグラウンドで作成。
-                    scoring_player_id = (
-                        self.player1.user_id
-                        if score_team == match_constants.Team.ONE.value
-                        else self.player2.user_id
+            )
+
+        self.frame_count += 1
+        if self.pending_play_frames and (
+            self.play_send_task is None or self.play_send_task.done()
+        ):
+            self.play_send_task = asyncio.create_task(
+                self._flush_play_frames()
+            )
+
+    async def _flush_play_frames(self) -> None:
+        """
+        送信を待っているPLAYステージのフレームを、作成した順に全て送信する。
+        """
+        is_local = self.mode == match_constants.Mode.LOCAL.value
+        while self.pending_play_frames:
+            frame = self.pending_play_frames.popleft()
+            if isinstance(frame, bytes):
+                if is_local:
+                    await self.channel_handler.send_bytes_to_consumer(
+                        frame, self.player1.channel_name
                     )
-                    asyncio.create_task(
-                        match_service.create_score(
-                            self.match_id, scoring_player_id, pos_x, pos_y
-                        )
+                else:
+                    await self.channel_handler.send_bytes_to_group(
+                        self.play_group_names[
+                            match_constants.Protocol.BINARY.value
+                        ],
+                        frame,
                     )
-                    if self.tournament_id is not None:
-                        asyncio.create_task(
-                            tournament_manager_registry.global_tournament_registry.send_match_reload_message(
-                                self.tournament_id
-                            )
-                        )
-
-                last_update = current_time
+            elif is_local:
+                await self.channel_handler.send_frame_to_consumer(
+                    frame,
+                    self.player1.channel_name,
+                    self._is_delta_keyframe(frame),
+                )
             else:
-                await asyncio.sleep(self.FPS - delta)
+                await self.channel_handler.send_frame_to_group(
+                    self.play_group_names[match_constants.Protocol.JSON.value],
+                    frame,
+                    self._is_delta_keyframe(frame),
+                )
+
+    def _is_delta_keyframe(self, message: dict) -> bool:
+        """
+        JSONのフレームが、後の差分フレームの基準になるキーフレームか。
+        差分を送らない場合はどのフレームも他のフレームの基準にならない。
+        """
+        return self.DELTA_FRAMES and bool(
+            message[ws_constants.PAYLOAD_KEY][ws_constants.DATA_KEY][
+                frame_encoder.KEYFRAME_KEY
+            ]
+        )
+
+    def _play_state(self) -> dict:
+        """
+        PLAYステージでJSONのフレームとして送る全ての試合状態を返す。
+        """
+        return {
+            frame_encoder.TICK_KEY: self.tick,
+            "paddle1": {
+                "x": self.pong_logic.paddle1_pos.x,
+                "y": self.pong_logic.paddle1_pos.y,
+            },
+            "paddle2": {
+                "x": self.pong_logic.paddle2_pos.x,
+                "y": self.pong_logic.paddle2_pos.y,
+            },
+            "ball": {
+                "x": self.pong_logic.ball_pos.x,
+                "y": self.pong_logic.ball_pos.y,
+            },
+            "ball_speed": {
+                "x": self.pong_logic.ball_speed.x,
+                "y": self.pong_logic.ball_speed.y,
+            },
+            "score1": self.pong_logic.score1,
+            "score2": self.pong_logic.score2,
+        }
+
+    def _send_spectator_frame(self) -> None:
+        """
+        観戦者へのフレームを作成し、バックグラウンドで送信する。
+        前のフレームの送信が終わっていない場合はこのフレームを捨てる。
+        """
+        if (
+            self.spectator_send_task is not None
+            and not self.spectator_send_task.done()
+        ):
+            self.dropped_spectator_frames += 1
+            return
+
+        protocols = set(self.spectator_protocols.values())
+        frames: list[tuple[str, Union[bytes, dict]]] = []
+        if match_constants.Protocol.BINARY.value in protocols:
+            frames.append(
+                (
+                    self.spectator_frame_group_names[
+                        match_constants.Protocol.BINARY.value
+                    ],
+                    binary_frame.pack_play_frame(
+                        self.spectator_frame_count, self.tick, self.pong_logic
+                    ),
+                )
+            )
+        if match_constants.Protocol.JSON.value in protocols:
+            frames.append(
+                (
+                    self.spectator_frame_group_names[
+                        match_constants.Protocol.JSON.value
+                    ],
+                    self._build_message(
+                        match_constants.Stage.PLAY.value,
+                        self.spectator_frame_encoder.encode(
+                            self._play_state()
+                        ),
+                    ),
+                )
+            )
+        self.spectator_frame_count += 1
+        self.spectator_send_task = asyncio.create_task(
+            self._broadcast_spectator_frames(frames)
+        )
+
+    async def _broadcast_spectator_frames(
+        self, frames: list[tuple[str, Union[bytes, dict]]]
+    ) -> None:
+        for group_name, frame in frames:
+            if isinstance(frame, bytes):
+                await self.channel_handler.send_bytes_to_group(
+                    group_name, frame
+                )
+            else:
+                await self.channel_handler.send_frame_to_group(
+                    group_name, frame, self._is_delta_keyframe(frame)
+                )
+
+    async def handle_spectate_action(
+        self,
+        channel_name: str,
+        protocol: str = match_constants.Protocol.JSON.value,
+    ) -> None:
+        """
+        観戦を開始する。観戦者のグループに追加し、現在の試合状態を送る。
+        次の観戦者へのJSONのフレームはキーフレームにする。
+
+        Args:
+            channel_name (str): 観戦者のConsumerのチャネル名
+            protocol (str): フレームを受け取る形式 "JSON" | "BINARY"
+        """
+        previous_protocol = self.spectator_protocols.get(channel_name)
+        self.spectator_protocols[channel_name] = protocol
+        await self.channel_handler.add_to_group(
+            self.spectator_group_name, channel_name
+        )
+        if previous_protocol is not None and previous_protocol != protocol:
+            await self.channel_handler.remove_from_group(
+                self.spectator_frame_group_names[previous_protocol],
+                channel_name,
+            )
+        await self.channel_handler.add_to_group(
+            self.spectator_frame_group_names[protocol], channel_name
+        )
+        # 途中から観戦を始めたクライアントが状態を復元できるようにする
+        self.spectator_frame_encoder.request_keyframe()
+
+        message = self._build_message(
+            match_constants.Stage.SPECTATE.value,
+            {
+                match_constants.Protocol.key(): protocol,
+                "tick_rate": match_constants.SIMULATION_RATE,
+                "broadcast_rate": match_constants.SPECTATOR_BROADCAST_RATE,
+                "display_name1": self.player1.participation_name,
+                "display_name2": self.player2.participation_name
+                if self.player2 is not None
+                else None,
+                **self._play_state(),
+            },
+        )
+        await self.channel_handler.send_to_consumer(message, channel_name)
+
+    async def handle_leave_spectator(self, channel_name: str) -> None:
+        """
+        観戦を終了し、観戦者のグループから削除する。
+        """
+        protocol = self.spectator_protocols.pop(channel_name, None)
+        if protocol is None:
+            return
+        await self.channel_handler.remove_from_group(
+            self.spectator_group_name, channel_name
+        )
+        await self.channel_handler.remove_from_group(
+            self.spectator_frame_group_names[protocol], channel_name
+        )
+
+    def _handle_score(self, score_team: str, pos_x: int, pos_y: int) -> None:
+        """
+        得点が入った時の処理。
+        リモート対戦であればスコアをScoreSinkに追加し、まとめてDBに書き込む。
+        """
+        if (
+            self.mode != match_constants.Mode.REMOTE.value
+            or self.player1 is None
+            or self.player2 is None
+        ):
+            return
+
+        # スコアはバッファに溜め、ScoreSinkがまとめて作成する。
+        scoring_player_id = (
+            self.player1.user_id
+            if score_team == match_constants.Team.ONE.value
+            else self.player2.user_id
+        )
+        if self.match_id is None or scoring_player_id is None:
+            return
+        score_sink.global_score_sink.add(
+            self.match_id, scoring_player_id, pos_x, pos_y
+        )
+        if self.tournament_id is not None:
+            task = asyncio.create_task(
+                self._notify_tournament(scoring_player_id, pos_x, pos_y)
+            )
+            self.tournament_notifications.add(task)
+            task.add_done_callback(self._on_tournament_notified)
+
+    def _on_tournament_notified(self, task: asyncio.Task) -> None:
+        self.tournament_notifications.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Error: {task.exception()}")
+
+    async def _wait_tournament_notifications(self) -> None:
+        """
+        試合の終了前に、実行中の得点の通知が終わるのを待つ。
+        """
+        await asyncio.gather(
+            *self.tournament_notifications, return_exceptions=True
+        )
+
+    async def _notify_tournament(
+        self, user_id: int, pos_x: int, pos_y: int
+    ) -> None:
+        """
+        得点が入ったことをTournamentManagerに知らせ、参加者に状態の差分を送らせる。
+        game workerで実行している場合はTournamentManagerのプロセスにメッセージを送る。
+        """
+        if self.tournament_channel is not None:
+            await self.channel_handler.channel_layer.send(
+                self.tournament_channel,
+                {
+                    "type": "match.score",
+                    "user_id": user_id,
+                    "pos_x": pos_x,
+                    "pos_y": pos_y,
+                },
+            )
+        elif self.tournament_id is not None and self.match_id is not None:
+            # ws.tournamentはこのモジュールをimportしているので、循環importを避けてここでimportする
+            from ws.tournament import (
+                manager_registry as tournament_manager_registry,
+            )
+
+            await tournament_manager_registry.global_tournament_registry.add_match_score(
+                self.tournament_id,
+                self.match_id,
+                user_id,
+                pos_x,
+                pos_y,
+            )
+
+    def push_input(self, team: str, move: str) -> None:
+        """
+        パドルの入力を入力キューに追加する。次のティックの最初に適用される。
+        キューが一杯の場合は最も古い入力を捨てる。
+
+        Args:
+            team (str): "1" | "2" チーム名
+            move (str): "UP" | "DOWN"
+        """
+        self.last_activity = time.monotonic()
+        if len(self.input_queue) == self.INPUT_QUEUE_SIZE:
+            self.dropped_inputs += 1
+        self.input_queue.append((team, move))
+
+    def _apply_inputs(self) -> None:
+        """
+        入力キューを空にし、チームごとの移動量(上が負、下が正)にまとめてからパドルを動かす。
+        適用した入力はInputLogに記録する。
+        """
+        if not self.input_queue:
+            return
+
+        net_moves = {
+            match_constants.Team.ONE.value: 0,
+            match_constants.Team.TWO.value: 0,
+        }
+        while self.input_queue:
+            team, move = self.input_queue.popleft()
+            if team in net_moves:
+                self.last_input_ticks[team] = self.tick
+                net_moves[team] += (
+                    -1 if move == match_constants.Move.UP.value else 1
+                )
+
+        for team, net_move in net_moves.items():
+            if net_move < 0:
+                move, move_paddle = (
+                    match_constants.Move.UP.value,
+                    self.pong_logic.move_paddle_up,
+                )
+            else:
+                move, move_paddle = (
+                    match_constants.Move.DOWN.value,
+                    self.pong_logic.move_paddle_down,
+                )
+            for _ in range(abs(net_move)):
+                self.input_log.append(self.tick, team, move)
+                move_paddle(team)
+
+    def _find_idle_team(self) -> Optional[str]:
+        """
+        idle_timeout_ticks以上パドルの入力がないチームを返す。
+        ローカル対戦は1人で両方のパドルを操作するので、どちらにも入力がない場合のみチーム1を返す。
+        """
+        if self.mode == match_constants.Mode.LOCAL.value:
+            last_input_tick = max(self.last_input_ticks.values())
+            if self.tick - last_input_tick >= self.idle_timeout_ticks:
+                return match_constants.Team.ONE.value
+            return None
+
+        team, last_input_tick = min(
+            self.last_input_ticks.items(), key=lambda item: item[1]
+        )
+        if self.tick - last_input_tick >= self.idle_timeout_ticks:
+            return team
+        return None
+
+    def _unready_player(self) -> player_data.PlayerData:
+        """
+        READYのタイムアウト時に負けにするプレーヤーを返す。
+        どちらもREADYを送っていない場合はplayer2の負けにする。
+        """
+        if self.mode == match_constants.Mode.LOCAL.value or self.player2_ready:
+            return self.player1
+        return self.player2  # type: ignore
+
+    def is_leaked(self, now: float, timeout: float) -> bool:
+        """
+        run()が実行されないまま、timeout秒以上操作がないか。
+        run()が実行中であればタイムアウトで必ず終了するので、リークとはみなさない。
+        """
+        return (
+            self.finished_at is None
+            and not self.running
+            and now - self.last_activity >= timeout
+        )
 
     async def paddle_up(self, team: str) -> None:
         """
@@ -285,7 +843,7 @@ class MatchManager:
         Args:
             team (str): "1" | "2" チーム名
         """
-        await self.pong_logic.move_paddle_up(team)
+        self.push_input(team, match_constants.Move.UP.value)
 
     async def paddle_down(self, team: str) -> None:
         """
@@ -294,7 +852,7 @@ class MatchManager:
         Args:
             team (str): "1" | "2" チーム名
         """
-        await self.pong_logic.move_paddle_down(team)
+        self.push_input(team, match_constants.Move.DOWN.value)
 
     async def _end_game(self) -> None:
         """
@@ -306,8 +864,9 @@ class MatchManager:
                 await self.send_task
             except asyncio.CancelledError:
                 pass
+        await self._wait_tournament_notifications()
         # 勝者チームを取得
-        win_team = await self.pong_logic.get_winner()
+        win_team = self.pong_logic.get_winner()
         win_player = (
             self.player1
             if win_team == match_constants.Team.ONE.value
@@ -315,7 +874,10 @@ class MatchManager:
         )
 
         # MatchのステータスをCOMPLETEDに更新
-        if self.mode == match_constants.Mode.REMOTE.value:
+        if (
+            self.mode == match_constants.Mode.REMOTE.value
+            and self.match_id is not None
+        ):
             # 勝ったプレーヤーのレコードを更新
             if win_player is not None and win_player.user_id is not None:
                 update_player_result = (
@@ -328,6 +890,8 @@ class MatchManager:
                         f"Error: {update_player_result.unwrap_error()}"
                     )
 
+            # 試合のスコアを全てDBに書き込んでから試合を終了する
+            await score_sink.global_score_sink.flush_match(self.match_id)
             update_result = await match_service.update_match_status(
                 self.match_id,
                 match_db_constants.MatchFields.StatusEnum.COMPLETED.value,
@@ -335,6 +899,8 @@ class MatchManager:
             if update_result.is_error:
                 logger.error(f"Error: {update_result.unwrap_error()}")
 
+            await self._save_replay()
+
         # ゲーム終了後、Consumerに終了通知
         message = self._build_message(
             match_constants.Stage.END.value,
@@ -354,9 +920,18 @@ class MatchManager:
         呼び出されるタイミングは2つある。
         1. 試合開始前に退出した場合
         2. 試合中に退出した場合
+        READYや入力がタイムアウトした場合もrun()から同じように呼び出す。
             - どちらの場合も残っているプレーヤーを勝者にし、メッセージを送信。
             - レコードの更新を行う。
         """
+        if (
+            self.canceled
+            or self.finished_at is not None
+            or self.pong_logic.game_end()
+        ):
+            # 既に終了した試合への退出(試合終了後のENDなど)は結果を変えない
+            return
+
         # run()関数内で認識できるようにキャンセルフラグを立てる
         self.canceled = True
         # 退出したほうのプレーヤーをNoneに変更
@@ -372,9 +947,13 @@ class MatchManager:
             # 試合中に退出した場合は、バックグラウンドタスクが終了していない可能性があるので、終了させる。
             if self.send_task:
                 self.send_task.cancel()
+        await self._wait_tournament_notifications()
 
         # 残ったプレーヤーを勝者とする。
-        if self.mode == match_constants.Mode.REMOTE.value:
+        if (
+            self.mode == match_constants.Mode.REMOTE.value
+            and self.match_id is not None
+        ):
             # 残ったプレーヤーのレコードを更新
             if (
                 self.remained_player is not None
@@ -390,7 +969,8 @@ class MatchManager:
                         f"Error: {update_player_result.unwrap_error()}"
                     )
 
-            # MatchのステータスをCANCELEDに更新
+            # 試合のスコアを全てDBに書き込んでからMatchのステータスをCANCELEDに更新
+            await score_sink.global_score_sink.flush_match(self.match_id)
             update_result = await match_service.update_match_status(
                 self.match_id,
                 match_db_constants.MatchFields.StatusEnum.CANCELED.value,
@@ -398,6 +978,8 @@ class MatchManager:
             if update_result.is_error:
                 logger.error(f"Error: {update_result.unwrap_error()}")
 
+            await self._save_replay()
+
         # 試合結果を送信
         message = self._build_message(
             match_constants.Stage.END.value,
@@ -411,6 +993,16 @@ class MatchManager:
         )
         await self._send_message(message)
 
+    async def _save_replay(self) -> None:
+        """
+        シードとパドルの入力をリプレイとしてDBに保存する。
+        """
+        save_result = await match_service.update_match_replay(
+            self.match_id, self.input_log.to_bytes(self.tick)
+        )
+        if save_result.is_error:
+            logger.error(f"Error: {save_result.unwrap_error()}")
+
     def _build_message(self, stage: str, data: dict) -> dict:
         """
         プレーヤーに送るメッセージを作成。
@@ -437,3 +1029,14 @@ class MatchManager:
             )
         else:
             await self.channel_handler.send_to_group(self.group_name, message)
+            # 試合の終了は観戦者にも知らせる
+            stage = message[ws_constants.PAYLOAD_KEY][
+                match_constants.Stage.key()
+            ]
+            if (
+                stage == match_constants.Stage.END.value
+                and self.spectator_protocols
+            ):
+                await self.channel_handler.send_to_group(
+                    self.spectator_group_name, message
+                )
@@ -1,28 +1,60 @@
 import random
-from dataclasses import dataclass
 from typing import Final, Optional
 
 from . import constants
 
+# Enumの.valueの参照は遅いので、毎フレーム使う値はモジュール定数として保持する
+TEAM_ONE: Final[str] = constants.Team.ONE.value
+TEAM_TWO: Final[str] = constants.Team.TWO.value
+
 
-@dataclass
 class PosStruct:
-    x: int
-    y: int
+    """
+    x, y座標を保持する構造体。
+    毎フレーム作り直さずにその場で値を書き換えて使う。
+    """
 
+    __slots__ = ("x", "y")
 
-class PongLogic:
+    def __init__(self, x: int, y: int) -> None:
+        self.x = x
+        self.y = y
+
+    def __repr__(self) -> str:
+        return f"PosStruct(x={self.x}, y={self.y})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PosStruct):
+            return NotImplemented
+        return self.x == other.x and self.y == other.y
+
+
+class PongCore:
     """
-    Pongゲームのロジックを担当するクラス。
+    Pongゲームのロジックを同期的に処理するクラス。
     DB操作もメッセージのやり取りも行わない。
 
+    全ての状態は__slots__の整数フィールドとPosStructで保持し、
+    1フレームの更新ではオブジェクトを新しく作らずにその場で書き換える。
+    コルーチンも作成しないので、MatchManagerなどから直接呼び出す。
+
     matchの全体の更新はこのクラスを作成側で以下の関数を繰り返すことで行う。
-        - self.update_game_status()
+        - self.update_game_state()
     また、プレーヤーパドルは以下の関数で更新する。
         - self.move_paddle_up()
         - self.move_paddle_down()
     """
 
+    __slots__ = (
+        "paddle1_pos",
+        "paddle2_pos",
+        "ball_pos",
+        "ball_speed",
+        "score1",
+        "score2",
+        "rng",
+    )
+
     # クラス定数
     HEIGHT: Final[int] = 400
     WIDTH: Final[int] = 600
@@ -32,12 +64,15 @@ class PongLogic:
     PADDLE_SPEED: Final[int] = 5
     BALL_SIZE: Final[int] = 10
     BALL_SPEED: Final[int] = 2
-    FPS: Final[float] = 1 / 60
+    FPS: Final[float] = 1 / constants.SIMULATION_RATE
     WINNING_SCORE: Final[int] = 5
 
-    def __init__(self) -> None:
+    def __init__(self, rng: Optional[random.Random] = None) -> None:
         """
         ゲーム情報を初期化
+
+        Args:
+            rng (Optional[random.Random]): ボールの向きを決める乱数生成器、Noneならグローバルなrandomを使う
         """
         self.paddle1_pos = PosStruct(
             x=self.PADDLE_POS_FROM_GOAL,
@@ -47,40 +82,39 @@ class PongLogic:
             x=self.WIDTH - self.PADDLE_WIDTH - self.PADDLE_POS_FROM_GOAL,
             y=self.HEIGHT // 2 - self.PADDLE_HEIGHT // 2,
         )
-        self.ball_pos: PosStruct = PosStruct(
+        self.ball_pos = PosStruct(
             x=self.WIDTH // 2 - self.BALL_SIZE // 2,
             y=self.HEIGHT // 2 - self.BALL_SIZE // 2,
         )
-        self.ball_speed: PosStruct = PosStruct(
-            x=self.BALL_SPEED, y=self.BALL_SPEED
-        )
+        self.ball_speed = PosStruct(x=self.BALL_SPEED, y=self.BALL_SPEED)
         self.score1 = 0
         self.score2 = 0
+        self.rng = rng
 
     def __str__(self) -> str:
         """
-        PongLogicオブジェクトを文字列として表現。
+        PongCoreオブジェクトを文字列として表現。
 
-        :return: PongLogicオブジェクトの文字列表現
+        :return: PongCoreオブジェクトの文字列表現
         """
         return (
-            f"PongLogic(paddle1_pos={self.paddle1_pos}, paddle2_pos={self.paddle2_pos}, "
+            f"PongCore(paddle1_pos={self.paddle1_pos}, paddle2_pos={self.paddle2_pos}, "
             f"ball_pos={self.ball_pos}, score1={self.score1}, score2={self.score2})"
         )
 
     def __repr__(self) -> str:
         """
-        PongLogicオブジェクトを詳細に表現。
+        PongCoreオブジェクトを詳細に表現。
 
-        :return: PongLogicオブジェクトの詳細な文字列表現
+        :return: PongCoreオブジェクトの詳細な文字列表現
         """
         return (
-            f"PongLogic(paddle1_pos={self.paddle1_pos}, paddle2_pos={self.paddle2_pos}, "
+            f"PongCore(paddle1_pos={self.paddle1_pos}, paddle2_pos={self.paddle2_pos}, "
             f"ball_pos={self.ball_pos}, ball_speed={self.ball_speed}, "
             f"score1={self.score1}, score2={self.score2})"
         )
 
-    async def update_game_state(self) -> Optional[str]:
+    def update_game_state(self) -> Optional[str]:
         """
         ゲームを1フレーム更新する関数。
 
@@ -89,86 +123,153 @@ class PongLogic:
                 "1" | "2": 得点した場合はそのチーム名を返す。
                 None: 得点していなければNoneを返す。
         """
-        await self.move_ball()
-        await self.check_collisions()
-        result: Optional[str] = await self.check_score()
-        return result
+        self.move_ball()
+        return self.check_score()
 
-    async def move_ball(self) -> None:
+    def move_ball(self) -> None:
         """
-        ボールの移動関数
+        ボールを1フレーム分動かす関数。
+        移動経路上で壁・パドルとの衝突を判定し(swept AABB)、衝突した時刻で反射させる。
+        1フレームの移動量がパドルの幅より大きくてもすり抜けない。
         """
-        x, y = self.ball_pos.x, self.ball_pos.y
-        x += self.ball_speed.x
-        y += self.ball_speed.y
+        ball_pos = self.ball_pos
+        ball_speed = self.ball_speed
+        impact = self.check_collisions()
+        if impact is None:
+            ball_pos.x += ball_speed.x
+            ball_pos.y, ball_speed.y = self._reflect_on_walls(
+                ball_pos.y + ball_speed.y, ball_speed.y, 1
+            )
+            return
+
+        # パドルに当たった時刻から残りの時間は、反射した向きに進む
+        paddle_pos, contact_x, num, den, scaled_y, speed_y = impact
+        ball_pos.x = 2 * contact_x - (ball_pos.x + ball_speed.x)
+        ball_speed.x = -ball_speed.x
+        speed_y = self._adjust_reflection_angle(
+            paddle_pos, scaled_y // den, speed_y
+        )
+        scaled_y, ball_speed.y = self._reflect_on_walls(
+            scaled_y + speed_y * (den - num), speed_y, den
+        )
+        ball_pos.y = scaled_y // den
 
-        # 上下の壁に当たった場合に上下の進行方向を変える
-        if y <= 0 or y >= self.HEIGHT - self.BALL_SIZE:
-            self.ball_speed.y = -self.ball_speed.y
+    def check_collisions(
+        self,
+    ) -> Optional[tuple[PosStruct, int, int, int, int, int]]:
+        """
+        このフレームの移動中にボールが進行方向のパドルに当たるか判定する。
 
-        self.ball_pos = PosStruct(x, y)
+        ボールのパドル側の面がパドルの面に届く時刻を t = num / den (0 <= t <= 1) とし、
+        その時刻のボールの上下がパドルの範囲内であれば衝突とする。
+        小数を使わずに計算するため、時刻tのy座標はden倍した整数(scaled_y)で扱う。
+        既にパドルの面を通り過ぎたボールには当たらないので、同じパドルで何度も反射しない。
 
-    async def check_collisions(self) -> None:
+        Returns:
+            Optional[tuple]: 衝突した場合は
+                (パドルの位置, 衝突時のボールのx座標, num, den, 衝突時のy座標(den倍), 衝突時のy方向の速度)
+                衝突しない場合はNone
         """
-        ボールとパドルの接触判定
-        接触していれば、ボールの進行方向を変える。
+        ball_pos = self.ball_pos
+        ball_speed = self.ball_speed
+        if ball_speed.x < 0:
+            # パドル1（左側プレイヤー）: ボールの左側がパドルの右端に接触
+            paddle_pos = self.paddle1_pos
+            contact_x = paddle_pos.x + self.PADDLE_WIDTH
+            num = ball_pos.x - contact_x
+            den = -ball_speed.x
+        else:
+            # パドル2（右側プレイヤー）: ボールの右側がパドルの左端に接触
+            paddle_pos = self.paddle2_pos
+            contact_x = paddle_pos.x - self.BALL_SIZE
+            num = contact_x - ball_pos.x
+            den = ball_speed.x
+        if not 0 <= num <= den:
+            return None
+
+        scaled_y, speed_y = self._reflect_on_walls(
+            ball_pos.y * den + ball_speed.y * num, ball_speed.y, den
+        )
+        if not self._is_in_vertical_paddle_range(paddle_pos, scaled_y, den):
+            return None
+        return paddle_pos, contact_x, num, den, scaled_y, speed_y
+
+    def reflect_on_paddle(self) -> bool:
         """
+        このフレームの移動中にボールがパドルに当たる場合、ボールの位置は変えずに
+        進行方向だけを反射させる。
+        PongLogic.check_collisions()が以前と同じように状態を変更するためのもの。
 
-        # ボールの上下がパドルの範囲内にあればTrue
-        def _is_in_vertical_paddle_range(paddle_pos: PosStruct) -> bool:
-            paddle_top = paddle_pos.y
-            paddle_bottom = paddle_pos.y + self.PADDLE_HEIGHT
+        Returns:
+            bool: 反射した場合True
+        """
+        impact = self.check_collisions()
+        if impact is None:
+            return False
+        paddle_pos, _, _, den, scaled_y, speed_y = impact
+        self.ball_speed.x = -self.ball_speed.x
+        self.ball_speed.y = self._adjust_reflection_angle(
+            paddle_pos, scaled_y // den, speed_y
+        )
+        return True
 
-            ball_top = self.ball_pos.y
-            ball_bottom = self.ball_pos.y + self.BALL_SIZE
+    def _reflect_on_walls(
+        self, scaled_y: int, speed_y: int, den: int
+    ) -> tuple[int, int]:
+        """
+        上下の壁を超えた分を折り返し、y方向の速度を反転させる。
+        壁にちょうど接触した場合も反転させる。
 
-            return paddle_top <= ball_bottom and ball_top <= paddle_bottom
+        Args:
+            scaled_y (int): den倍したy座標
+            speed_y (int): y方向の速度
+            den (int): scaled_yの倍率
 
-        # パドルのどの部分に当たったかによって反射角度を調整
-        def _adjust_reflection_angle(
-            paddle_pos: PosStruct, ball_speed_y: int
-        ) -> int:
-            # ボールの最大速度を初期値の2倍に設定
-            max_ball_speed_y: Final[int] = self.BALL_SPEED * 2
+        Returns:
+            tuple[int, int]: 折り返した後のy座標(den倍)とy方向の速度
+        """
+        max_y = (self.HEIGHT - self.BALL_SIZE) * den
+        if scaled_y <= 0:
+            return -scaled_y, -speed_y
+        if scaled_y >= max_y:
+            return 2 * max_y - scaled_y, -speed_y
+        return scaled_y, speed_y
+
+    def _is_in_vertical_paddle_range(
+        self, paddle_pos: PosStruct, scaled_y: int, den: int
+    ) -> bool:
+        """
+        ボールの上下がパドルの範囲内にあればTrue
+        座標はどちらもden倍して比較する。
+        """
+        return (
+            paddle_pos.y * den <= scaled_y + self.BALL_SIZE * den
+            and scaled_y <= (paddle_pos.y + self.PADDLE_HEIGHT) * den
+        )
 
-            # ボールの中心とパドルの中心のy座標の差
-            hit_pos_y = (self.ball_pos.y + self.BALL_SIZE // 2) - (
-                paddle_pos.y + self.PADDLE_HEIGHT // 2
-            )
-            # パドルの上部に当たった場合は上方向に、下部に当たった場合は下方向にボールを打ち返す
-            ball_speed_y += hit_pos_y // (self.PADDLE_HEIGHT // 2)
-            # ボールの速度が最大速度を超えないように
-            if abs(self.ball_speed.y) > max_ball_speed_y:
-                self.ball_speed.y = max_ball_speed_y * (
-                    1 if self.ball_speed.y > 0 else -1
-                )
-            return ball_speed_y
-
-        # パドル1（左側プレイヤー）との衝突判定
-        ball_left = self.ball_pos.x
-        paddle1_posright = self.paddle1_pos.x + self.PADDLE_WIDTH
-        if (
-            ball_left <= paddle1_posright  # ボールの左側がパドルの右端に接触
-            and _is_in_vertical_paddle_range(self.paddle1_pos)
-        ):
-            self.ball_speed.x = -self.ball_speed.x
-            self.ball_speed.y = _adjust_reflection_angle(
-                self.paddle1_pos, self.ball_speed.y
-            )
+    def _adjust_reflection_angle(
+        self, paddle_pos: PosStruct, ball_y: int, ball_speed_y: int
+    ) -> int:
+        """
+        パドルのどの部分に当たったかによって反射角度を調整
+        """
+        # ボールの最大速度を初期値の2倍に設定
+        max_ball_speed_y = self.BALL_SPEED * 2
 
-        # パドル2（右側プレイヤー）との衝突判定
-        ball_right = self.ball_pos.x + self.BALL_SIZE
-        paddle2_posleft = self.paddle2_pos.x
-        if (
-            paddle2_posleft <= ball_right  # ボールの右側がパドルの左端に接触
-            and _is_in_vertical_paddle_range(self.paddle2_pos)
-        ):
-            self.ball_speed.x = -self.ball_speed.x
-            self.ball_speed.y = _adjust_reflection_angle(
-                self.paddle2_pos, self.ball_speed.y
+        # ボールの中心とパドルの中心のy座標の差
+        hit_pos_y = (ball_y + self.BALL_SIZE // 2) - (
+            paddle_pos.y + self.PADDLE_HEIGHT // 2
+        )
+        # パドルの上部に当たった場合は上方向に、下部に当たった場合は下方向にボールを打ち返す
+        ball_speed_y += hit_pos_y // (self.PADDLE_HEIGHT // 2)
+        # ボールの速度が最大速度を超えないように
+        if abs(self.ball_speed.y) > max_ball_speed_y:
+            self.ball_speed.y = max_ball_speed_y * (
+                1 if self.ball_speed.y > 0 else -1
             )
+        return ball_speed_y
 
-    async def check_score(self) -> Optional[str]:
+    def check_score(self) -> Optional[str]:
         """
         ボールが得点ラインを超えたか判定
         超えていれば
@@ -176,61 +277,57 @@ class PongLogic:
         Return:
             Optional[str]: "1" | "2" | None 得点したチーム名
         """
-        x, _ = self.ball_pos.x, self.ball_pos.y
+        x = self.ball_pos.x
         if x + self.BALL_SIZE <= 0:
             self.score2 += 1
-            await self.reset_ball()
-            return constants.Team.TWO.value
+            self.reset_ball()
+            return TEAM_TWO
         elif x >= self.WIDTH:
             self.score1 += 1
-            await self.reset_ball()
-            return constants.Team.ONE.value
+            self.reset_ball()
+            return TEAM_ONE
         return None
 
-    async def move_paddle_up(self, team: str) -> None:
+    def move_paddle_up(self, team: str) -> None:
         """
         引数で受け取ったチームのパドルを上に動かす関数
         """
-
-        def _move_paddle_up(paddle_pos: PosStruct) -> None:
-            next_paddle_pos_y: int = paddle_pos.y - self.PADDLE_SPEED
-            paddle_pos.y = max(0, next_paddle_pos_y)
-
-        if team == constants.Team.ONE.value:
-            _move_paddle_up(self.paddle1_pos)
-        elif team == constants.Team.TWO.value:
-            _move_paddle_up(self.paddle2_pos)
-
-    async def move_paddle_down(self, team: str) -> None:
+        if team == TEAM_ONE:
+            paddle_pos = self.paddle1_pos
+        elif team == TEAM_TWO:
+            paddle_pos = self.paddle2_pos
+        else:
+            return
+        paddle_pos.y = max(0, paddle_pos.y - self.PADDLE_SPEED)
+
+    def move_paddle_down(self, team: str) -> None:
         """
         引数で受け取ったチームのパドルを下に動かす関数
         """
+        if team == TEAM_ONE:
+            paddle_pos = self.paddle1_pos
+        elif team == TEAM_TWO:
+            paddle_pos = self.paddle2_pos
+        else:
+            return
+        max_paddle_posbottom = self.HEIGHT - self.PADDLE_HEIGHT
+        paddle_pos.y = min(
+            max_paddle_posbottom, paddle_pos.y + self.PADDLE_SPEED
+        )
 
-        def _move_paddle_down(paddle_pos: PosStruct) -> None:
-            max_paddle_posbottom: int = self.HEIGHT - self.PADDLE_HEIGHT
-
-            next_paddle_pos_y: int = paddle_pos.y + self.PADDLE_SPEED
-            paddle_pos.y = min(max_paddle_posbottom, next_paddle_pos_y)
-
-        if team == constants.Team.ONE.value:
-            _move_paddle_down(self.paddle1_pos)
-        elif team == constants.Team.TWO.value:
-            _move_paddle_down(self.paddle2_pos)
-
-    async def reset_ball(self) -> None:
+    def reset_ball(self) -> None:
         """
         ボールを開始位置に動かす関数
         """
-        self.ball_pos = PosStruct(
-            x=self.WIDTH // 2 - self.BALL_SIZE // 2,
-            y=self.HEIGHT // 2 - self.BALL_SIZE // 2,
-        )
+        self.ball_pos.x = self.WIDTH // 2 - self.BALL_SIZE // 2
+        self.ball_pos.y = self.HEIGHT // 2 - self.BALL_SIZE // 2
 
         # ボールをランダムな4方向に動き出させる
-        self.ball_speed.x = self.BALL_SPEED * random.choice([-1, 1])
-        self.ball_speed.y = self.BALL_SPEED * random.choice([-1, 1])
+        rng = self.rng if self.rng is not None else random
+        self.ball_speed.x = self.BALL_SPEED * rng.choice([-1, 1])
+        self.ball_speed.y = self.BALL_SPEED * rng.choice([-1, 1])
 
-    async def game_end(self) -> bool:
+    def game_end(self) -> bool:
         """
         ゲームが終了したか判定する関数
         """
@@ -239,7 +336,7 @@ class PongLogic:
             or self.score2 >= self.WINNING_SCORE
         )
 
-    async def get_winner(self) -> str:
+    def get_winner(self) -> str:
         """
         ゲームの勝利チームを返す関数
 
@@ -247,5 +344,91 @@ class PongLogic:
             str: "1" | "2" 勝利したチーム名
         """
         if self.score1 > self.score2:
-            return constants.Team.ONE.value
-        return constants.Team.TWO.value
+            return TEAM_ONE
+        return TEAM_TWO
+
+
+class PongLogic:
+    """
+    PongCoreを非同期関数として呼び出すための互換用クラス。
+    ロジックは全てPongCoreが担当し、このクラスは処理を委譲するだけ。
+
+    新しく書くコードはPongCoreを直接使う。
+    """
+
+    # クラス定数
+    HEIGHT: Final[int] = PongCore.HEIGHT
+    WIDTH: Final[int] = PongCore.WIDTH
+    PADDLE_POS_FROM_GOAL: Final[int] = PongCore.PADDLE_POS_FROM_GOAL
+    PADDLE_HEIGHT: Final[int] = PongCore.PADDLE_HEIGHT
+    PADDLE_WIDTH: Final[int] = PongCore.PADDLE_WIDTH
+    PADDLE_SPEED: Final[int] = PongCore.PADDLE_SPEED
+    BALL_SIZE: Final[int] = PongCore.BALL_SIZE
+    BALL_SPEED: Final[int] = PongCore.BALL_SPEED
+    FPS: Final[float] = PongCore.FPS
+    WINNING_SCORE: Final[int] = PongCore.WINNING_SCORE
+
+    def __init__(self, core: Optional[PongCore] = None) -> None:
+        """
+        Args:
+            core (Optional[PongCore]): 操作するPongCore、Noneなら新しく作成する
+        """
+        self.core = core if core is not None else PongCore()
+
+    def __str__(self) -> str:
+        return str(self.core).replace("PongCore", "PongLogic", 1)
+
+    def __repr__(self) -> str:
+        return repr(self.core).replace("PongCore", "PongLogic", 1)
+
+    @property
+    def paddle1_pos(self) -> PosStruct:
+        return self.core.paddle1_pos
+
+    @property
+    def paddle2_pos(self) -> PosStruct:
+        return self.core.paddle2_pos
+
+    @property
+    def ball_pos(self) -> PosStruct:
+        return self.core.ball_pos
+
+    @property
+    def ball_speed(self) -> PosStruct:
+        return self.core.ball_speed
+
+    @property
+    def score1(self) -> int:
+        return self.core.score1
+
+    @property
+    def score2(self) -> int:
+        return self.core.score2
+
+    async def update_game_state(self) -> Optional[str]:
+        return self.core.update_game_state()
+
+    async def move_ball(self) -> None:
+        self.core.move_ball()
+
+    async def check_collisions(self) -> None:
+        # 以前と同じく、パドルに当たる場合はボールの進行方向を変える
+        self.core.reflect_on_paddle()
+
+    async def check_score(self) -> Optional[str]:
+        return self.core.check_score()
+
+    async def move_paddle_up(self, team: str) -> None:
+        self.core.move_paddle_up(team)
+
+    async def move_paddle_down(self, team: str) -> None:
+        self.core.move_paddle_down(team)
+
+    async def reset_ball(self) -> None:
+        self.core.reset_ball()
+
+    async def game_end(self) -> bool:
+        return self.core.game_end()
+
+    async def get_winner(self) -> str:
+        return self.core.get_winner()
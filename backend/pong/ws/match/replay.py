@@ -0,0 +1,196 @@
+import collections
+import dataclasses
+import random
+import struct
+from typing import Final, Iterator, Optional
+
+from . import constants as match_constants
+from .pong_logic import PongCore
+
+# リプレイファイルのヘッダー (リトルエンディアン、17バイト)
+#   4s     マジックナンバー
+#   uint8  フォーマットのバージョン
+#   uint64 試合の乱数シード
+#   uint32 試合の総ティック数
+MAGIC: Final[bytes] = b"PONG"
+VERSION: Final[int] = 1
+HEADER: Final[struct.Struct] = struct.Struct("<4sBQI")
+
+# 入力1件は (前の入力からのティック数 << 2 | 入力コード) をLEB128の可変長整数で表す。
+# 同じティックか直後のティックの入力は1バイトで記録できる。
+INPUT_CODE_BITS: Final[int] = 2
+INPUT_CODES: Final[dict[tuple[str, str], int]] = {
+    (match_constants.Team.ONE.value, match_constants.Move.UP.value): 0,
+    (match_constants.Team.ONE.value, match_constants.Move.DOWN.value): 1,
+    (match_constants.Team.TWO.value, match_constants.Move.UP.value): 2,
+    (match_constants.Team.TWO.value, match_constants.Move.DOWN.value): 3,
+}
+INPUTS: Final[dict[int, tuple[str, str]]] = {
+    code: team_move for team_move, code in INPUT_CODES.items()
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class PaddleInput:
+    """
+    パドルの入力1件。tickティック進めた後、次のティックの前に適用された入力。
+    """
+
+    tick: int
+    team: str
+    move: str
+
+
+class InputLog:
+    """
+    試合中のパドル入力を追記していくバイナリログ。
+    フレームではなく入力だけを記録し、シードと合わせて再シミュレーションで試合を再現する。
+    """
+
+    def __init__(self, seed: int) -> None:
+        """
+        Args:
+            seed (int): 試合のPongCoreに渡したrandom.Randomのシード
+        """
+        self.seed = seed
+        self.buffer = bytearray()
+        self.last_tick: int = 0
+        self.num_inputs: int = 0
+
+    def __str__(self) -> str:
+        return (
+            f"InputLog(seed={self.seed}, inputs={self.num_inputs}, "
+            f"bytes={len(self.buffer)})"
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"InputLog(seed={self.seed!r}, num_inputs={self.num_inputs!r}, "
+            f"last_tick={self.last_tick!r})"
+        )
+
+    def append(self, tick: int, team: str, move: str) -> None:
+        """
+        入力を1件追記する。tickは単調増加でなければならない。
+
+        Args:
+            tick (int): 入力を受け取るまでに進んだティック数
+            team (str): "1" | "2" チーム名
+            move (str): "UP" | "DOWN"
+        """
+        code = INPUT_CODES.get((team, move))
+        if code is None:
+            return
+        if tick < self.last_tick:
+            raise ValueError("tick must not go backwards")
+        _write_varint(
+            self.buffer, (tick - self.last_tick) << INPUT_CODE_BITS | code
+        )
+        self.last_tick = tick
+        self.num_inputs += 1
+
+    def to_bytes(self, tick_count: int) -> bytes:
+        """
+        ヘッダーを付けてリプレイファイルの内容を返す。
+
+        Args:
+            tick_count (int): 試合の総ティック数
+        """
+        return HEADER.pack(MAGIC, VERSION, self.seed, tick_count) + self.buffer
+
+
+@dataclasses.dataclass(frozen=True)
+class Replay:
+    """
+    リプレイファイルを読み込んだ結果
+    """
+
+    seed: int
+    tick_count: int
+    inputs: list[PaddleInput]
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Replay":
+        """
+        InputLog.to_bytes()で作成したデータを読み込む。
+
+        Raises:
+            ValueError: 形式が不正な場合
+        """
+        if len(data) < HEADER.size:
+            raise ValueError("replay is too short")
+        magic, version, seed, tick_count = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("unsupported replay format")
+
+        inputs = []
+        tick = 0
+        offset = HEADER.size
+        while offset < len(data):
+            value, offset = _read_varint(data, offset)
+            tick += value >> INPUT_CODE_BITS
+            team, move = INPUTS[value & ((1 << INPUT_CODE_BITS) - 1)]
+            inputs.append(PaddleInput(tick, team, move))
+        return cls(seed, tick_count, inputs)
+
+    def frames(self, end: Optional[int] = None) -> Iterator[PongCore]:
+        """
+        試合を最初から再シミュレーションし、1ティックごとの状態を返す。
+        nティック目の状態は、nティック進めた直後(その後の入力を適用する前)の状態。
+        最初に返すのは0ティック目(試合開始時)の状態。
+        返すPongCoreは同じインスタンスを書き換えたものなので、必要であれば値をコピーする。
+
+        Args:
+            end (Optional[int]): 最後に返すティック、Noneなら試合の総ティック数
+        """
+        end = self.tick_count if end is None else min(end, self.tick_count)
+        core = PongCore(rng=random.Random(self.seed))
+        inputs = iter(self.inputs)
+        next_input = next(inputs, None)
+        tick = 0
+        while True:
+            yield core
+            if tick >= end or core.game_end():
+                return
+            # 次のティックまでに届いた入力を適用してから1ティック進める
+            while next_input is not None and next_input.tick <= tick:
+                if next_input.move == match_constants.Move.UP.value:
+                    core.move_paddle_up(next_input.team)
+                else:
+                    core.move_paddle_down(next_input.team)
+                next_input = next(inputs, None)
+            core.update_game_state()
+            tick += 1
+
+    def frame_at(self, tick: int) -> PongCore:
+        """
+        指定したティックの状態を再シミュレーションで求める。
+        """
+        return collections.deque(self.frames(tick), maxlen=1)[0]
+
+
+def _write_varint(buffer: bytearray, value: int) -> None:
+    """
+    0以上の整数をLEB128の可変長整数として追記する。
+    """
+    while value >= 0x80:
+        buffer.append(value & 0x7F | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varint(data: bytes, offset: int) -> tuple[int, int]:
+    """
+    LEB128の可変長整数を読み込み、値と次の位置を返す。
+    """
+    value = 0
+    shift = 0
+    while True:
+        if offset >= len(data):
+            raise ValueError("truncated varint")
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
@@ -0,0 +1,217 @@
+import asyncio
+import dataclasses
+import logging
+from typing import Final, Optional
+
+from . import async_db_service as match_service
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass(frozen=True)
+class PendingScore:
+    """
+    DBへの書き込みを待っているスコア
+    """
+
+    match_id: int
+    user_id: int
+    pos_x: int
+    pos_y: int
+    attempts: int = 0
+
+
+class ScoreSink:
+    """
+    プロセス内の全マッチのスコアをまとめてDBに書き込むクラス(write-behind)。
+
+    得点ごとにスレッドとトランザクションを使う代わりに、スコアをバッファに溜めて
+    bulk_createでまとめて作成する。次のどれかでバッファを書き込む。
+        - バッファのスコア数がflush_sizeに達した時
+        - 最初のスコアを受け取ってからflush_interval秒経った時
+        - 試合が終了した時(flush_match)
+        - プロセスの終了時(close、イベントループが止まった後はdrain)
+
+    (match_id, user_id)ごとの参加情報のidはキャッシュし、試合終了時に破棄する。
+    書き込みに失敗したスコアはMAX_ATTEMPTS回まで次の書き込みで再試行する。
+    """
+
+    FLUSH_SIZE: Final[int] = 100
+    FLUSH_INTERVAL: Final[float] = 1.0
+    MAX_ATTEMPTS: Final[int] = 3
+
+    def __init__(
+        self,
+        flush_size: int = FLUSH_SIZE,
+        flush_interval: float = FLUSH_INTERVAL,
+    ) -> None:
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.pending: list[PendingScore] = []
+        # { (match_id, user_id): participation_id }
+        self.participation_ids: dict[tuple[int, int], int] = {}
+        self.timer: Optional[asyncio.Task] = None
+        self.background_flushes: set[asyncio.Task] = set()
+        self.flush_lock = asyncio.Lock()
+
+        # 計測値
+        self.flush_count: int = 0
+        self.flushed_scores: int = 0
+        self.retried_scores: int = 0
+        self.failed_scores: int = 0
+
+    def __str__(self) -> str:
+        return (
+            f"ScoreSink(pending={len(self.pending)}, "
+            f"flushed_scores={self.flushed_scores})"
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"ScoreSink(flush_size={self.flush_size!r}, "
+            f"flush_interval={self.flush_interval!r}, stats={self.stats()!r})"
+        )
+
+    def add(self, match_id: int, user_id: int, pos_x: int, pos_y: int) -> None:
+        """
+        スコアをバッファに追加する。DBへの書き込みは待たない。
+        """
+        self.pending.append(PendingScore(match_id, user_id, pos_x, pos_y))
+        if len(self.pending) >= self.flush_size:
+            self._flush_in_background()
+        else:
+            self._start_timer()
+
+    async def flush(self) -> None:
+        """
+        バッファのスコアを全てDBに書き込む。
+        同時に呼ばれた場合は順番に実行する。
+        """
+        async with self.flush_lock:
+            if not self.pending:
+                return
+            batch, self.pending = self.pending, []
+            result = await match_service.bulk_create_scores(
+                *self._bulk_create_args(batch)
+            )
+            if not self._record_result(batch, result):
+                self._requeue(batch)
+
+    async def flush_match(self, match_id: int) -> None:
+        """
+        試合終了時に呼び出す。バッファを書き込み、試合の参加情報のキャッシュを破棄する。
+        """
+        await self.flush()
+        for key in [
+            key for key in self.participation_ids if key[0] == match_id
+        ]:
+            del self.participation_ids[key]
+
+    async def close(self) -> None:
+        """
+        プロセスの終了時に呼び出す。実行中の書き込みを待ち、残りのスコアを全て書き込む。
+        """
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        await asyncio.gather(*self.background_flushes, return_exceptions=True)
+        await self.flush()
+
+    def drain(self) -> None:
+        """
+        イベントループが止まった後のプロセスの終了時(atexitやSIGTERM)に呼び出す。
+        残りのスコアを同期的に全て書き込む。失敗したスコアは再試行せずに破棄する。
+        """
+        batch, self.pending = self.pending, []
+        if not batch:
+            return
+        result = match_service.bulk_create_scores_sync(
+            *self._bulk_create_args(batch)
+        )
+        if not self._record_result(batch, result):
+            self.failed_scores += len(batch)
+
+    def stats(self) -> dict:
+        """
+        書き込みの計測値を返す。
+        """
+        return {
+            "pending": len(self.pending),
+            "flush_count": self.flush_count,
+            "flushed_scores": self.flushed_scores,
+            "retried_scores": self.retried_scores,
+            "failed_scores": self.failed_scores,
+        }
+
+    def _bulk_create_args(
+        self, batch: list[PendingScore]
+    ) -> tuple[list[tuple[int, int, int, int]], dict[tuple[int, int], int]]:
+        keys = {(score.match_id, score.user_id) for score in batch}
+        return (
+            [
+                (score.match_id, score.user_id, score.pos_x, score.pos_y)
+                for score in batch
+            ],
+            {
+                key: self.participation_ids[key]
+                for key in keys
+                if key in self.participation_ids
+            },
+        )
+
+    def _record_result(
+        self,
+        batch: list[PendingScore],
+        result: match_service.BulkCreateScoresResult,
+    ) -> bool:
+        """
+        書き込みの結果を計測値と参加情報のキャッシュに反映する。
+        書き込みに失敗した場合はFalseを返す。
+        """
+        self.flush_count += 1
+        if result.is_error:
+            logger.error(f"Error: {result.unwrap_error()}")
+            return False
+
+        value = result.unwrap()
+        self.participation_ids.update(value["participation_ids"])
+        self.flushed_scores += value["created"]
+        if value["skipped"]:
+            self.failed_scores += value["skipped"]
+            logger.error(
+                f"Skipped {value['skipped']} scores without participation"
+            )
+        return True
+
+    def _requeue(self, batch: list[PendingScore]) -> None:
+        """
+        書き込みに失敗したスコアを再試行するためにバッファの先頭に戻す。
+        MAX_ATTEMPTS回失敗したスコアは破棄する。
+        """
+        retry = [
+            dataclasses.replace(score, attempts=score.attempts + 1)
+            for score in batch
+            if score.attempts + 1 < self.MAX_ATTEMPTS
+        ]
+        self.retried_scores += len(retry)
+        self.failed_scores += len(batch) - len(retry)
+        self.pending = retry + self.pending
+        if self.pending:
+            self._start_timer()
+
+    def _start_timer(self) -> None:
+        if self.timer is None or self.timer.done():
+            self.timer = asyncio.create_task(self._flush_after_interval())
+
+    async def _flush_after_interval(self) -> None:
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    def _flush_in_background(self) -> None:
+        task = asyncio.create_task(self.flush())
+        self.background_flushes.add(task)
+        task.add_done_callback(self.background_flushes.discard)
+
+
+# === グローバルな ScoreSink インスタンス ===
+global_score_sink = ScoreSink()
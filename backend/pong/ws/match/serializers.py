@@ -16,6 +16,13 @@ class MatchInputINITSerializer(ws_serializers.BaseWebsocketSerializer):
         choices=[(mode.value, mode.name) for mode in match_constants.Mode],
     )
     match_id = serializers.IntegerField(required=False)
+    protocol = serializers.ChoiceField(
+        choices=[
+            (protocol.value, protocol.name)
+            for protocol in match_constants.Protocol
+        ],
+        required=False,
+    )
 
 
 class MatchInputREADYSerializer(ws_serializers.BaseWebsocketSerializer):
@@ -47,6 +54,21 @@ class MatchInputENDSerializer(ws_serializers.BaseWebsocketSerializer):
     pass  # ENDステージは空のスキーマ
 
 
+class MatchInputSPECTATESerializer(ws_serializers.BaseWebsocketSerializer):
+    """
+    MATCHイベントのSPECTATEステージのメッセージスキーマをバリデーションするために使うクラス
+    """
+
+    match_id = serializers.IntegerField()
+    protocol = serializers.ChoiceField(
+        choices=[
+            (protocol.value, protocol.name)
+            for protocol in match_constants.Protocol
+        ],
+        required=False,
+    )
+
+
 class MatchInputSerializer(ws_serializers.BaseWebsocketSerializer):
     """
     MATCHイベントで共通のメッセージスキーマをバリデーションするために使うクラス
@@ -80,6 +102,7 @@ class MatchInputSerializer(ws_serializers.BaseWebsocketSerializer):
             match_constants.Stage.READY.value: MatchInputREADYSerializer,
             match_constants.Stage.PLAY.value: MatchInputPLAYSerializer,
             match_constants.Stage.END.value: MatchInputENDSerializer,
+            match_constants.Stage.SPECTATE.value: MatchInputSPECTATESerializer,
         }
 
         serializer_class = stage_serializer.get(stage)
@@ -5,17 +5,22 @@ import pytest_asyncio
 from channels.db import database_sync_to_async  # type: ignore
 from django.contrib.auth.models import User
 
+from accounts.player import rating
 from accounts.player.models import Player
 from matches.constants import MatchFields, ParticipationFields, ScoreFields
 from matches.match.models import Match
 from matches.participation.models import Participation
+from matches.score.models import Score
 from tournaments.constants import RoundFields, TournamentFields
 from tournaments.round.models import Round
 from tournaments.tournament.models import Tournament
 from ws.match.async_db_service import (
+    bulk_create_scores,
     create_match,
     create_participation,
+    create_round_matches,
     create_score,
+    update_match_replay,
     update_match_status,
     update_participation_is_win,
 )
@@ -124,6 +129,33 @@ async def test_update_match_status(
     assert match.status == status
 
 
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.asyncio
+async def test_update_match_replay(
+    tournament_and_round: tuple[Tournament, Round],
+) -> None:
+    tournament, round_instance = tournament_and_round
+
+    # 試合を作成
+    match = await database_sync_to_async(Match.objects.create)(
+        round_id=round_instance.id
+    )
+
+    # update_match_replayを呼び出し、リプレイを保存
+    replay = b"PONG\x01" + bytes(12) + b"\x00\x05"
+    result = await update_match_replay(match.id, replay)
+
+    # 結果の検証
+    assert result.is_ok
+    assert result.unwrap()[MatchFields.REPLAY] == len(replay)
+    await database_sync_to_async(match.refresh_from_db)()
+    assert bytes(match.replay) == replay
+
+    # 存在しない試合
+    result = await update_match_replay(match.id + 1, replay)
+    assert result.is_error
+
+
 @pytest.mark.django_db(transaction=True)
 @pytest.mark.asyncio
 async def test_create_participation(
@@ -218,3 +250,164 @@ async def test_create_score(
     assert result_value[ScoreFields.MATCH_PARTICIPATION_ID] == participation.id
     assert result_value[ScoreFields.POS_X] == 0
     assert result_value[ScoreFields.POS_Y] == 120
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.asyncio
+async def test_bulk_create_scores(
+    tournament_and_round: tuple[Tournament, Round],
+    user_and_player: tuple[User, Player],
+) -> None:
+    tournament, round_instance = tournament_and_round
+    user, player = user_and_player
+
+    match = await database_sync_to_async(Match.objects.create)(
+        round_id=round_instance.id
+    )
+    participation = await database_sync_to_async(Participation.objects.create)(
+        match_id=match.id,
+        player=player,
+        team=ParticipationFields.TeamEnum.ONE.value,
+        is_win=False,
+    )
+
+    # 参加情報がキャッシュにない場合はまとめて取得して返す
+    result = await bulk_create_scores(
+        [(match.id, user.id, 0, 10), (match.id, user.id, 0, 20)], {}
+    )
+    assert result.is_ok
+    assert result.unwrap() == {
+        "created": 2,
+        "skipped": 0,
+        "participation_ids": {(match.id, user.id): participation.id},
+    }
+
+    # キャッシュ済みの参加情報は取得しない。参加していないユーザーのスコアは作成しない
+    result = await bulk_create_scores(
+        [(match.id, user.id, 600, 30), (match.id, user.id + 1, 0, 40)],
+        {(match.id, user.id): participation.id},
+    )
+    assert result.is_ok
+    assert result.unwrap() == {
+        "created": 1,
+        "skipped": 1,
+        "participation_ids": {},
+    }
+
+    scores = await database_sync_to_async(
+        lambda: list(
+            Score.objects.filter(match_participation=participation)
+            .order_by("id")
+            .values_list("pos_x", "pos_y")
+        )
+    )()
+    assert scores == [(0, 10), (0, 20), (600, 30)]
+
+
+@mock.patch(
+    "accounts.player.identicon.generate_identicon",
+    return_value="avatars/test.png",
+)
+@database_sync_to_async
+def create_users_and_players(
+    num_users: int, mock_identicon: mock.MagicMock
+) -> list[User]:
+    """
+    テストの前処理として使用する関数
+    num_users人のユーザーとプレーヤーを作成
+    """
+    users = []
+    for i in range(num_users):
+        user = User.objects.create(
+            username=f"round_test{i}",
+            email=f"round_test{i}@example.com",
+            password=f"round_test{i}_password",
+        )
+        Player.objects.create(user=user)
+        users.append(user)
+    return users
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.asyncio
+async def test_create_round_matches(
+    tournament_and_round: tuple[Tournament, Round],
+) -> None:
+    """
+    ラウンドの全ての試合と参加レコードがまとめて作成されるかテスト
+    """
+    tournament, round_instance = tournament_and_round
+    users = await create_users_and_players(4)  # type: ignore
+    matchups = [(users[0].id, users[1].id), (users[2].id, users[3].id)]
+
+    result = await create_round_matches(round_instance.id, matchups)
+
+    assert result.is_ok
+    match_ids = result.unwrap()["match_ids"]
+    assert len(match_ids) == 2
+    participations = await database_sync_to_async(
+        lambda: list(
+            Participation.objects.filter(match_id__in=match_ids)
+            .order_by("match_id", "team")
+            .values_list("match_id", "player__user_id", "team")
+        )
+    )()
+    assert participations == [
+        (match_ids[0], users[0].id, ParticipationFields.TeamEnum.ONE.value),
+        (match_ids[0], users[1].id, ParticipationFields.TeamEnum.TWO.value),
+        (match_ids[1], users[2].id, ParticipationFields.TeamEnum.ONE.value),
+        (match_ids[1], users[3].id, ParticipationFields.TeamEnum.TWO.value),
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.asyncio
+async def test_create_round_matches_with_unknown_player(
+    tournament_and_round: tuple[Tournament, Round],
+) -> None:
+    """
+    存在しないプレーヤーが含まれる場合は何も作成しないかテスト
+    """
+    tournament, round_instance = tournament_and_round
+    users = await create_users_and_players(1)  # type: ignore
+
+    result = await create_round_matches(
+        round_instance.id, [(users[0].id, users[0].id + 100)]
+    )
+
+    assert result.is_error
+    assert "DoesNotExist" in result.unwrap_error()
+    assert not await Match.objects.filter(round=round_instance).aexists()
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.asyncio
+async def test_update_participation_is_win_updates_ratings(
+    tournament_and_round: tuple[Tournament, Round],
+) -> None:
+    """
+    勝者が確定した時に両者のレーティングが1度だけ更新されるかテスト
+    """
+    tournament, round_instance = tournament_and_round
+    users = await create_users_and_players(2)  # type: ignore
+    result = await create_round_matches(
+        round_instance.id, [(users[0].id, users[1].id)]
+    )
+    match_id = result.unwrap()["match_ids"][0]
+    expected = rating.updated_ratings(
+        rating.INITIAL_RATING, 0, rating.INITIAL_RATING, 0
+    )
+
+    # 同じ試合で2回呼ばれてもレーティングは1度だけ更新される
+    for _ in range(2):
+        result = await update_participation_is_win(match_id, users[0].id)
+        assert result.is_ok
+
+    players = await database_sync_to_async(
+        lambda: list(
+            Player.objects.filter(user__in=users)
+            .order_by("user_id")
+            .values_list("rating", "rated_matches")
+        )
+    )()
+    assert players == [(expected[0], 1), (expected[1], 1)]
@@ -0,0 +1,39 @@
+import pathlib
+import subprocess
+import sys
+
+from ws.match.benchmarks import headless
+
+MANAGE_PY = pathlib.Path(__file__).resolve().parents[3] / "manage.py"
+
+
+def test_bench_matches_command_runs() -> None:
+    """
+    bench_matchesコマンドが少ない試合数で最後まで実行できるかテスト
+    importの順番による循環importも確認するため、新しいプロセスで実行する
+    """
+    result = subprocess.run(
+        [
+            sys.executable,
+            str(MANAGE_PY),
+            "bench_matches",
+            "--matches",
+            "2",
+            "--ticks",
+            "3",
+            "--duration",
+            "0.05",
+        ],
+        cwd=MANAGE_PY.parent,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+    assert result.returncode == 0, result.stderr
+    lines = result.stdout.splitlines()
+    assert lines[0] == headless.BenchResult.header()
+    assert [line.split()[:2] for line in lines[1:]] == [
+        ["max", "2"],
+        ["realtime", "2"],
+    ]
@@ -0,0 +1,121 @@
+import asyncio
+import time
+
+import pytest
+
+from ws.match.game_clock import GameClock, TickCallback
+
+
+@pytest.mark.asyncio
+async def test_registered_callbacks_are_called_on_same_tick() -> None:
+    """
+    登録された全てのコールバックが同じティックで呼び出されるかテスト
+    """
+    clock = GameClock(tick_interval=0.01)
+    calls: dict[int, int] = {1: 0, 2: 0}
+
+    def make_callback(key: int) -> TickCallback:
+        def callback(steps: int) -> None:
+            calls[key] += steps
+
+        return callback
+
+    clock.register(1, make_callback(1))
+    clock.register(2, make_callback(2))
+    await asyncio.sleep(0.1)
+    clock.unregister(1)
+    clock.unregister(2)
+
+    assert calls[1] > 0
+    assert calls[1] == calls[2]
+    assert clock.stats()["tick_count"] == calls[1]
+
+
+@pytest.mark.asyncio
+async def test_loop_stops_when_no_subscribers() -> None:
+    """
+    登録がなくなったらループが終了するかテスト
+    """
+    clock = GameClock(tick_interval=0.01)
+
+    def callback(steps: int) -> None:
+        pass
+
+    clock.register(1, callback)
+    await asyncio.sleep(0.05)
+    clock.unregister(1)
+    await asyncio.sleep(0.05)
+
+    assert clock.task is not None
+    assert clock.task.done()
+
+
+@pytest.mark.asyncio
+async def test_catch_up_and_overrun() -> None:
+    """
+    処理が遅れた場合に遅れたフレーム数がまとめて渡され、オーバーランが記録されるかテスト
+    """
+    clock = GameClock(tick_interval=0.01)
+    received_steps: list[int] = []
+
+    def slow_callback(steps: int) -> None:
+        received_steps.append(steps)
+        if len(received_steps) == 1:
+            # 3ティック分ブロックする
+            time.sleep(0.03)
+
+    clock.register(1, slow_callback)
+    await asyncio.sleep(0.1)
+    clock.unregister(1)
+
+    assert clock.stats()["overrun_count"] >= 1
+    assert max(received_steps) > 1
+    assert max(received_steps) <= GameClock.MAX_CATCH_UP_TICKS
+
+
+@pytest.mark.asyncio
+async def test_callback_error_does_not_stop_other_callbacks() -> None:
+    """
+    1つのコールバックが例外を投げても他のコールバックは呼び出され続けるかテスト
+    """
+    clock = GameClock(tick_interval=0.01)
+    calls = 0
+
+    def error_callback(steps: int) -> None:
+        raise ValueError("error")
+
+    def callback(steps: int) -> None:
+        nonlocal calls
+        calls += steps
+
+    clock.register(1, error_callback)
+    clock.register(2, callback)
+    await asyncio.sleep(0.05)
+    clock.unregister(1)
+    clock.unregister(2)
+
+    assert calls > 0
+
+
+@pytest.mark.asyncio
+async def test_skipped_ticks_resume_at_next_interval() -> None:
+    """
+    遅れすぎてティックを破棄した場合、まとめて進めた後は次のティックまで1間隔待つかテスト
+    """
+    clock = GameClock(tick_interval=0.01)
+    loop = asyncio.get_running_loop()
+    called_at: list[float] = []
+
+    def blocking_callback(steps: int) -> None:
+        called_at.append(loop.time())
+        if len(called_at) == 1:
+            # MAX_CATCH_UP_TICKSを超えてブロックする
+            time.sleep(0.1)
+
+    clock.register(1, blocking_callback)
+    await asyncio.sleep(0.15)
+    clock.unregister(1)
+
+    assert clock.stats()["skipped_ticks"] > 0
+    # called_at[1]がまとめて進めたティックで、その次は1間隔後になる
+    assert called_at[2] - called_at[1] >= 0.01 * 0.9
@@ -0,0 +1,181 @@
+import asyncio
+import collections
+from unittest import mock
+
+import pytest
+from channels.layers import InMemoryChannelLayer  # type: ignore
+
+from matches import constants as match_db_constants
+from utils.result import Result
+from ws.match import constants as match_constants
+from ws.match import manager_registry
+from ws.match.game_worker import (
+    GameWorkerClient,
+    GameWorkerConsumer,
+    HashRing,
+    RemoteMatchManager,
+    worker_channel_for,
+    worker_channels,
+)
+from ws.share.player_data import PlayerData
+
+PLAYER1 = PlayerData(channel_name="player1", user_id=1, participation_name="1")
+PLAYER2 = PlayerData(channel_name="player2", user_id=2, participation_name="2")
+
+
+def test_hash_ring_spreads_matches_across_workers() -> None:
+    """
+    試合がgame workerに偏りなく割り当てられるかテスト
+    """
+    ring = HashRing(worker_channels(4))
+    counts = collections.Counter(
+        ring.get(match_id) for match_id in range(4000)
+    )
+
+    assert set(counts) == set(worker_channels(4))
+    assert min(counts.values()) > 4000 / 4 * 0.5
+
+
+def test_hash_ring_moves_few_matches_when_a_worker_is_added() -> None:
+    """
+    game workerを増やしても担当が変わる試合が一部だけかテスト
+    """
+    before = HashRing(worker_channels(4))
+    after = HashRing(worker_channels(5))
+    moved = sum(
+        before.get(match_id) != after.get(match_id) for match_id in range(4000)
+    )
+
+    assert moved < 4000 * 0.4
+
+
+def test_worker_channel_for_uses_settings(settings) -> None:  # type: ignore
+    settings.GAME_WORKERS = 3
+    assert worker_channel_for(42) == HashRing(worker_channels(3)).get(42)
+
+
+@pytest.mark.asyncio
+async def test_remote_match_manager_waits_for_result(settings) -> None:  # type: ignore
+    """
+    RemoteMatchManagerが担当のgame workerで試合を開始し、結果を受け取るかテスト
+    """
+    settings.GAME_WORKERS = 2
+    layer = InMemoryChannelLayer()
+    manager = RemoteMatchManager(1, PLAYER1, PLAYER2, channel_layer=layer)
+    run_task = asyncio.create_task(manager.run())
+
+    start = await asyncio.wait_for(layer.receive(worker_channel_for(1)), 1)
+    assert start["type"] == "match.start"
+    assert start[match_constants.MATCH_ID] == 1
+    assert start["player2"] == {
+        "channel_name": "player2",
+        "user_id": 2,
+        "participation_name": "2",
+    }
+
+    await layer.send(start["reply_channel"], {"type": "match.started"})
+    await layer.send(start["reply_channel"], {"type": "match.score"})
+    await layer.send(
+        start["reply_channel"],
+        {"type": "match.result", "winner": start["player2"]},
+    )
+    assert await asyncio.wait_for(run_task, 1) == PLAYER2
+
+
+@pytest.mark.asyncio
+async def test_remote_match_manager_cancels_when_worker_does_not_start(  # type: ignore
+    settings,
+) -> None:
+    """
+    game workerが試合を開始しない場合に、試合を中止してNoneを返すかテスト
+    """
+    settings.GAME_WORKERS = 2
+    layer = InMemoryChannelLayer()
+    manager = RemoteMatchManager(
+        1, PLAYER1, PLAYER2, channel_layer=layer, start_timeout=0.01
+    )
+    with mock.patch(
+        "ws.match.async_db_service.update_match_status",
+        new=mock.AsyncMock(return_value=Result.ok({})),
+    ) as update_match_status:
+        assert await asyncio.wait_for(manager.run(), 1) is None
+
+    update_match_status.assert_awaited_once_with(
+        1, match_db_constants.MatchFields.StatusEnum.CANCELED.value
+    )
+
+
+@pytest.mark.asyncio
+async def test_slow_exit_does_not_block_inputs() -> None:
+    """
+    game workerで時間のかかる退出の処理が、他の試合の入力を止めないかテスト
+    """
+    consumer = GameWorkerConsumer()
+    release = asyncio.Event()
+    other_match = mock.MagicMock()
+
+    async def exit_match(match_id: int, player: PlayerData) -> None:
+        await release.wait()
+
+    with (
+        mock.patch.object(
+            manager_registry.global_registry, "exit_match", new=exit_match
+        ),
+        mock.patch.object(
+            manager_registry.global_registry,
+            "get_match",
+            new=mock.AsyncMock(return_value=other_match),
+        ),
+    ):
+        await asyncio.wait_for(
+            consumer.match_exit(
+                {
+                    match_constants.MATCH_ID: 1,
+                    "player": {
+                        "channel_name": "player1",
+                        "user_id": 1,
+                        "participation_name": "1",
+                    },
+                }
+            ),
+            0.1,
+        )
+        await asyncio.wait_for(
+            consumer.match_input(
+                {
+                    match_constants.MATCH_ID: 2,
+                    match_constants.Team.key(): match_constants.Team.ONE.value,
+                    match_constants.Move.key(): match_constants.Move.UP.value,
+                }
+            ),
+            0.1,
+        )
+        other_match.push_input.assert_called_once_with(
+            match_constants.Team.ONE.value, match_constants.Move.UP.value
+        )
+        assert len(consumer.background_tasks) == 1
+
+        release.set()
+        await asyncio.gather(*consumer.background_tasks)
+
+    assert consumer.background_tasks == set()
+
+
+@pytest.mark.asyncio
+async def test_client_forwards_inputs_to_owning_worker(settings) -> None:  # type: ignore
+    """
+    GameWorkerClientが入力を試合を担当するgame workerに送るかテスト
+    """
+    settings.GAME_WORKERS = 2
+    layer = InMemoryChannelLayer()
+    client = GameWorkerClient(channel_layer=layer)
+
+    await client.paddle_up(7, match_constants.Team.ONE.value)
+    message = await asyncio.wait_for(layer.receive(worker_channel_for(7)), 1)
+
+    assert message == {
+        "type": "match.input",
+        match_constants.MATCH_ID: 7,
+        match_constants.Team.key(): match_constants.Team.ONE.value,
+        match_constants.Move.key(): match_constants.Move.UP.value,
+    }
@@ -0,0 +1,209 @@
+import asyncio
+from typing import Optional
+
+import pytest
+
+from ws.match import constants as match_constants
+from ws.match.manager_registry import MatchManagerRegistry
+from ws.match.match_manager import MatchManager
+from ws.match.pong_logic import PongCore
+from ws.share.direct_channel_layer import DirectChannelLayer
+from ws.share.player_data import PlayerData
+
+TEAM_ONE = match_constants.Team.ONE.value
+TEAM_TWO = match_constants.Team.TWO.value
+
+
+def create_manager(match_id: int) -> MatchManager:
+    player1 = PlayerData(
+        channel_name=f"player1.{match_id}", user_id=1, participation_name="1"
+    )
+    player2 = PlayerData(
+        channel_name=f"player2.{match_id}", user_id=2, participation_name="2"
+    )
+    return MatchManager(
+        match_id, player1, player2, match_constants.Mode.REMOTE.value
+    )
+
+
+class RecordingConsumer:
+    """
+    受け取ったメッセージを記録するだけのConsumer
+    """
+
+    channel_name = "local.consumer"
+
+    def __init__(self) -> None:
+        self.texts: list[dict] = []
+
+    async def websocket_send(self, event: dict) -> None:
+        self.texts.append(event["text"])
+
+
+def create_local_manager(
+    consumer: RecordingConsumer,
+    ready_timeout: Optional[float] = None,
+    idle_timeout: Optional[float] = None,
+) -> MatchManager:
+    player = PlayerData(
+        channel_name=consumer.channel_name,
+        user_id=None,
+        participation_name=None,
+    )
+    return MatchManager(
+        0,
+        player,
+        None,
+        match_constants.Mode.LOCAL.value,
+        channel_layer=DirectChannelLayer(consumer),  # type: ignore
+        ready_timeout=ready_timeout,
+        idle_timeout=idle_timeout,
+    )
+
+
+@pytest.mark.asyncio
+async def test_paddle_input_does_not_wait_for_locks() -> None:
+    """
+    他の処理が試合のロックを持っていても、パドルの入力が待たされないかテスト
+    """
+    registry = MatchManagerRegistry()
+    await registry.register_match_manager(1, create_manager(1))
+    await registry.register_match_manager(2, create_manager(2))
+
+    async with registry.locks[1]:
+        await asyncio.wait_for(registry.paddle_up(1, TEAM_ONE), 0.1)
+        await asyncio.wait_for(registry.paddle_down(2, TEAM_TWO), 0.1)
+
+    assert len(registry.managers[1].input_queue) == 1
+    assert len(registry.managers[2].input_queue) == 1
+
+
+@pytest.mark.asyncio
+async def test_locks_are_per_match() -> None:
+    """
+    ある試合のロックが他の試合の処理を止めないかテスト
+    """
+    registry = MatchManagerRegistry()
+    await registry.register_match_manager(1, create_manager(1))
+    await registry.register_match_manager(2, create_manager(2))
+
+    async with registry.locks[1]:
+        assert not registry.locks[2].locked()
+
+    await registry.delete_match(1)
+    assert 1 not in registry.managers
+    assert 1 not in registry.locks
+
+
+@pytest.mark.asyncio
+async def test_inputs_are_coalesced_per_tick() -> None:
+    """
+    1ティックの間の入力がチームごとの移動量にまとめて適用されるかテスト
+    """
+    manager = create_manager(1)
+    start_y = manager.pong_logic.paddle1_pos.y
+    for _ in range(3):
+        await manager.paddle_up(TEAM_ONE)
+    await manager.paddle_down(TEAM_ONE)
+    await manager.paddle_down(TEAM_TWO)
+    await manager.paddle_up(TEAM_TWO)
+
+    manager._apply_inputs()
+
+    assert not manager.input_queue
+    assert (
+        manager.pong_logic.paddle1_pos.y == start_y - 2 * PongCore.PADDLE_SPEED
+    )
+    assert manager.pong_logic.paddle2_pos.y == start_y
+    assert manager.input_log.num_inputs == 2
+
+
+@pytest.mark.asyncio
+async def test_input_queue_is_bounded() -> None:
+    """
+    入力キューが上限を超えたら古い入力から捨てるかテスト
+    """
+    manager = create_manager(1)
+    for _ in range(MatchManager.INPUT_QUEUE_SIZE + 8):
+        manager.push_input(TEAM_ONE, match_constants.Move.DOWN.value)
+
+    assert len(manager.input_queue) == MatchManager.INPUT_QUEUE_SIZE
+    assert manager.dropped_inputs == 8
+
+
+@pytest.mark.asyncio
+async def test_ready_timeout_ends_match() -> None:
+    """
+    READYが届かないまま時間が過ぎたら試合を終了するかテスト
+    """
+    consumer = RecordingConsumer()
+    manager = create_local_manager(consumer, ready_timeout=0.01)
+
+    assert await asyncio.wait_for(manager.run(), 1) is None
+    assert manager.canceled
+    assert manager.finished.is_set()
+    assert manager.finished_at is not None
+    assert len(consumer.texts) == 1
+
+    # 終了した試合への退出は無視する
+    await manager.player_exited(manager.player1)
+    assert len(consumer.texts) == 1
+
+
+@pytest.mark.asyncio
+async def test_idle_team_is_found() -> None:
+    """
+    入力がidle_timeout以上ないチームを見つけるかテスト
+    """
+    manager = create_manager(1)
+    manager.idle_timeout_ticks = 10
+    manager.tick = 9
+    assert manager._find_idle_team() is None
+
+    manager.push_input(TEAM_ONE, match_constants.Move.UP.value)
+    manager._apply_inputs()
+    manager.tick = 10
+    assert manager._find_idle_team() == TEAM_TWO
+
+
+@pytest.mark.asyncio
+async def test_finished_manager_is_reaped() -> None:
+    """
+    試合が終了したMatchManagerの登録がreap_grace秒後に削除されるかテスト
+    """
+    registry = MatchManagerRegistry(reap_grace=0.01)
+    manager = create_local_manager(RecordingConsumer(), ready_timeout=0.01)
+    await registry.register_match_manager(1, manager)
+    assert registry.stats()["live"] == 1
+
+    await manager.run()
+    assert registry.stats()["completed_unreaped"] == 1
+
+    await asyncio.sleep(0.05)
+    assert 1 not in registry.managers
+    assert 1 not in registry.reapers
+    assert registry.stats()["reaped"] == 1
+
+
+@pytest.mark.asyncio
+async def test_sweep_removes_leaked_managers() -> None:
+    """
+    run()が実行されないまま放置されたMatchManagerをsweep()で削除するかテスト
+    """
+    registry = MatchManagerRegistry(leak_timeout=10)
+    manager = create_manager(1)
+    await registry.register_match_manager(1, manager)
+    await registry.register_match_manager(2, create_manager(2))
+    registry.managers[2].last_activity += 10
+
+    now = manager.last_activity + 10
+    assert registry.stats(now)["leaked"] == 1
+    assert registry.sweep(now) == 1
+    assert list(registry.managers) == [2]
+    assert registry.stats(now) == {
+        "live": 1,
+        "completed_unreaped": 0,
+        "leaked": 0,
+        "reaped": 0,
+        "leaked_reaped": 1,
+    }
@@ -0,0 +1,70 @@
+import asyncio
+from unittest import mock
+
+import pytest
+
+from ws.match import constants as match_constants
+from ws.match import score_sink
+from ws.match.match_manager import MatchManager
+from ws.share.player_data import PlayerData
+
+
+def create_tournament_manager() -> MatchManager:
+    return MatchManager(
+        1,
+        PlayerData(channel_name="player1", user_id=1, participation_name="1"),
+        PlayerData(channel_name="player2", user_id=2, participation_name="2"),
+        match_constants.Mode.REMOTE.value,
+        tournament_id=5,
+    )
+
+
+@pytest.mark.asyncio
+async def test_tournament_notifications_are_tracked_until_done() -> None:
+    """
+    得点の通知タスクを保持し、試合の終了前に終わるのを待てるかテスト
+    """
+    manager = create_tournament_manager()
+    release = asyncio.Event()
+
+    async def notify(user_id: int, pos_x: int, pos_y: int) -> None:
+        await release.wait()
+
+    with (
+        mock.patch.object(manager, "_notify_tournament", new=notify),
+        mock.patch.object(score_sink.global_score_sink, "add"),
+    ):
+        manager._handle_score(match_constants.Team.ONE.value, 0, 10)
+        assert len(manager.tournament_notifications) == 1
+
+        wait_task = asyncio.create_task(
+            manager._wait_tournament_notifications()
+        )
+        await asyncio.sleep(0)
+        assert not wait_task.done()
+
+        release.set()
+        await asyncio.wait_for(wait_task, 1)
+
+    assert manager.tournament_notifications == set()
+
+
+@pytest.mark.asyncio
+async def test_failed_tournament_notification_is_discarded() -> None:
+    """
+    失敗した得点の通知タスクも保持から外れるかテスト
+    """
+    manager = create_tournament_manager()
+    with (
+        mock.patch.object(
+            manager,
+            "_notify_tournament",
+            new=mock.AsyncMock(side_effect=RuntimeError("down")),
+        ),
+        mock.patch.object(score_sink.global_score_sink, "add"),
+    ):
+        manager._handle_score(match_constants.Team.TWO.value, 600, 10)
+        await manager._wait_tournament_notifications()
+        await asyncio.sleep(0)
+
+    assert manager.tournament_notifications == set()
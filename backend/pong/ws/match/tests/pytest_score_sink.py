@@ -0,0 +1,147 @@
+import asyncio
+from unittest import mock
+
+import pytest
+
+from utils.result import Result
+from ws.match.score_sink import ScoreSink
+
+BULK_CREATE_SCORES = "ws.match.async_db_service.bulk_create_scores"
+BULK_CREATE_SCORES_SYNC = "ws.match.async_db_service.bulk_create_scores_sync"
+
+
+def ok_result(created: int, participation_ids: dict) -> Result[dict, dict]:
+    return Result.ok(
+        {
+            "created": created,
+            "skipped": 0,
+            "participation_ids": participation_ids,
+        }
+    )
+
+
+@pytest.mark.asyncio
+async def test_flush_when_buffer_is_full() -> None:
+    """
+    バッファがflush_sizeに達したらまとめて書き込むかテスト
+    """
+    sink = ScoreSink(flush_size=3, flush_interval=60)
+    with mock.patch(
+        BULK_CREATE_SCORES,
+        new=mock.AsyncMock(return_value=ok_result(3, {(1, 10): 100})),
+    ) as bulk_create:
+        sink.add(1, 10, 0, 10)
+        sink.add(1, 10, 0, 20)
+        await asyncio.sleep(0)
+        bulk_create.assert_not_called()
+
+        sink.add(1, 10, 0, 30)
+        await asyncio.sleep(0)
+        bulk_create.assert_awaited_once_with(
+            [(1, 10, 0, 10), (1, 10, 0, 20), (1, 10, 0, 30)], {}
+        )
+        await sink.close()
+
+    assert sink.participation_ids == {(1, 10): 100}
+    assert sink.stats()["flushed_scores"] == 3
+    assert sink.stats()["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_flush_after_interval() -> None:
+    """
+    flush_interval秒経ったら書き込むかテスト
+    """
+    sink = ScoreSink(flush_size=100, flush_interval=0.01)
+    with mock.patch(
+        BULK_CREATE_SCORES,
+        new=mock.AsyncMock(return_value=ok_result(1, {})),
+    ) as bulk_create:
+        sink.add(1, 10, 0, 10)
+        await asyncio.sleep(0.05)
+        bulk_create.assert_awaited_once()
+
+    assert sink.stats()["flush_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cached_participation_ids_are_passed_and_evicted() -> None:
+    """
+    キャッシュした参加情報のidを渡し、試合終了時に破棄するかテスト
+    """
+    sink = ScoreSink(flush_size=100, flush_interval=60)
+    sink.participation_ids = {(1, 10): 100, (2, 20): 200}
+    with mock.patch(
+        BULK_CREATE_SCORES,
+        new=mock.AsyncMock(return_value=ok_result(1, {})),
+    ) as bulk_create:
+        sink.add(1, 10, 0, 10)
+        await sink.flush_match(1)
+        bulk_create.assert_awaited_once_with([(1, 10, 0, 10)], {(1, 10): 100})
+        await sink.close()
+
+    assert sink.participation_ids == {(2, 20): 200}
+
+
+@pytest.mark.asyncio
+async def test_failed_scores_are_retried_then_dropped() -> None:
+    """
+    書き込みに失敗したスコアをMAX_ATTEMPTS回まで再試行するかテスト
+    """
+    sink = ScoreSink(flush_size=100, flush_interval=60)
+    with mock.patch(
+        BULK_CREATE_SCORES,
+        new=mock.AsyncMock(return_value=Result.error({"DatabaseError": ""})),
+    ) as bulk_create:
+        sink.add(1, 10, 0, 10)
+        for _ in range(ScoreSink.MAX_ATTEMPTS):
+            await sink.flush()
+        await sink.close()
+
+    assert bulk_create.await_count == ScoreSink.MAX_ATTEMPTS
+    assert sink.stats()["retried_scores"] == ScoreSink.MAX_ATTEMPTS - 1
+    assert sink.stats()["failed_scores"] == 1
+    assert sink.stats()["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_close_drains_buffer() -> None:
+    """
+    close()で残っているスコアを全て書き込むかテスト
+    """
+    sink = ScoreSink(flush_size=100, flush_interval=60)
+    with mock.patch(
+        BULK_CREATE_SCORES,
+        new=mock.AsyncMock(return_value=ok_result(2, {})),
+    ) as bulk_create:
+        sink.add(1, 10, 0, 10)
+        sink.add(2, 20, 600, 20)
+        await sink.close()
+        bulk_create.assert_awaited_once()
+
+    assert sink.timer is None
+    assert sink.stats()["flushed_scores"] == 2
+
+
+@pytest.mark.asyncio
+async def test_drain_writes_buffer_synchronously() -> None:
+    """
+    drain()でイベントループを使わずに残っているスコアを書き込むかテスト
+    """
+    sink = ScoreSink(flush_size=100, flush_interval=60)
+    sink.participation_ids = {(1, 10): 100}
+    with mock.patch(
+        BULK_CREATE_SCORES_SYNC,
+        return_value=ok_result(2, {(2, 20): 200}),
+    ) as bulk_create:
+        sink.add(1, 10, 0, 10)
+        sink.add(2, 20, 600, 20)
+        sink.drain()
+        sink.drain()
+        bulk_create.assert_called_once_with(
+            [(1, 10, 0, 10), (2, 20, 600, 20)], {(1, 10): 100}
+        )
+
+    assert sink.stats()["flushed_scores"] == 2
+    assert sink.stats()["pending"] == 0
+    assert sink.participation_ids == {(1, 10): 100, (2, 20): 200}
@@ -0,0 +1,156 @@
+import asyncio
+from typing import Optional
+
+import pytest
+
+from ws.match import constants as match_constants
+from ws.match.match_manager import MatchManager
+from ws.share.player_data import PlayerData
+
+JSON = match_constants.Protocol.JSON.value
+BINARY = match_constants.Protocol.BINARY.value
+
+
+class RecordingChannelLayer:
+    """
+    グループのメンバーと送信されたメッセージを記録するだけのChannelLayer
+    releaseを渡すとグループへの送信がそのイベントがセットされるまで終わらない。
+    """
+
+    def __init__(self, release: Optional[asyncio.Event] = None) -> None:
+        self.release = release
+        self.groups: dict[str, set[str]] = {}
+        self.group_messages: list[tuple[str, dict]] = []
+        self.messages: list[tuple[str, dict]] = []
+
+    async def group_add(self, group: str, channel: str) -> None:
+        self.groups.setdefault(group, set()).add(channel)
+
+    async def group_discard(self, group: str, channel: str) -> None:
+        self.groups.get(group, set()).discard(channel)
+
+    async def group_send(self, group: str, message: dict) -> None:
+        if self.release is not None:
+            await self.release.wait()
+        self.group_messages.append((group, message))
+
+    async def send(self, channel: str, message: dict) -> None:
+        self.messages.append((channel, message))
+
+
+def create_manager(layer: RecordingChannelLayer) -> MatchManager:
+    player1 = PlayerData(channel_name="p1", user_id=1, participation_name="1")
+    player2 = PlayerData(channel_name="p2", user_id=2, participation_name="2")
+    return MatchManager(
+        1,
+        player1,
+        player2,
+        match_constants.Mode.REMOTE.value,
+        channel_layer=layer,  # type: ignore
+    )
+
+
+@pytest.mark.asyncio
+async def test_spectator_receives_snapshot_and_joins_groups() -> None:
+    """
+    観戦を始めると観戦者のグループに追加され、現在の試合状態が届くかテスト
+    """
+    layer = RecordingChannelLayer()
+    manager = create_manager(layer)
+
+    await manager.handle_spectate_action("spectator", BINARY)
+
+    assert "spectator" in layer.groups[manager.spectator_group_name]
+    assert (
+        "spectator"
+        in layer.groups[manager.spectator_frame_group_names[BINARY]]
+    )
+    assert "spectator" not in layer.groups.get(manager.group_name, set())
+    channel, message = layer.messages[0]
+    assert channel == "spectator"
+    data = message["text"]["payload"]["data"]
+    assert message["text"]["payload"]["stage"] == "SPECTATE"
+    assert data["broadcast_rate"] == match_constants.SPECTATOR_BROADCAST_RATE
+    assert data["ball"] == {
+        "x": manager.pong_logic.ball_pos.x,
+        "y": manager.pong_logic.ball_pos.y,
+    }
+
+    await manager.handle_leave_spectator("spectator")
+    assert not manager.spectator_protocols
+    assert "spectator" not in layer.groups[manager.spectator_group_name]
+
+
+@pytest.mark.asyncio
+async def test_spectator_frames_are_downsampled() -> None:
+    """
+    観戦者へのフレームがSPECTATOR_BROADCAST_RATEに間引かれ、最初はキーフレームになるかテスト
+    """
+    layer = RecordingChannelLayer()
+    manager = create_manager(layer)
+    await manager.handle_spectate_action("spectator", JSON)
+
+    ticks = match_constants.SIMULATION_RATE
+    for _ in range(ticks):
+        manager._on_tick(1)
+        await asyncio.sleep(0)
+
+    spectator_group = manager.spectator_frame_group_names[JSON]
+    frames = [
+        message
+        for group, message in layer.group_messages
+        if group == spectator_group
+    ]
+    assert len(frames) == match_constants.SPECTATOR_BROADCAST_RATE
+    assert '"keyframe":true' in frames[0]["text"]
+
+
+@pytest.mark.asyncio
+async def test_slow_spectator_fan_out_does_not_block_ticks() -> None:
+    """
+    観戦者への送信が終わらなくてもティックが進み、その間のフレームは捨てられるかテスト
+    """
+    release = asyncio.Event()
+    layer = RecordingChannelLayer(release)
+    manager = create_manager(layer)
+    await manager.handle_spectate_action("spectator", BINARY)
+
+    for _ in range(manager.spectator_interval * 4):
+        manager._on_tick(1)
+
+    assert manager.dropped_spectator_frames == 3
+    release.set()
+    assert manager.spectator_send_task is not None
+    await manager.spectator_send_task
+    assert len(layer.group_messages) == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_play_send_does_not_block_ticks() -> None:
+    """
+    プレーヤーへの送信が終わらなくてもティックが進み、フレームは作成した順に全て送られるかテスト
+    """
+    release = asyncio.Event()
+    layer = RecordingChannelLayer(release)
+    manager = create_manager(layer)
+    manager.protocols["p1"] = JSON
+
+    for _ in range(manager.broadcast_interval * 3):
+        manager._on_tick(1)
+        await asyncio.sleep(0)
+
+    assert manager.tick == manager.broadcast_interval * 3
+    assert layer.group_messages == []
+    release.set()
+    assert manager.play_send_task is not None
+    await manager.play_send_task
+
+    play_group = manager.play_group_names[JSON]
+    frames = [
+        message["text"]
+        for group, message in layer.group_messages
+        if group == play_group
+    ]
+    assert len(frames) == 3
+    assert '"keyframe":true' in frames[0]
+    assert not manager.pending_play_frames
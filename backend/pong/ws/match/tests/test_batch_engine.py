@@ -0,0 +1,100 @@
+import random
+import unittest
+
+import numpy as np
+
+from ..batch_engine import (
+    MOVE_DOWN,
+    MOVE_UP,
+    SCORED_NONE,
+    SCORED_ONE,
+    SCORED_TWO,
+    BatchPongEngine,
+)
+from ..constants import Team
+from ..pong_logic import PongCore
+
+
+def _snapshot(core: PongCore) -> dict:
+    return {
+        "paddle1": (core.paddle1_pos.x, core.paddle1_pos.y),
+        "paddle2": (core.paddle2_pos.x, core.paddle2_pos.y),
+        "ball": (core.ball_pos.x, core.ball_pos.y),
+        "ball_speed": (core.ball_speed.x, core.ball_speed.y),
+        "score1": core.score1,
+        "score2": core.score2,
+    }
+
+
+def _apply_move(core: PongCore, team: str, move: int) -> None:
+    if move == MOVE_UP:
+        core.move_paddle_up(team)
+    elif move == MOVE_DOWN:
+        core.move_paddle_down(team)
+
+
+class TestBatchPongEngine(unittest.TestCase):
+    """
+    BatchPongEngineがPongCoreと同じ結果になるかのテスト
+    """
+
+    NUM_MATCHES = 32
+    NUM_TICKS = 20000
+
+    def test_matches_pong_core(self) -> None:
+        """
+        同じシード・同じ入力でPongCoreと毎フレーム一致するか
+        """
+        seeds = list(range(self.NUM_MATCHES))
+        engine = BatchPongEngine(self.NUM_MATCHES, seeds)
+        cores = [PongCore(rng=random.Random(seed)) for seed in seeds]
+        input_rng = np.random.default_rng(0)
+        scored_values = {
+            None: SCORED_NONE,
+            Team.ONE.value: SCORED_ONE,
+            Team.TWO.value: SCORED_TWO,
+        }
+
+        for _ in range(self.NUM_TICKS):
+            moves1 = input_rng.integers(-1, 2, self.NUM_MATCHES)
+            moves2 = input_rng.integers(-1, 2, self.NUM_MATCHES)
+            scored = engine.step(moves1, moves2)
+
+            for i, core in enumerate(cores):
+                if core.game_end():
+                    continue
+                _apply_move(core, Team.ONE.value, int(moves1[i]))
+                _apply_move(core, Team.TWO.value, int(moves2[i]))
+                result = core.update_game_state()
+                self.assertEqual(scored[i], scored_values[result])
+                self.assertEqual(engine.snapshot(i), _snapshot(core))
+
+        # 実際に試合が終了するところまで比較できているか
+        self.assertTrue(engine.game_end().any())
+
+    def test_matches_pong_core_at_high_speed(self) -> None:
+        """
+        1フレームの移動量がパドルの幅を超える速度でもPongCoreと一致するか
+        """
+        seeds = list(range(self.NUM_MATCHES))
+        engine = BatchPongEngine(self.NUM_MATCHES, seeds)
+        cores = [PongCore(rng=random.Random(seed)) for seed in seeds]
+        speed_rng = np.random.default_rng(1)
+        speeds_x = speed_rng.choice([-1, 1], self.NUM_MATCHES) * 23
+        speeds_y = speed_rng.integers(-9, 10, self.NUM_MATCHES)
+        engine.speed_x[:] = speeds_x
+        engine.speed_y[:] = speeds_y
+        for i, core in enumerate(cores):
+            core.ball_speed.x = int(speeds_x[i])
+            core.ball_speed.y = int(speeds_y[i])
+
+        for _ in range(200):
+            engine.step()
+            for i, core in enumerate(cores):
+                if not core.game_end():
+                    core.update_game_state()
+                self.assertEqual(engine.snapshot(i), _snapshot(core))
+
+    def test_seeds_length_mismatch(self) -> None:
+        with self.assertRaises(ValueError):
+            BatchPongEngine(2, [1])
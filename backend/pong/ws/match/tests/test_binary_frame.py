@@ -0,0 +1,53 @@
+import unittest
+
+from .. import binary_frame
+from ..frame_encoder import KEYFRAME_KEY, SEQ_KEY, TICK_KEY
+from ..pong_logic import PongCore
+
+
+class TestBinaryFrame(unittest.TestCase):
+    """
+    PLAYステージのバイナリフレームのテスト
+    """
+
+    def test_size(self) -> None:
+        """
+        フレームが固定長の27バイトになるか
+        """
+        frame = binary_frame.pack_play_frame(0, 0, PongCore())
+        self.assertEqual(len(frame), 27)
+        self.assertEqual(frame[0], binary_frame.PLAY_FRAME_TYPE)
+
+    def test_round_trip(self) -> None:
+        """
+        変換したフレームを戻すとJSONのPLAYステージと同じデータになるか
+        """
+        core = PongCore()
+        core.paddle1_pos.y = 0
+        core.paddle2_pos.y = PongCore.HEIGHT - PongCore.PADDLE_HEIGHT
+        core.ball_pos.x = -PongCore.BALL_SIZE
+        core.ball_speed.x = -PongCore.BALL_SPEED
+        core.ball_speed.y = 3
+        core.score1 = 3
+        core.score2 = 4
+
+        data = binary_frame.unpack_play_frame(
+            binary_frame.pack_play_frame(123456, 246912, core)
+        )
+        self.assertEqual(
+            data,
+            {
+                SEQ_KEY: 123456,
+                KEYFRAME_KEY: True,
+                TICK_KEY: 246912,
+                "paddle1": {"x": core.paddle1_pos.x, "y": 0},
+                "paddle2": {
+                    "x": core.paddle2_pos.x,
+                    "y": PongCore.HEIGHT - PongCore.PADDLE_HEIGHT,
+                },
+                "ball": {"x": -PongCore.BALL_SIZE, "y": core.ball_pos.y},
+                "ball_speed": {"x": -PongCore.BALL_SPEED, "y": 3},
+                "score1": 3,
+                "score2": 4,
+            },
+        )
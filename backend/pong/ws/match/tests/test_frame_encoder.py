@@ -0,0 +1,85 @@
+import unittest
+
+from ..frame_encoder import KEYFRAME_KEY, SEQ_KEY, DeltaFrameEncoder
+
+
+def _state(ball_x: int, paddle1_y: int = 170, score1: int = 0) -> dict:
+    return {
+        "paddle1": {"x": 6, "y": paddle1_y},
+        "paddle2": {"x": 584, "y": 170},
+        "ball": {"x": ball_x, "y": 195},
+        "score1": score1,
+        "score2": 0,
+    }
+
+
+class TestDeltaFrameEncoder(unittest.TestCase):
+    """
+    DeltaFrameEncoderがキーフレームと差分を正しく作成するかのテスト
+    """
+
+    def test_first_frame_is_keyframe(self) -> None:
+        encoder = DeltaFrameEncoder(keyframe_interval=10)
+
+        frame = encoder.encode(_state(100))
+
+        self.assertTrue(frame[KEYFRAME_KEY])
+        self.assertEqual(frame[SEQ_KEY], 0)
+        self.assertEqual(frame["paddle1"], {"x": 6, "y": 170})
+
+    def test_delta_contains_only_changed_fields(self) -> None:
+        """
+        キーフレームから変化したフィールドだけが送られるか
+        """
+        encoder = DeltaFrameEncoder(keyframe_interval=10)
+        encoder.encode(_state(100))
+
+        frame = encoder.encode(_state(102, paddle1_y=165))
+
+        self.assertFalse(frame[KEYFRAME_KEY])
+        self.assertEqual(frame[SEQ_KEY], 1)
+        self.assertEqual(
+            frame,
+            {
+                "paddle1": {"x": 6, "y": 165},
+                "ball": {"x": 102, "y": 195},
+                SEQ_KEY: 1,
+                KEYFRAME_KEY: False,
+            },
+        )
+
+    def test_delta_is_relative_to_keyframe(self) -> None:
+        """
+        差分は直前のフレームではなくキーフレームに対して作成されるか
+        """
+        encoder = DeltaFrameEncoder(keyframe_interval=10)
+        encoder.encode(_state(100))
+        encoder.encode(_state(102, paddle1_y=165))
+
+        # 直前のフレームから変化していなくても、キーフレームと違えば送る
+        frame = encoder.encode(_state(104, paddle1_y=165))
+
+        self.assertIn("paddle1", frame)
+        self.assertNotIn("paddle2", frame)
+
+    def test_keyframe_interval_and_request(self) -> None:
+        encoder = DeltaFrameEncoder(keyframe_interval=3)
+        frames = [encoder.encode(_state(i)) for i in range(4)]
+        encoder.request_keyframe()
+        forced = encoder.encode(_state(10))
+
+        self.assertEqual(
+            [frame[KEYFRAME_KEY] for frame in frames],
+            [True, False, False, True],
+        )
+        self.assertTrue(forced[KEYFRAME_KEY])
+        self.assertIn("paddle2", forced)
+
+    def test_delta_disabled(self) -> None:
+        encoder = DeltaFrameEncoder(delta=False)
+        encoder.encode(_state(100))
+
+        frame = encoder.encode(_state(102))
+
+        self.assertTrue(frame[KEYFRAME_KEY])
+        self.assertIn("score1", frame)
@@ -30,6 +30,13 @@ class TestMatchSerializer(unittest.TestCase):
                     "data": {"mode": "REMOTE"},
                 },
             ),
+            (
+                "正しいINITステージのメッセージ(BINARYフレームを要求)",
+                {
+                    "stage": "INIT",
+                    "data": {"mode": "LOCAL", "protocol": "BINARY"},
+                },
+            ),
             (
                 "正しいREADYステージのメッセージ",
                 {
@@ -48,6 +55,13 @@ class TestMatchSerializer(unittest.TestCase):
                 "正しいENDステージのメッセージ",
                 {"stage": "END", "data": {}},
             ),
+            (
+                "正しいSPECTATEステージのメッセージ",
+                {
+                    "stage": "SPECTATE",
+                    "data": {"match_id": 1, "protocol": "BINARY"},
+                },
+            ),
         ]
     )
     def test_valid_message(self, name: str, payload: dict) -> None:
@@ -106,6 +120,14 @@ class TestMatchSerializer(unittest.TestCase):
                 {"stage": "INIT", "data": {"mode": ""}},
                 INVALID_CHOICE,
             ),
+            (
+                "INITステージのprotocol keyの値が不正",
+                {
+                    "stage": "INIT",
+                    "data": {"mode": "REMOTE", "protocol": "MSGPACK"},
+                },
+                INVALID_CHOICE,
+            ),
             # READYステージ
             (
                 "READYステージの中身に余計なものが入っている",
@@ -150,6 +172,12 @@ class TestMatchSerializer(unittest.TestCase):
                 },
                 INVALID,
             ),
+            # SPECTATEステージ
+            (
+                "SPECTATEステージにmatch_idがない",
+                {"stage": "SPECTATE", "data": {"protocol": "JSON"}},
+                REQUIRED,
+            ),
         ]
     )
     def test_invalid_message(
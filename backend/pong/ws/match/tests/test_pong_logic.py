@@ -0,0 +1,167 @@
+import asyncio
+import unittest
+
+from ..constants import Team
+from ..pong_logic import PongCore, PongLogic
+
+
+class TestPongCore(unittest.TestCase):
+    """
+    PongCoreの1フレームの更新とパドル操作のテスト
+    """
+
+    def setUp(self) -> None:
+        self.core = PongCore()
+
+    def test_update_does_not_allocate_new_pos(self) -> None:
+        """
+        フレーム更新でPosStructが作り直されず、その場で書き換えられるか
+        """
+        ball_pos = self.core.ball_pos
+        ball_speed = self.core.ball_speed
+        x, y = ball_pos.x, ball_pos.y
+
+        self.core.update_game_state()
+
+        self.assertIs(self.core.ball_pos, ball_pos)
+        self.assertIs(self.core.ball_speed, ball_speed)
+        self.assertEqual(ball_pos.x, x + PongCore.BALL_SPEED)
+        self.assertEqual(ball_pos.y, y + PongCore.BALL_SPEED)
+
+    def test_fast_ball_does_not_tunnel_through_paddle(self) -> None:
+        """
+        1フレームの移動量がパドルの幅より大きくても、パドルで反射するか
+        """
+        paddle_pos = self.core.paddle1_pos
+        contact_x = paddle_pos.x + PongCore.PADDLE_WIDTH
+        self.core.ball_pos.x = contact_x + 10
+        self.core.ball_pos.y = paddle_pos.y + PongCore.PADDLE_HEIGHT // 2
+        self.core.ball_speed.x = -(PongCore.PADDLE_WIDTH * 3)
+        self.core.ball_speed.y = 0
+
+        self.assertIsNone(self.core.update_game_state())
+
+        # 衝突時刻から残りの20ピクセル分だけ反射した向きに進む
+        self.assertEqual(self.core.ball_speed.x, PongCore.PADDLE_WIDTH * 3)
+        self.assertEqual(self.core.ball_pos.x, contact_x + 20)
+
+    def test_ball_behind_paddle_is_not_reflected(self) -> None:
+        """
+        既にパドルの面を通り過ぎたボールは、上下が重なっていても反射しないか
+        """
+        paddle_pos = self.core.paddle1_pos
+        self.core.ball_pos.x = paddle_pos.x
+        self.core.ball_pos.y = paddle_pos.y
+        self.core.ball_speed.x = -PongCore.BALL_SPEED
+
+        self.core.update_game_state()
+
+        self.assertEqual(self.core.ball_speed.x, -PongCore.BALL_SPEED)
+        self.assertEqual(
+            self.core.ball_pos.x, paddle_pos.x - PongCore.BALL_SPEED
+        )
+
+    def test_vertical_range_is_checked_at_time_of_impact(self) -> None:
+        """
+        フレームの終わりではなく、パドルに届いた時刻の上下の位置で判定するか
+        """
+        paddle_pos = self.core.paddle1_pos
+        contact_x = paddle_pos.x + PongCore.PADDLE_WIDTH
+        # パドルに届く時刻にはパドルの下を通り過ぎているボール
+        self.core.ball_pos.x = contact_x + 20
+        self.core.ball_pos.y = paddle_pos.y + PongCore.PADDLE_HEIGHT - 10
+        self.core.ball_speed.x = -40
+        self.core.ball_speed.y = 40
+
+        self.core.update_game_state()
+
+        self.assertEqual(self.core.ball_speed.x, -40)
+
+    def test_ball_reflects_on_wall(self) -> None:
+        """
+        上の壁を超えた分が折り返され、上下の向きが反転するか
+        """
+        self.core.ball_pos.y = 1
+        self.core.ball_speed.y = -PongCore.BALL_SPEED
+
+        self.core.update_game_state()
+
+        self.assertEqual(self.core.ball_pos.y, 1)
+        self.assertEqual(self.core.ball_speed.y, PongCore.BALL_SPEED)
+
+    def test_paddle_stays_in_field(self) -> None:
+        """
+        パドルがフィールドの外に出ないか
+        """
+        for _ in range(PongCore.HEIGHT):
+            self.core.move_paddle_up(Team.ONE.value)
+            self.core.move_paddle_down(Team.TWO.value)
+
+        self.assertEqual(self.core.paddle1_pos.y, 0)
+        self.assertEqual(
+            self.core.paddle2_pos.y, PongCore.HEIGHT - PongCore.PADDLE_HEIGHT
+        )
+
+    def test_score_resets_ball(self) -> None:
+        """
+        ボールがゴールラインを超えたら得点が入り、ボールが中央に戻るか
+        """
+        self.core.ball_pos.x = PongCore.WIDTH
+
+        result = self.core.check_score()
+
+        self.assertEqual(result, Team.ONE.value)
+        self.assertEqual(self.core.score1, 1)
+        self.assertEqual(
+            self.core.ball_pos.x, PongCore.WIDTH // 2 - PongCore.BALL_SIZE // 2
+        )
+
+    def test_game_end_and_winner(self) -> None:
+        """
+        勝利点に達したら終了し、勝者を返すか
+        """
+        self.assertFalse(self.core.game_end())
+        self.core.score2 = PongCore.WINNING_SCORE
+
+        self.assertTrue(self.core.game_end())
+        self.assertEqual(self.core.get_winner(), Team.TWO.value)
+
+
+class TestPongLogic(unittest.TestCase):
+    """
+    非同期の互換クラスPongLogicがPongCoreに処理を委譲するかのテスト
+    """
+
+    def test_delegates_to_core(self) -> None:
+        logic = PongLogic()
+
+        async def run() -> None:
+            await logic.move_paddle_up(Team.ONE.value)
+            await logic.update_game_state()
+
+        asyncio.run(run())
+
+        self.assertIs(logic.ball_pos, logic.core.ball_pos)
+        self.assertEqual(
+            logic.paddle1_pos.y,
+            PongCore.HEIGHT // 2
+            - PongCore.PADDLE_HEIGHT // 2
+            - PongCore.PADDLE_SPEED,
+        )
+
+    def test_check_collisions_changes_ball_direction(self) -> None:
+        """
+        check_collisions()が以前と同じく、パドルに当たるボールの進行方向を変えるか
+        """
+        logic = PongLogic()
+        paddle_pos = logic.paddle1_pos
+        logic.ball_pos.x = paddle_pos.x + PongCore.PADDLE_WIDTH + 1
+        logic.ball_pos.y = paddle_pos.y
+        logic.ball_speed.x = -PongCore.BALL_SPEED
+        x = logic.ball_pos.x
+
+        result = asyncio.run(logic.check_collisions())
+
+        self.assertIsNone(result)
+        self.assertEqual(logic.ball_speed.x, PongCore.BALL_SPEED)
+        self.assertEqual(logic.ball_pos.x, x)
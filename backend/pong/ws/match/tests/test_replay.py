@@ -0,0 +1,97 @@
+import random
+import unittest
+
+from ..constants import Move, Team
+from ..pong_logic import PongCore
+from ..replay import HEADER, InputLog, PaddleInput, Replay
+
+
+def _snapshot(core: PongCore) -> tuple:
+    return (
+        core.paddle1_pos.y,
+        core.paddle2_pos.y,
+        core.ball_pos.x,
+        core.ball_pos.y,
+        core.ball_speed.x,
+        core.ball_speed.y,
+        core.score1,
+        core.score2,
+    )
+
+
+class TestReplay(unittest.TestCase):
+    """
+    入力ログから試合を再シミュレーションできるかのテスト
+    """
+
+    SEED = 12345
+
+    def _play(self) -> tuple[InputLog, list[tuple]]:
+        """
+        MatchManagerと同じ順番(入力 -> 1ティック)で試合を最後まで進め、
+        入力ログと毎ティックの状態を返す。
+        """
+        core = PongCore(rng=random.Random(self.SEED))
+        log = InputLog(self.SEED)
+        input_rng = random.Random(0)
+        frames = [_snapshot(core)]
+        tick = 0
+        while not core.game_end():
+            for _ in range(input_rng.randrange(3)):
+                team = input_rng.choice([Team.ONE.value, Team.TWO.value])
+                if input_rng.random() < 0.5:
+                    log.append(tick, team, Move.UP.value)
+                    core.move_paddle_up(team)
+                else:
+                    log.append(tick, team, Move.DOWN.value)
+                    core.move_paddle_down(team)
+            core.update_game_state()
+            tick += 1
+            frames.append(_snapshot(core))
+        return log, frames
+
+    def test_replay_reproduces_every_frame(self) -> None:
+        """
+        シードと入力だけから全てのティックの状態が再現できるか
+        """
+        log, frames = self._play()
+        match_replay = Replay.from_bytes(log.to_bytes(len(frames) - 1))
+
+        replayed = [_snapshot(core) for core in match_replay.frames()]
+
+        self.assertEqual(replayed, frames)
+        self.assertEqual(match_replay.seed, self.SEED)
+        self.assertEqual(len(match_replay.inputs), log.num_inputs)
+
+    def test_frame_at(self) -> None:
+        """
+        途中のティックの状態を求められるか
+        """
+        log, frames = self._play()
+        match_replay = Replay.from_bytes(log.to_bytes(len(frames) - 1))
+
+        self.assertEqual(_snapshot(match_replay.frame_at(0)), frames[0])
+        self.assertEqual(_snapshot(match_replay.frame_at(100)), frames[100])
+
+    def test_inputs_are_compact(self) -> None:
+        """
+        近いティックの入力は1件1バイトで記録されるか
+        """
+        log = InputLog(self.SEED)
+        for tick in range(100):
+            log.append(tick, Team.ONE.value, Move.UP.value)
+        log.append(1000, Team.TWO.value, Move.DOWN.value)
+
+        data = log.to_bytes(1000)
+
+        self.assertEqual(len(data), HEADER.size + 100 + 2)
+        self.assertEqual(
+            Replay.from_bytes(data).inputs[-1],
+            PaddleInput(1000, Team.TWO.value, Move.DOWN.value),
+        )
+
+    def test_invalid_replay(self) -> None:
+        with self.assertRaises(ValueError):
+            Replay.from_bytes(b"PONG")
+        with self.assertRaises(ValueError):
+            Replay.from_bytes(b"XXXX" + bytes(HEADER.size))
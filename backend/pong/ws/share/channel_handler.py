@@ -1,3 +1,5 @@
+import json
+import time
 from typing import Optional
 
 from channels.layers import BaseChannelLayer  # type: ignore
@@ -59,12 +61,81 @@ class ChannelHandler:
     async def send_to_group(self, group_name: str, message: dict) -> None:
         """
         グループにメッセージを送信。
+        メッセージは送信前に1回だけJSONの文字列にし、
+        Consumerは受け取った文字列を再エンコードせずにそのままクライアントへ送る。
 
         :param group_name: メッセージを送信するグループ名
         :param message: 送信するメッセージ
         """
         await self.channel_layer.group_send(
-            group_name, {"type": "group.message", "message": message}
+            group_name, {"type": "text.frame", "text": encode_json(message)}
+        )
+
+    async def send_bytes_to_group(self, group_name: str, data: bytes) -> None:
+        """
+        グループにエンコード済みのバイナリフレームを送信。
+        Consumerは受け取ったバイト列を再エンコードせずにそのままクライアントへ送る。
+
+        :param group_name: フレームを送信するグループ名
+        :param data: 送信するバイト列
+        """
+        await self.channel_layer.group_send(
+            group_name,
+            {"type": "match.frame", "bytes": data, "sent_at": time.time()},
+        )
+
+    async def send_bytes_to_consumer(
+        self, data: bytes, channel_name: str
+    ) -> None:
+        """
+        個々のConsumerにエンコード済みのバイナリフレームを送信。
+
+        :param data: 送信するバイト列
+        """
+        await self.channel_layer.send(
+            channel_name,
+            {"type": "match.frame", "bytes": data, "sent_at": time.time()},
+        )
+
+    async def send_frame_to_group(
+        self, group_name: str, message: dict, keyframe: bool = False
+    ) -> None:
+        """
+        グループにPLAYステージのJSONのフレームを送信。
+        send_to_groupと同じく1回だけエンコードし、
+        Consumerはバイナリフレームと同じように最新のフレームだけをクライアントへ送る。
+
+        :param group_name: フレームを送信するグループ名
+        :param message: 送信するフレーム
+        :param keyframe: 後の差分フレームの基準になるキーフレームか。Consumerは捨てずに送る
+        """
+        await self.channel_layer.group_send(
+            group_name,
+            {
+                "type": "match.frame",
+                "text": encode_json(message),
+                "sent_at": time.time(),
+                "keyframe": keyframe,
+            },
+        )
+
+    async def send_frame_to_consumer(
+        self, message: dict, channel_name: str, keyframe: bool = False
+    ) -> None:
+        """
+        個々のConsumerにPLAYステージのJSONのフレームを送信。
+
+        :param message: 送信するフレーム
+        :param keyframe: 後の差分フレームの基準になるキーフレームか。Consumerは捨てずに送る
+        """
+        await self.channel_layer.send(
+            channel_name,
+            {
+                "type": "match.frame",
+                "text": encode_json(message),
+                "sent_at": time.time(),
+                "keyframe": keyframe,
+            },
         )
 
     async def send_to_consumer(self, message: dict, channel_name: str) -> None:
@@ -76,3 +147,10 @@ class ChannelHandler:
         await self.channel_layer.send(
             channel_name, {"type": "websocket.send", "text": message}
         )
+
+
+def encode_json(message: dict) -> str:
+    """
+    クライアントに送るメッセージをJSONの文字列にする。
+    """
+    return json.dumps(message, separators=(",", ":"))
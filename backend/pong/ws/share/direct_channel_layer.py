@@ -0,0 +1,72 @@
+import logging
+
+from channels.consumer import AsyncConsumer, get_handler_name  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+
+class DirectChannelLayer:
+    """
+    同じプロセスのConsumerにRedisを経由せずメッセージを届けるチャネルレイヤー。
+
+    ChannelLayerと同じsend/group_send/group_add/group_discardを持ち、ChannelHandlerにそのまま渡せる。
+    メッセージはシリアライズせずに、typeに対応するConsumerのハンドラ(websocket_send, match_frameなど)を直接呼び出す。
+    宛先は作成時に渡したConsumerだけなので、ローカル対戦のように1つのConsumerとだけ通信する場合に使う。
+    Consumerが切断されたらclose()を呼び、それ以降のメッセージは捨てる。
+    """
+
+    def __init__(self, consumer: AsyncConsumer) -> None:
+        """
+        Args:
+            consumer (AsyncConsumer): メッセージを届けるConsumer
+        """
+        self.consumer = consumer
+        self.sent_messages: int = 0
+        self.closed: bool = False
+
+    def __str__(self) -> str:
+        return f"DirectChannelLayer(channel_name={self.consumer.channel_name})"
+
+    def __repr__(self) -> str:
+        return (
+            f"DirectChannelLayer(channel_name={self.consumer.channel_name!r}, "
+            f"sent_messages={self.sent_messages!r})"
+        )
+
+    async def send(self, channel: str, message: dict) -> None:
+        """
+        channelが作成時のConsumerであれば、メッセージを直接届ける。
+        """
+        if channel != self.consumer.channel_name:
+            logger.warning(f"DirectChannelLayer cannot reach {channel}")
+            return
+        await self._deliver(message)
+
+    async def group_send(self, group: str, message: dict) -> None:
+        """
+        グループの代わりに作成時のConsumerにメッセージを届ける。
+        """
+        await self._deliver(message)
+
+    async def group_add(self, group: str, channel: str) -> None:
+        pass
+
+    async def group_discard(self, group: str, channel: str) -> None:
+        pass
+
+    def close(self) -> None:
+        """
+        Consumerが切断された後にメッセージを届けないようにする。
+        """
+        self.closed = True
+
+    async def _deliver(self, message: dict) -> None:
+        if self.closed:
+            return
+        # AsyncConsumer.dispatch()はメッセージごとにDB接続の確認を行うので、ハンドラを直接呼ぶ
+        handler = getattr(self.consumer, get_handler_name(message), None)
+        if handler is None:
+            logger.warning(f"No handler for message type: {message['type']}")
+            return
+        self.sent_messages += 1
+        await handler(message)
@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Final, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+Frame = Union[str, bytes]
+
+
+class LatestFrameSender:
+    """
+    1つのWebSocketに試合のフレームを最新のものだけ送るクラス(latest-value-wins)。
+
+    PLAYステージのフレームは最新の状態だけに意味があるので、キューには溜めずに1つだけ保持する。
+    前のフレームをまだ送っていなければ新しいフレームで置き換え、古いフレームは捨てる。
+    ChannelLayerに溜まったフレームも受け取った順に置き換わるので、遅れたクライアントにも最新のフレームだけが届く。
+
+    送信時刻(sent_at)が付いたフレームは受け取るまでの遅延を計測し、
+    MAX_FRAME_AGE秒より古いフレームは送らずに捨てる。
+
+    ただし、後の差分フレームの基準になるキーフレームは捨てずに別に保持し、
+    送信待ちの最新の差分フレームより先に送る。キーフレームを置き換えるのは、より新しいキーフレームだけ。
+    """
+
+    MAX_FRAME_AGE: Final[float] = 0.5
+    # 遅延の指数移動平均の重み
+    LAG_SMOOTHING: Final[float] = 0.1
+
+    def __init__(
+        self,
+        send: Callable[[Frame], Awaitable[None]],
+        name: str = "",
+        max_frame_age: float = MAX_FRAME_AGE,
+    ) -> None:
+        """
+        Args:
+            send: フレームをWebSocketに送る関数
+            name (str): ログに出す接続の名前(チャネル名)
+            max_frame_age (float): これより遅れたフレームは捨てる(秒)
+        """
+        self.send = send
+        self.name = name
+        self.max_frame_age = max_frame_age
+        self.pending_keyframe: Optional[Frame] = None
+        self.pending: Optional[Frame] = None
+        self.task: Optional[asyncio.Task] = None
+        self.behind: bool = False
+
+        # 計測値
+        self.sent_frames: int = 0
+        self.replaced_frames: int = 0
+        self.stale_frames: int = 0
+        self.last_lag: float = 0.0
+        self.average_lag: float = 0.0
+        self.max_lag: float = 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"LatestFrameSender(name={self.name}, sent={self.sent_frames}, "
+            f"dropped={self.dropped_frames})"
+        )
+
+    def __repr__(self) -> str:
+        return f"LatestFrameSender(name={self.name!r}, stats={self.stats()!r})"
+
+    @property
+    def dropped_frames(self) -> int:
+        return self.replaced_frames + self.stale_frames
+
+    def offer(
+        self,
+        frame: Frame,
+        sent_at: Optional[float] = None,
+        keyframe: bool = False,
+    ) -> None:
+        """
+        フレームを送信待ちにする。送信は待たない。
+        送信待ちのフレームがあれば置き換える。
+        キーフレームは古くても捨てず、差分フレームでは置き換えない。
+
+        Args:
+            frame: 送るフレーム
+            sent_at (Optional[float]): MatchManagerがフレームを送信した時刻(time.time())
+            keyframe (bool): 後の差分フレームの基準になるキーフレームか
+        """
+        if sent_at is not None:
+            lag = max(0.0, time.time() - sent_at)
+            self._record_lag(lag)
+            if lag > self.max_frame_age and not keyframe:
+                self.stale_frames += 1
+                return
+
+        if keyframe:
+            # 新しいキーフレームがあれば、それより前のフレームは必要ない
+            for pending in (self.pending_keyframe, self.pending):
+                if pending is not None:
+                    self.replaced_frames += 1
+            self.pending_keyframe = frame
+            self.pending = None
+        else:
+            if self.pending is not None:
+                self.replaced_frames += 1
+            self.pending = frame
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._drain())
+
+    async def flush(self) -> None:
+        """
+        送信待ちのフレームを送り終わるまで待つ。
+        フレーム以外のメッセージを送る前に呼び、送信の順番を保つ。
+        """
+        if self.task is not None and not self.task.done():
+            await self.task
+
+    def close(self) -> None:
+        """
+        接続が閉じた時に呼び、送信待ちのフレームを捨てる。
+        """
+        self.pending_keyframe = None
+        self.pending = None
+        if self.task is not None:
+            self.task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "sent_frames": self.sent_frames,
+            "replaced_frames": self.replaced_frames,
+            "stale_frames": self.stale_frames,
+            "last_lag": self.last_lag,
+            "average_lag": self.average_lag,
+            "max_lag": self.max_lag,
+        }
+
+    async def _drain(self) -> None:
+        while True:
+            frame: Optional[Frame]
+            if self.pending_keyframe is not None:
+                frame, self.pending_keyframe = self.pending_keyframe, None
+            else:
+                frame, self.pending = self.pending, None
+            if frame is None:
+                return
+            await self.send(frame)
+            self.sent_frames += 1
+
+    def _record_lag(self, lag: float) -> None:
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        self.average_lag += self.LAG_SMOOTHING * (lag - self.average_lag)
+        # 遅れ始めた時と追いついた時だけログに出す
+        behind = self.average_lag > self.max_frame_age / 2
+        if behind != self.behind:
+            self.behind = behind
+            if behind:
+                logger.warning(f"{self.name} is behind: {self.stats()}")
+            else:
+                logger.info(f"{self.name} caught up: {self.stats()}")
@@ -0,0 +1,38 @@
+import json
+from unittest import mock
+
+import pytest
+
+from ws.share.channel_handler import ChannelHandler
+
+
+class RecordingChannelLayer:
+    """
+    送信されたメッセージを記録するだけのChannelLayer
+    """
+
+    def __init__(self) -> None:
+        self.group_messages: list[tuple[str, dict]] = []
+
+    async def group_send(self, group: str, message: dict) -> None:
+        self.group_messages.append((group, message))
+
+
+@pytest.mark.asyncio
+async def test_group_message_is_encoded_once() -> None:
+    """
+    グループへのメッセージがConsumerに届く前に1回だけJSONの文字列になるかテスト
+    """
+    layer = RecordingChannelLayer()
+    handler = ChannelHandler(layer, None)  # type: ignore
+    message = {"category": "MATCH", "payload": {"stage": "PLAY", "data": {}}}
+
+    with mock.patch("json.dumps", wraps=json.dumps) as dumps:
+        await handler.send_to_group("pong_1_json", message)
+
+    dumps.assert_called_once()
+    group, event = layer.group_messages[0]
+    assert group == "pong_1_json"
+    assert event["type"] == "text.frame"
+    assert isinstance(event["text"], str)
+    assert json.loads(event["text"]) == message
@@ -0,0 +1,58 @@
+import pytest
+
+from ws.share.channel_handler import ChannelHandler
+from ws.share.direct_channel_layer import DirectChannelLayer
+
+
+class RecordingConsumer:
+    """
+    受け取ったメッセージを記録するだけのConsumer
+    """
+
+    channel_name = "local.consumer"
+
+    def __init__(self) -> None:
+        self.texts: list[dict] = []
+        self.frames: list[bytes] = []
+
+    async def websocket_send(self, event: dict) -> None:
+        self.texts.append(event["text"])
+
+    async def match_frame(self, event: dict) -> None:
+        self.frames.append(event["bytes"])
+
+
+@pytest.mark.asyncio
+async def test_messages_are_delivered_to_consumer_handlers() -> None:
+    """
+    ChannelHandlerから送ったメッセージがシリアライズされずにConsumerのハンドラに届くかテスト
+    """
+    consumer = RecordingConsumer()
+    layer = DirectChannelLayer(consumer)  # type: ignore
+    handler = ChannelHandler(layer, None)
+    message = {"category": "MATCH", "payload": {"stage": "PLAY"}}
+
+    await handler.send_to_consumer(message, consumer.channel_name)
+    await handler.send_bytes_to_consumer(b"\x01", consumer.channel_name)
+
+    assert consumer.texts == [message]
+    assert consumer.texts[0] is message
+    assert consumer.frames == [b"\x01"]
+    assert layer.sent_messages == 2
+
+
+@pytest.mark.asyncio
+async def test_other_channels_and_closed_layer_are_ignored() -> None:
+    """
+    他のチャネル宛てのメッセージと、close()後のメッセージは届かないかテスト
+    """
+    consumer = RecordingConsumer()
+    layer = DirectChannelLayer(consumer)  # type: ignore
+    handler = ChannelHandler(layer, None)
+
+    await handler.send_to_consumer({}, "other.consumer")
+    layer.close()
+    await handler.send_to_consumer({}, consumer.channel_name)
+
+    assert consumer.texts == []
+    assert layer.sent_messages == 0
@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+import pytest
+
+from ws.share.frame_sender import Frame, LatestFrameSender
+
+
+class SlowSocket:
+    """
+    送信したフレームを記録し、releaseがセットされるまで送信を終えないWebSocket
+    """
+
+    def __init__(self) -> None:
+        self.frames: list[Frame] = []
+        self.release = asyncio.Event()
+
+    async def send(self, frame: Frame) -> None:
+        await self.release.wait()
+        self.frames.append(frame)
+
+
+@pytest.mark.asyncio
+async def test_pending_frame_is_replaced_by_newer_frame() -> None:
+    """
+    送信中に届いたフレームは溜めずに最新のものだけを送るかテスト
+    """
+    socket = SlowSocket()
+    sender = LatestFrameSender(socket.send)
+
+    sender.offer(b"1")
+    await asyncio.sleep(0)
+    for frame in (b"2", b"3", b"4"):
+        sender.offer(frame)
+    socket.release.set()
+    await sender.flush()
+
+    assert socket.frames == [b"1", b"4"]
+    assert sender.sent_frames == 2
+    assert sender.replaced_frames == 2
+
+
+@pytest.mark.asyncio
+async def test_pending_keyframe_is_sent_before_newer_delta() -> None:
+    """
+    送信待ちのキーフレームを差分フレームで置き換えず、キーフレームの後に最新の差分を送るかテスト
+    """
+    socket = SlowSocket()
+    sender = LatestFrameSender(socket.send)
+
+    sender.offer("1")
+    await asyncio.sleep(0)
+    sender.offer("key", keyframe=True)
+    for frame in ("delta1", "delta2"):
+        sender.offer(frame)
+    socket.release.set()
+    await sender.flush()
+
+    assert socket.frames == ["1", "key", "delta2"]
+    assert sender.replaced_frames == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_keyframe_is_not_dropped() -> None:
+    """
+    MAX_FRAME_AGEより遅れたキーフレームも捨てずに送るかテスト
+    """
+    socket = SlowSocket()
+    socket.release.set()
+    sender = LatestFrameSender(socket.send, max_frame_age=0.5)
+
+    sender.offer("key", sent_at=time.time() - 1, keyframe=True)
+    await sender.flush()
+
+    assert socket.frames == ["key"]
+    assert sender.stale_frames == 0
+
+
+@pytest.mark.asyncio
+async def test_stale_frames_are_dropped_and_lag_is_recorded() -> None:
+    """
+    MAX_FRAME_AGEより遅れたフレームを捨て、遅延を記録するかテスト
+    """
+    socket = SlowSocket()
+    socket.release.set()
+    sender = LatestFrameSender(socket.send, max_frame_age=0.5)
+
+    sender.offer("old", sent_at=time.time() - 1)
+    sender.offer("new", sent_at=time.time())
+    await sender.flush()
+
+    assert socket.frames == ["new"]
+    assert sender.stale_frames == 1
+    assert sender.dropped_frames == 1
+    assert sender.max_lag >= 1
+
+
+@pytest.mark.asyncio
+async def test_close_discards_pending_frame() -> None:
+    """
+    接続が閉じたら送信待ちのフレームを捨てるかテスト
+    """
+    socket = SlowSocket()
+    sender = LatestFrameSender(socket.send)
+
+    sender.offer(b"1")
+    await asyncio.sleep(0)
+    sender.offer(b"2")
+    sender.close()
+    socket.release.set()
+    await asyncio.sleep(0)
+
+    assert socket.frames == []
+    assert sender.pending is None
+    assert sender.pending_keyframe is None
@@ -25,6 +25,7 @@ DeleteParticipationResult = utils.result.Result[dict, dict]
 UpdateParticipationResult = utils.result.Result[dict, dict]
 UpdateTournamentResult = utils.result.Result[dict, dict]
 UpdateRoundResult = utils.result.Result[dict, dict]
+GetPlayerRatingsResult = utils.result.Result[dict[int, float], dict]
 
 
 def _handle_validation_error(e: drf_serializers.ValidationError) -> dict:
@@ -170,22 +171,29 @@ def create_tournament_with_participation(
 
 
 @database_sync_to_async
-def get_waiting_tournament() -> Optional[int]:
+def get_player_ratings(user_ids: list[int]) -> GetPlayerRatingsResult:
     """
-    募集中のトーナメントクエリセットの中で最初の1件を取得する
+    ユーザーのレーティングをまとめて取得する関数。
 
-    Return:
-        int: 正常に取得できた場合
-        None: 募集中のトーナメントが一つもない場合
-    """
-    tournament = tournament_models.Tournament.objects.filter(
-        status=constants.TournamentFields.StatusEnum.NOT_STARTED.value
-    ).first()
+    Args:
+        user_ids (list[int]): ユーザーのIDのリスト
 
-    if tournament is not None:
-        return tournament.id
+    Returns:
+        GetPlayerRatingsResult: { user_id: rating }のResult、Playerが存在しないユーザーは含まない
+          - error: DatabaseError
+    """
+    try:
+        ratings = dict(
+            player_models.Player.objects.filter(
+                user_id__in=user_ids
+            ).values_list("user_id", "rating")
+        )
+    except DatabaseError as e:
+        return GetPlayerRatingsResult.error(
+            _handle_database_error(e, "Failed to get player ratings.")
+        )
 
-    return None
+    return GetPlayerRatingsResult.ok(ratings)
 
 
 @database_sync_to_async
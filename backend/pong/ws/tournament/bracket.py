@@ -0,0 +1,55 @@
+from typing import Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def num_slots(num_players: int) -> int:
+    """
+    参加者数を収められる最小のブラケットの枠数(2のべき乗)を返す。
+    枠数と参加者数の差が不戦勝(bye)の数になる。
+    """
+    if num_players < 2:
+        raise ValueError("a bracket needs at least 2 players")
+    return 1 << (num_players - 1).bit_length()
+
+
+def num_rounds(num_players: int) -> int:
+    """
+    優勝者が決まるまでのラウンド数を返す。
+    """
+    return num_slots(num_players).bit_length() - 1
+
+
+def seed_order(slots: int) -> list[int]:
+    """
+    ブラケットの枠順に並べたシード(0始まり)のリストを返す。
+    1回戦はリストの先頭から2つずつ対戦し、上位シードほど後のラウンドまで当たらない。
+    例: 8枠なら [0, 7, 3, 4, 1, 6, 2, 5]
+    """
+    order = [0]
+    while len(order) < slots:
+        size = len(order) * 2
+        order = [seed for top in order for seed in (top, size - 1 - top)]
+    return order
+
+
+def seed(players: list[T]) -> list[Optional[T]]:
+    """
+    シード順に並んだ参加者をブラケットの枠順に並べる。
+    参加者がいない枠はNone(不戦勝)で、上位シードから順に不戦勝の相手になる。
+    参加者数が枠数の半分より多いので、1回戦でNone同士が当たることはない。
+    """
+    return [
+        players[s] if s < len(players) else None
+        for s in seed_order(num_slots(len(players)))
+    ]
+
+
+def loser_ranking(num_players: int, round_number: int) -> int:
+    """
+    round_numberのラウンドで敗退した参加者の順位を返す。
+    順位はそのラウンドに残っていた人数で、1回戦の敗者は参加者数、決勝の敗者は2位になる。
+    """
+    if round_number == 1:
+        return num_players
+    return num_slots(num_players) >> (round_number - 1)
@@ -8,6 +8,8 @@ class Type(ws_constants.BaseEnum):
     LEAVE = "LEAVE"
     RELOAD = "RELOAD"
     ASSIGNED = "ASSIGNED"
+    SNAPSHOT = "SNAPSHOT"
+    PATCH = "PATCH"
 
 
 class JoinType(ws_constants.BaseEnum):
@@ -23,10 +25,33 @@ class Status(ws_constants.BaseEnum):
 
 class Event(ws_constants.BaseEnum):
     PLAYER_CHANGE = "PLAYER_CHANGE"
-    TOURNAMENT_STATE_CHANGE = "TOURNAMENT_STATE_CHANGE"
 
 
 JOIN_TYPE: Final[str] = "join_type"
 TOURNAMENT_ID: Final[str] = "tournament_id"
 PARTICIPATION_NAME: Final[str] = "participation_name"
 MATCH_ID: Final[str] = "match_id"
+VERSION: Final[str] = "version"
+FROM_VERSION: Final[str] = "from_version"
+OPS: Final[str] = "ops"
+TOURNAMENT: Final[str] = "tournament"
+
+# ラウンドの試合を作成してから、全ての試合を参加者に割り当てるまでの時間(秒)
+# ラウンドの全ての試合が同時に始まる。
+MATCH_START_COUNTDOWN: Final[float] = 5.0
+
+# ランダム参加で空き枠を確保しても参加できなかった場合に、別のトーナメントで再試行する回数
+MATCHMAKING_CLAIM_ATTEMPTS: Final[int] = 3
+
+# ランダム参加でレーティングが近いトーナメントを探すための、レーティング帯の幅
+RATING_BAND_WIDTH: Final[int] = 100
+# ランダム参加で探すレーティング帯の、参加者のレーティング帯からの最大の差
+# これより離れたトーナメントしかなければ新しくトーナメントを作成する。
+MATCHMAKING_MAX_BAND_DISTANCE: Final[int] = 3
+
+# TournamentManagerRegistryでトーナメントのロックをこの秒数以上待ったら警告を出す
+LOCK_WAIT_WARNING: Final[float] = 0.5
+
+# トーナメントの状態の差分をまとめて送る時間(秒)
+# 試合の得点などで続けて状態が変わっても、差分のメッセージはこの時間に1回までしか送らない。
+STATE_PATCH_WINDOW: Final[float] = 0.5
@@ -1,15 +1,17 @@
 import logging
 from typing import Optional
 
+import redis.exceptions  # type: ignore
 from channels.layers import BaseChannelLayer  # type: ignore
 
+from accounts.player import rating as player_rating
 from tournaments import constants as tournament_db_constants
 
 from ..share import channel_handler, player_data
 from ..share import constants as ws_constants
 from . import async_db_service as db_service
 from . import constants as tournament_constants
-from . import manager_registry
+from . import manager_registry, matchmaking
 
 logger = logging.getLogger(__name__)
 
@@ -37,11 +39,13 @@ class TournamentHandler:
         self.type_handlers = {
             tournament_constants.Type.JOIN.value: self._handle_join,
             tournament_constants.Type.LEAVE.value: self._handle_leave,
+            tournament_constants.Type.SNAPSHOT.value: self._handle_snapshot,
         }
         self.channel_handler: channel_handler.ChannelHandler = (
             channel_handler.ChannelHandler(channel_layer, channel_name)
         )
         self.manager_registry = manager_registry.global_tournament_registry
+        self.matchmaking = matchmaking.global_matchmaking_queue
         self.user_id: Optional[int] = None
         self.tournament_id: Optional[int] = None
         self.player_data: Optional[player_data.PlayerData] = None
@@ -102,9 +106,14 @@ class TournamentHandler:
         elif join_type == tournament_constants.JoinType.SELECTED.value:
             await self._handle_selected_join(data)
 
-    async def _handle_create_join(self, participation_name: str) -> None:
+    async def _handle_create_join(
+        self, participation_name: str, rating_band: Optional[int] = None
+    ) -> None:
         """
         トーナメント作成し参加した場合のハンドラ
+        作成したトーナメントは作成者のレーティング帯で参加者を募集する。
+
+        :param rating_band: 作成者のレーティング帯、Noneの場合はDBから取得する
         """
         # 型チェック用
         if self.player_data is None:
@@ -132,6 +141,17 @@ class TournamentHandler:
         await self.manager_registry.create_tournament(
             tournament_id, self.player_data
         )
+        # 作成者以外の枠をランダム参加で埋められるようにする
+        if rating_band is None:
+            rating_band = await self._get_rating_band()
+        try:
+            await self.matchmaking.open_lobby(
+                tournament_id,
+                tournament_db_constants.MAX_PARTICIPATIONS - 1,
+                rating_band,
+            )
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Failed to open lobby {tournament_id}: {e}")
         await self.channel_handler.add_to_group(f"tournament_{tournament_id}")
         await self._send_join_result(
             tournament_constants.Status.OK.value, tournament_id
@@ -140,6 +160,8 @@ class TournamentHandler:
     async def _handle_random_join(self) -> None:
         """
         ランダムなトーナメントに参加した場合のハンドラ
+        レーティングが近いトーナメントの空き枠をRedisで原子的に確保してから参加する。
+        募集中のトーナメントがなければ新しく作成する。
         """
         # 型チェック用
         if self.player_data is None:
@@ -148,25 +170,32 @@ class TournamentHandler:
             )
             return
 
-        tournament_id = await db_service.get_waiting_tournament()
-        if tournament_id is None:
-            await self._send_join_result(
-                tournament_constants.Status.ERROR.value, None
-            )
-            return
+        rating_band = await self._get_rating_band()
+        # 参加に失敗したトーナメントは、次の試行で選ばないようにする
+        failed_ids: tuple[int, ...] = ()
+        for _ in range(tournament_constants.MATCHMAKING_CLAIM_ATTEMPTS):
+            try:
+                tournament_id = await self.matchmaking.claim_any(
+                    rating_band, failed_ids
+                )
+            except redis.exceptions.RedisError as e:
+                logger.error(f"Failed to claim a seat: {e}")
+                break
+
+            if tournament_id is None:
+                await self._handle_create_join(
+                    self.player_data.participation_name,  # type: ignore
+                    rating_band,
+                )
+                return
+
+            if await self._join_claimed_tournament(tournament_id):
+                return
+            failed_ids += (tournament_id,)
 
-        success = await self.manager_registry.add_participant(
-            tournament_id, self.player_data
-        )
-        if success:
-            # 参加するトーナメントIDをセット
-            self.tournament_id = tournament_id
-        status = (
-            tournament_constants.Status.OK.value
-            if success
-            else tournament_constants.Status.ERROR.value
+        await self._send_join_result(
+            tournament_constants.Status.ERROR.value, None
         )
-        await self._send_join_result(status, tournament_id)
 
     async def _handle_selected_join(self, data: dict) -> None:
         """
@@ -186,18 +215,72 @@ class TournamentHandler:
             )
             return
 
+        try:
+            claimed = await self.matchmaking.claim(tournament_id)
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Failed to claim a seat of {tournament_id}: {e}")
+            claimed = None
+        if claimed is None:
+            # Redisで空き枠を管理していない場合は、定員を確認するTournamentManagerに直接参加する
+            joined = await self._join_tournament(tournament_id)
+        else:
+            joined = claimed and await self._join_claimed_tournament(
+                tournament_id
+            )
+        if not joined:
+            await self._send_join_result(
+                tournament_constants.Status.ERROR.value, tournament_id
+            )
+
+    async def _get_rating_band(self) -> int:
+        """
+        参加者のレーティング帯を取得する。取得できなければ初期レーティングの帯を返す。
+        """
+        rating = player_rating.INITIAL_RATING
+        ratings_result = await db_service.get_player_ratings(
+            [self.user_id]  # type: ignore
+        )
+        if ratings_result.is_error:
+            logger.error(f"Error: {ratings_result.unwrap_error()}")
+        else:
+            rating = ratings_result.unwrap().get(self.user_id, rating)  # type: ignore
+        return matchmaking.rating_band(rating)
+
+    async def _join_claimed_tournament(self, tournament_id: int) -> bool:
+        """
+        空き枠を確保したトーナメントに参加し、成功したら結果を通知する。
+        参加できなければ確保した枠を戻す。
+        TournamentManagerが他のプロセスにある場合もあるので、ここでは募集を終了しない。
+
+        Returns:
+            bool: 参加できた場合True
+        """
+        if await self._join_tournament(tournament_id):
+            return True
+
+        await self.matchmaking.release(tournament_id)
+        return False
+
+    async def _join_tournament(self, tournament_id: int) -> bool:
+        """
+        トーナメントに参加し、成功したら結果を通知する。
+
+        Returns:
+            bool: 参加できた場合True
+        """
         success = await self.manager_registry.add_participant(
-            tournament_id, self.player_data
+            tournament_id,
+            self.player_data,  # type: ignore
         )
-        if success:
-            # 参加するトーナメントIDをセット
-            self.tournament_id = tournament_id
-        status = (
-            tournament_constants.Status.OK.value
-            if success
-            else tournament_constants.Status.ERROR.value
+        if not success:
+            return False
+
+        # 参加するトーナメントIDをセット
+        self.tournament_id = tournament_id
+        await self._send_join_result(
+            tournament_constants.Status.OK.value, tournament_id
         )
-        await self._send_join_result(status, tournament_id)
+        return True
 
     async def _handle_leave(self, data: dict) -> None:
         """
@@ -217,6 +300,30 @@ class TournamentHandler:
         # 退出したので、トーナメントIDを削除
         self.tournament_id = None
 
+    async def _handle_snapshot(self, data: dict) -> None:
+        """
+        トーナメントの状態全体を要求された際の処理を行う関数
+        トーナメント画面を開いた時や、差分を受け取り損ねた時にplayerから送られる。
+        このプロセスにトーナメントが無ければ状態を空で返し、playerはRESTAPIで取得する。
+        """
+        tournament_id = data.get(tournament_constants.TOURNAMENT_ID)
+        channel_name = self.channel_handler.channel_name
+        if tournament_id is None or channel_name is None:
+            return
+
+        if await self.manager_registry.send_snapshot(
+            tournament_id, channel_name
+        ):
+            return
+        message = self._build_tournament_message(
+            tournament_constants.Type.SNAPSHOT.value,
+            {
+                tournament_constants.TOURNAMENT_ID: tournament_id,
+                tournament_constants.TOURNAMENT: None,
+            },
+        )
+        await self.channel_handler.send_to_consumer(message, channel_name)
+
     def _create_player_data(
         self, participation_name: Optional[str]
     ) -> Optional[player_data.PlayerData]:
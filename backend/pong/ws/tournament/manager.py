@@ -1,21 +1,23 @@
 import asyncio
 import logging
 import random
-from typing import Optional
+from typing import Any, Coroutine, Optional, Union
 
 from channels.db import database_sync_to_async  # type: ignore
 from channels.layers import get_channel_layer  # type: ignore
 
+from accounts.player import rating as player_rating
 from matches import constants as match_db_constants
 from tournaments import constants as tournament_db_constants
 from ws.chat import constants as chat_constants
-from ws.match import manager_registry, match_manager
+from ws.match import game_worker, manager_registry, match_manager
 from ws.share import constants as ws_constants
 
 from ..match import async_db_service as match_service
 from ..match import constants as match_ws_constants
 from ..share import channel_handler, player_data
 from . import async_db_service as tournament_service
+from . import bracket, matchmaking, state
 from . import constants as tournament_ws_constants
 
 logger = logging.getLogger(__name__)
@@ -23,17 +25,34 @@ logger = logging.getLogger(__name__)
 
 class TournamentManager:
     """
-    4人のConsumerとやり取りをしながらトーナメント進行をするためのクラス
+    bracket_size人のConsumerとやり取りをしながらトーナメント進行をするためのクラス
 
-    4人と専用のチャネルレイヤーを持つためにユニークなグループ名を持つ。
+    参加者と専用のチャネルレイヤーを持つためにユニークなグループ名を持つ。
     基本的にConsumerからは関数を通してアクションを受け取って、チャネルレイヤーを通してConsumerに通知する。
 
     group_name: 'tournament_{tournament_id}'
     """
 
     def __init__(
-        self, tournament_id: int, participant: player_data.PlayerData
+        self,
+        tournament_id: int,
+        participant: player_data.PlayerData,
+        match_start_countdown: float = tournament_ws_constants.MATCH_START_COUNTDOWN,
+        bracket_size: int = tournament_db_constants.MAX_PARTICIPATIONS,
+        patch_window: float = tournament_ws_constants.STATE_PATCH_WINDOW,
     ) -> None:
+        """
+        Args:
+            tournament_id (int): トーナメントのid
+            participant (PlayerData): トーナメントを作成した参加者
+            match_start_countdown (float): 試合を作成してから割り当てるまでの秒数
+            bracket_size (int): トーナメントの参加人数、2以上
+            patch_window (float): 状態の差分をまとめて送る秒数
+
+        Raises:
+            ValueError: bracket_sizeが2未満の場合
+        """
+        bracket.num_slots(bracket_size)
         self.tournament_id: int = tournament_id
         self.group_name: str = f"tournament_{self.tournament_id}"
         self.participants: list[player_data.PlayerData] = [
@@ -46,14 +65,25 @@ class TournamentManager:
             asyncio.Event()
         )  # 参加者を待機するイベント
         self.match_manager_registry = manager_registry.global_registry
+        self.matchmaking = matchmaking.global_matchmaking_queue
         self.participant_lock = asyncio.Lock()  # 排他制御用の Lock
+        self.match_start_countdown = match_start_countdown
+        self.bracket_size = bracket_size
+        # トーナメントの状態と、その差分をまとめて送るための状態
+        self.state = state.TournamentState(tournament_id)
+        self.patch_window = patch_window
+        self.state_version: int = 0
+        self.sent_version: int = 0
+        self.last_patch_at: float = float("-inf")
+        self.patch_task: Optional[asyncio.Task] = None
+        self.sent_patch_count: int = 0
 
     async def add_participant(
         self, participant: player_data.PlayerData
     ) -> bool:
         """
         参加者を追加。DBにも参加テーブルを作成する。
-        参加者が4人になったらトーナメントを開始する。
+        参加者がbracket_size人になったらトーナメントを開始する。
         """
         # 型チェック用
         if (
@@ -83,8 +113,8 @@ class TournamentManager:
         async with self.participant_lock:  # 排他制御
             self.participants.append(participant)
 
-            if len(self.participants) == 4:
-                # 4人集まったらイベントをセットしてトーナメントを開始
+            if len(self.participants) == self.bracket_size:
+                # 参加者が揃ったらイベントをセットしてトーナメントを開始
                 self.waiting_for_participants.set()
                 return True
 
@@ -118,7 +148,8 @@ class TournamentManager:
         )
 
         async with self.participant_lock:  # 排他制御
-            if participant in self.participants:
+            removed = participant in self.participants
+            if removed:
                 self.participants.remove(participant)
 
             # 参加者がいなくなったらキャンセル処理をして、
@@ -127,6 +158,10 @@ class TournamentManager:
                 await self.cancel_tournament()
                 return 0
 
+            # 開始前であれば、退出者の枠をランダム参加で埋められるように戻す
+            if removed and not self.waiting_for_participants.is_set():
+                await self.matchmaking.release(self.tournament_id)
+
         # トーナメント参加者全員にリロードメッセージを送信
         await self._send_player_reload_message()
         # await self.send_group_announcement(
@@ -141,15 +176,17 @@ class TournamentManager:
         トーナメントのすべての進行を管理する関数
         """
         try:
-            # 4人参加するまで待機。
+            # 参加者が揃うまで待機。
             await self.waiting_for_participants.wait()
 
             # トーナメントの開始処理を行う。
             await self._start_tournament()
 
-            # ラウンドを1つずつ進める。
-            # もし次のラウンドが残っていれば再び実行される。
-            await self._progress_rounds(self.participants)
+            # 新規トーナメント開始時に10秒待機
+            await asyncio.sleep(10)
+
+            # 優勝者が決まるまで試合を進める。
+            await self._progress_rounds(list(self.participants))
 
             # トーナメントの終了処理を行う。
             await self._end_tournament()
@@ -165,6 +202,7 @@ class TournamentManager:
         リソースを作成した後に、ラウンドを作成する。
         """
         # TODO: トーナメント開始アナウンスを送信。
+        await self.matchmaking.close_lobby(self.tournament_id)
         update_result = await tournament_service.update_tournament_status(
             self.tournament_id,
             tournament_db_constants.TournamentFields.StatusEnum.ON_GOING.value,
@@ -173,219 +211,345 @@ class TournamentManager:
         if update_result.is_error:
             logger.error(f"Error: {update_result.unwrap_error()}")
 
-        # トーナメント情報を更新するように通知
-        await self._send_tournament_reload_message()
+        # トーナメント情報の変更を通知
+        self.state.set_status(
+            tournament_db_constants.TournamentFields.StatusEnum.ON_GOING.value
+        )
+        await self._notify_state_change()
 
     async def _progress_rounds(
-        self, participants: list[player_data.PlayerData], round_number: int = 1
+        self, participants: list[player_data.PlayerData]
     ) -> None:
         """
-        トーナメントのラウンドを進行し、参加者が1人になるまでラウンドを繰り返す。
+        参加者をブラケットに割り当て、優勝者が決まるまで試合を進行する。
+        各試合は前のラウンドの2試合が終わり次第始まり、ラウンド全体の終了は待たない。
         """
-        # ラウンドに進んだ人数が1人になったらラウンド進行を終了
-        if len(participants) <= 1:
-            # 残った人が優勝
-            update_result = (
-                await tournament_service.update_participation_ranking(
-                    self.tournament_id, participants[0].user_id, 1
+        # レーティングの高い順にシードを決め、ブラケットの枠順に並べる
+        # 同じレーティングの参加者の順番はランダムにする
+        random.shuffle(participants)
+        ratings = await self._get_ratings(participants)
+        participants.sort(
+            key=lambda participant: ratings.get(
+                participant.user_id,  # type: ignore
+                player_rating.INITIAL_RATING,
+            ),
+            reverse=True,
+        )
+        slots = bracket.seed(participants)
+        self.round_ids: dict[int, int] = {}  # { round_number: round_id }
+        self.round_lock = asyncio.Lock()
+        # 各ラウンドで勝者が決まっていない枠の数
+        self.unresolved_slots: dict[int, int] = {
+            round_number: len(slots) >> round_number
+            for round_number in range(1, bracket.num_rounds(len(slots)) + 1)
+        }
+        self.bracket_tasks: list[asyncio.Task] = []
+
+        try:
+            # 1回戦は全ての試合をまとめて作成し、同時に開始する
+            first_round = [
+                (slots[i], slots[i + 1]) for i in range(0, len(slots), 2)
+            ]
+            match_tasks = iter(
+                await self._start_matches(
+                    1,
+                    [
+                        (player1, player2)
+                        for player1, player2 in first_round
+                        if player1 is not None and player2 is not None
+                    ],
                 )
             )
-            if update_result.is_error:
-                logger.error(f"Error: {update_result.unwrap_error()}")
+            winners = []
+            for player1, player2 in first_round:
+                if player1 is not None and player2 is not None:
+                    winners.append(next(match_tasks))
+                else:
+                    winners.append(
+                        self._create_bracket_task(
+                            self._walkover(1, player1 or player2)
+                        )
+                    )
+
+            # 2回戦以降は、対戦相手が決まった試合から順に開始する
+            round_number = 1
+            while len(winners) > 1:
+                round_number += 1
+                winners = [
+                    self._create_bracket_task(
+                        self._play_bracket_match(
+                            round_number, winners[i], winners[i + 1]
+                        )
+                    )
+                    for i in range(0, len(winners), 2)
+                ]
+            champion = await winners[0]
+        finally:
+            for task in self.bracket_tasks:
+                task.cancel()
+
+        # 残った人が優勝
+        if champion is None:
             return
-
-        # ラウンド作成
-        create_result = await tournament_service.create_round(
-            self.tournament_id,
-            round_number,
-            tournament_db_constants.RoundFields.StatusEnum.ON_GOING.value,
+        update_result = await tournament_service.update_participation_ranking(
+            self.tournament_id, champion.user_id, 1
         )
-        if create_result.is_error:
-            logger.error(f"Error: {create_result.unwrap_error()}")
+        if update_result.is_error:
+            logger.error(f"Error: {update_result.unwrap_error()}")
 
-        # TODO: ラウンド開始をアナウンス
-        await self._send_tournament_reload_message()
+    async def _get_ratings(
+        self, participants: list[player_data.PlayerData]
+    ) -> dict[int, float]:
+        """
+        参加者のレーティングを取得する。取得できなければ空のdictを返し、シードはランダムになる。
+        """
+        user_ids: list[int] = [
+            participant.user_id  # type: ignore
+            for participant in participants
+        ]
+        ratings_result = await tournament_service.get_player_ratings(user_ids)
+        if ratings_result.is_error:
+            logger.error(f"Error: {ratings_result.unwrap_error()}")
+            return {}
+        return ratings_result.unwrap()
+
+    def _create_bracket_task(
+        self, coroutine: Coroutine[Any, Any, Optional[player_data.PlayerData]]
+    ) -> asyncio.Task:
+        """
+        ブラケットの1枠の勝者を決めるタスクを作成する。
+        トーナメントが中断された時にまとめてキャンセルできるように保持する。
+        """
+        task = asyncio.create_task(coroutine)
+        self.bracket_tasks.append(task)
+        return task
+
+    async def _play_bracket_match(
+        self,
+        round_number: int,
+        feeder1: asyncio.Task,
+        feeder2: asyncio.Task,
+    ) -> Optional[player_data.PlayerData]:
+        """
+        前のラウンドの2つの枠の勝者が決まるのを待ち、勝者同士の試合を行う。
 
-        # 新規ラウンド時に10秒待機
-        await asyncio.sleep(10)
+        :return: 勝者、勝ち上がる参加者がいない場合はNone
+        """
+        player1, player2 = await asyncio.gather(feeder1, feeder2)
 
-        value = create_result.unwrap()
-        round_id = value[tournament_db_constants.RoundFields.ID]
+        # 参加者リストを最新のものと比較して、退出した参加者は勝ち上がらない
+        async with self.participant_lock:
+            current_participants = set(self.participants)
+            if player1 not in current_participants:
+                player1 = None
+            if player2 not in current_participants:
+                player2 = None
 
-        # ラウンドの1対1マッチに振り分ける
-        matchups = self._pair_participants(participants)
-        # MatchManagerを作成し、並列で実行する
-        match_results = await self._run_matches(round_id, matchups)
-        # 勝者・敗者処理
-        next_round_participants = await self._process_results(
-            round_number, match_results
+        if player1 is None or player2 is None:
+            return await self._walkover(round_number, player1 or player2)
+        (match_task,) = await self._start_matches(
+            round_number, [(player1, player2)]
         )
+        return await match_task
+
+    async def _walkover(
+        self, round_number: int, player: Optional[player_data.PlayerData]
+    ) -> Optional[player_data.PlayerData]:
+        """
+        対戦相手がいない枠の参加者を、試合をせずに勝ち上がらせる。
+        """
+        await self._resolve_slot(round_number)
+        return player
+
+    async def _get_round_id(self, round_number: int) -> int:
+        """
+        ラウンドのidを返す。ラウンドの最初の試合を始める時にラウンドを作成する。
+        """
+        async with self.round_lock:
+            if round_number in self.round_ids:
+                return self.round_ids[round_number]
 
-        async with (
-            self.participant_lock
-        ):  # 参加者リストを最新のものと比較して更新
-            current_participants = set(self.participants)  # 最新の参加者リスト
-            next_round_participants = [
-                p for p in next_round_participants if p in current_participants
+            create_result = await tournament_service.create_round(
+                self.tournament_id,
+                round_number,
+                tournament_db_constants.RoundFields.StatusEnum.ON_GOING.value,
+            )
+            if create_result.is_error:
+                logger.error(f"Error: {create_result.unwrap_error()}")
+            value = create_result.unwrap()
+            self.round_ids[round_number] = value[
+                tournament_db_constants.RoundFields.ID
             ]
+            self.state.add_round(round_number)
+
+        # TODO: ラウンド開始をアナウンス
+        await self._notify_state_change()
+        return self.round_ids[round_number]
+
+    async def _resolve_slot(self, round_number: int) -> None:
+        """
+        ラウンドの1枠の勝者が決まったことを記録する。
+        ラウンドの全ての枠が決まったらラウンドを終了する。
+        """
+        self.unresolved_slots[round_number] -= 1
+        if (
+            self.unresolved_slots[round_number] > 0
+            or round_number not in self.round_ids
+        ):
+            return
 
         update_result = await tournament_service.update_round_status(
-            round_id,
+            self.round_ids[round_number],
             tournament_db_constants.RoundFields.StatusEnum.COMPLETED.value,
         )
         if update_result.is_error:
             logger.error(f"Error: {update_result.unwrap_error()}")
 
         # TODO: ラウンド終了をアナウンス
-        await self._send_tournament_reload_message()
-
-        await self._progress_rounds(next_round_participants, round_number + 1)
-
-    def _pair_participants(
-        self, participants: list[player_data.PlayerData]
-    ) -> list[tuple[player_data.PlayerData, player_data.PlayerData]]:
-        """
-        残りの参加者をランダムにペアリングして1対1のマッチを作成する。
-
-        :return: 1対1マッチのリスト
-        """
-        random.shuffle(participants)
-        matchups = [
-            (participants[i], participants[i + 1])
-            for i in range(0, len(participants) - 1, 2)
-        ]
-        return matchups
+        self.state.set_round_status(
+            round_number,
+            tournament_db_constants.RoundFields.StatusEnum.COMPLETED.value,
+        )
+        await self._notify_state_change()
 
-    async def _run_matches(
+    async def _start_matches(
         self,
-        round_id: int,
+        round_number: int,
         matchups: list[tuple[player_data.PlayerData, player_data.PlayerData]],
-    ) -> list[tuple[int, player_data.PlayerData, player_data.PlayerData]]:
+    ) -> list[asyncio.Task]:
         """
-        各マッチを並列で実行し、結果を返す。
+        マッチを作成してバックグラウンドで実行し、各マッチの勝者を返すタスクのリストを返す。
+        まとめて作成したマッチは、カウントダウンの後に全員へ同時に割り当てる。
 
         :param matchups: 1対1のマッチリスト
-        :return: 各マッチの結果 (勝者, 敗者) のリスト
+        :return: 各マッチの勝者を返すタスクのリスト
         """
-        # マッチ作成と参加レコード作成
-        create_tasks = [match_service.create_match(round_id) for _ in matchups]
-        create_results = await asyncio.gather(*create_tasks)
-        await self._send_tournament_reload_message()
+        if not matchups:
+            return []
+        round_id = await self._get_round_id(round_number)
 
-        self.valid_matches = []
-        self.match_manager_tasks = []  # バックグラウンドで実行する run() タスクを格納
-
-        for (player1, player2), create_result in zip(matchups, create_results):
-            self.participation_tasks = []
-
-            if create_result.is_error:
-                logger.error(f"Error: {create_result.unwrap_error()}")
-
-            value = create_result.unwrap()
-            match_id = value[match_db_constants.MatchFields.ID]
-
-            # 参加レコード作成
-            self.participation_tasks.append(
-                match_service.create_participation(
-                    match_id,
-                    player1.user_id,
-                    team=match_ws_constants.Team.ONE.value,
-                )
-            )
-            self.participation_tasks.append(
-                match_service.create_participation(
-                    match_id,
-                    player2.user_id,
-                    team=match_ws_constants.Team.TWO.value,
-                )
-            )
-            # 参加レコードを並列作成
-            participation_results = await asyncio.gather(
-                *self.participation_tasks
+        # マッチと参加レコードをまとめて作成
+        user_id_matchups: list[tuple[int, int]] = [
+            (player1.user_id, player2.user_id)  # type: ignore
+            for player1, player2 in matchups
+        ]
+        create_result = await match_service.create_round_matches(
+            round_id, user_id_matchups
+        )
+        if create_result.is_error:
+            logger.error(f"Error: {create_result.unwrap_error()}")
+        match_ids = create_result.unwrap()["match_ids"]
+        for user_id_matchup, match_id in zip(user_id_matchups, match_ids):
+            self.state.add_match(
+                round_number, round_id, match_id, user_id_matchup
             )
-            for result in participation_results:
-                if result.is_error:
-                    logger.error(f"Error: {result.unwrap_error()}")
+        await self._notify_state_change()
 
+        match_tasks = []
+        for (player1, player2), match_id in zip(matchups, match_ids):
             # MatchManager 作成と登録
-            manager = match_manager.MatchManager(
-                match_id=match_id,
-                player1=player1,
-                player2=player2,
-                mode=match_ws_constants.Mode.REMOTE.value,
-                tournament_id=self.tournament_id,
-            )
+            manager: Union[
+                match_manager.MatchManager, game_worker.RemoteMatchManager
+            ]
+            if game_worker.is_enabled():
+                # 試合は担当のgame workerのプロセスで実行する
+                manager = game_worker.RemoteMatchManager(
+                    match_id=match_id,
+                    player1=player1,
+                    player2=player2,
+                    tournament_id=self.tournament_id,
+                )
+            else:
+                manager = match_manager.MatchManager(
+                    match_id=match_id,
+                    player1=player1,
+                    player2=player2,
+                    mode=match_ws_constants.Mode.REMOTE.value,
+                    tournament_id=self.tournament_id,
+                )
 
-            # MatchManagerRegistryにMatchManagerを追加
-            await self.match_manager_registry.register_match_manager(
-                match_id, manager
-            )
+                # MatchManagerRegistryにMatchManagerを追加
+                await self.match_manager_registry.register_match_manager(
+                    match_id, manager
+                )
             # 試合をバックグラウンドで実行
-            self.match_manager_tasks.append(asyncio.create_task(manager.run()))
-
-            # 試合開始を 各consumer に通知
-            # await self.send_group_announcement(
-            #    chat_constants.GroupAnnouncement.MessageType.MATCH_START.value,
-            #    player1,
-            #    player2,
-            # )
-            await asyncio.sleep(5)
-            await self._send_assign_match_message(match_id, player1)
-            await self._send_assign_match_message(match_id, player2)
-
-            self.valid_matches.append((match_id, manager, player1, player2))
-
-        # バックグラウンドタスクの結果を収集
-        match_results = await asyncio.gather(*self.match_manager_tasks)
-
-        final_results = []
-        for match_winner, (match_id, manager, player1, player2) in zip(
-            match_results, self.valid_matches
-        ):
-            # 型チェックの関係で必要
-            # 実際にはNoneが入ることはないはず
-            if match_winner is None:
-                continue
-
-            # 試合結果を保持
-            if match_winner.channel_name == player1.channel_name:
-                winner = player1
-                loser = player2
-            else:
-                winner = player2
-                loser = player1
-            final_results.append((match_id, winner, loser))
+            match_tasks.append(
+                self._create_bracket_task(
+                    self._play_match(
+                        round_number,
+                        match_id,
+                        asyncio.create_task(manager.run()),
+                        player1,
+                        player2,
+                    )
+                )
+            )
 
-        return final_results
+        return match_tasks
 
-    async def _process_results(
+    async def _play_match(
         self,
         round_number: int,
-        match_results: list[
-            tuple[int, player_data.PlayerData, player_data.PlayerData]
-        ],
-    ) -> list[player_data.PlayerData]:
+        match_id: int,
+        run_task: asyncio.Task,
+        player1: player_data.PlayerData,
+        player2: player_data.PlayerData,
+    ) -> Optional[player_data.PlayerData]:
         """
-        マッチの結果をアナウンスし、敗者を削除する。
+        カウントダウンの後に両プレーヤーをマッチに割り当て、試合の終了を待って結果を処理する。
 
-        :param match_results: 各マッチのIDと結果 (勝者, 敗者) のリスト
+        :return: 勝者
         """
-        next_round_participants = []
-        for match_id, winner, loser in match_results:
-            # 敗者のランキングを更新
-            ranking = 4
-            if round_number == 2:
-                ranking = 2
-
-            update_result = (
-                await tournament_service.update_participation_ranking(
-                    self.tournament_id, loser.user_id, ranking
-                )
+        try:
+            await asyncio.sleep(self.match_start_countdown)
+            await asyncio.gather(
+                self._send_assign_match_message(match_id, player1),
+                self._send_assign_match_message(match_id, player2),
+            )
+            self.state.set_match_status(
+                match_id,
+                match_db_constants.MatchFields.StatusEnum.ON_GOING.value,
             )
-            if update_result.is_error:
-                logger.error(f"Error: {update_result.unwrap_error()}")
-            next_round_participants.append(winner)
-        return next_round_participants
+            await self._notify_state_change()
+            match_winner = await run_task
+        finally:
+            run_task.cancel()
+
+        # game workerが試合を開始できなかった場合は、試合が中止されて勝者がいない
+        if match_winner is None:
+            self.state.set_match_status(
+                match_id,
+                match_db_constants.MatchFields.StatusEnum.CANCELED.value,
+            )
+            await self._notify_state_change()
+            await self._resolve_slot(round_number)
+            return None
+
+        # 試合結果を保持
+        if match_winner.channel_name == player1.channel_name:
+            winner = player1
+            loser = player2
+        else:
+            winner = player2
+            loser = player1
+        self.state.set_match_winner(match_id, winner.user_id)  # type: ignore
+        await self._notify_state_change()
+        await self._process_result(round_number, loser)
+        await self._resolve_slot(round_number)
+        return winner
+
+    async def _process_result(
+        self, round_number: int, loser: player_data.PlayerData
+    ) -> None:
+        """
+        マッチの敗者のランキングを更新する。
+        """
+        ranking = bracket.loser_ranking(self.bracket_size, round_number)
+        update_result = await tournament_service.update_participation_ranking(
+            self.tournament_id, loser.user_id, ranking
+        )
+        if update_result.is_error:
+            logger.error(f"Error: {update_result.unwrap_error()}")
 
     async def _end_tournament(self) -> None:
         """
@@ -400,12 +564,16 @@ class TournamentManager:
         if update_result.is_error:
             logger.error(f"Error: {update_result.unwrap_error()}")
 
-        await self._send_tournament_reload_message()
+        self.state.set_status(
+            tournament_db_constants.TournamentFields.StatusEnum.COMPLETED.value
+        )
+        await self._notify_state_change()
 
     async def cancel_tournament(self) -> None:
         """
         トーナメント中止処理。
         """
+        await self.matchmaking.close_lobby(self.tournament_id)
         # トーナメント開始後のキャンセル処理
         # 状態がCOMPLETEDではない子のトーナメントに紐づくリソースをすべてCANCELEDに変更
         update_result = await tournament_service.cancel_uncompleted_tournament(
@@ -414,6 +582,9 @@ class TournamentManager:
         if update_result.is_error:
             logger.error(f"Error: {update_result.unwrap_error()}")
 
+        self.state.cancel()
+        await self._notify_state_change()
+
     async def _send_player_reload_message(self) -> None:
         """
         参加者が変わったことをConsumerに伝える関数
@@ -427,18 +598,93 @@ class TournamentManager:
         )
         await self.channel_handler.send_to_group(self.group_name, message)
 
-    async def _send_tournament_reload_message(self) -> None:
+    async def add_score(
+        self, match_id: int, user_id: int, pos_x: int, pos_y: int
+    ) -> None:
+        """
+        試合の得点をトーナメントの状態に追加し、参加者に通知する。
+        MatchManagerから得点が入るたびに呼ばれる。
+        """
+        self.state.add_score(match_id, user_id, pos_x, pos_y)
+        await self._notify_state_change()
+
+    async def _notify_state_change(self) -> None:
         """
         トーナメントの状態が変わったことをConsumerに伝える関数
-        これを受け取ったプレーヤーはRESTAPIで情報を取得し、画面を更新する。
+        変更はJSON Patch形式の差分としてグループに送り、プレーヤーはそれを適用して画面を更新する。
+
+        状態のバージョンを1つ進め、送信はpatch_window秒に1回までにまとめる。
+        まとめた間に起きた変更は、最後のバージョンを付けた1回のメッセージで送る。
         """
-        message = self._build_tournament_message(
-            tournament_ws_constants.Type.RELOAD.value,
+        if not self.state.pending_ops:
+            return
+        self.state_version += 1
+        if self.patch_task is None or self.patch_task.done():
+            self.patch_task = asyncio.create_task(self._flush_patches())
+
+    async def _flush_patches(self) -> None:
+        """
+        前回の送信からpatch_window秒経つのを待ち、まだ送っていない差分を送る。
+        待っている間に変更があれば、まとめて送る。
+        """
+        loop = asyncio.get_running_loop()
+        while self.sent_version < self.state_version:
+            wait = self.last_patch_at + self.patch_window - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            message = self._take_patch_message()
+            if message is not None:
+                await self.channel_handler.send_to_group(
+                    self.group_name, message
+                )
+
+    def _take_patch_message(self) -> Optional[dict]:
+        """
+        まだ送っていない差分のメッセージを作成し、送ったことにする。
+        差分はfrom_versionの状態に適用するとversionの状態になる。
+
+        :return: 作成したメッセージ、送っていない差分がなければNone
+        """
+        ops = self.state.take_ops()
+        if not ops:
+            return None
+        from_version = self.sent_version
+        self.sent_version = self.state_version
+        self.last_patch_at = asyncio.get_running_loop().time()
+        self.sent_patch_count += 1
+        return self._build_tournament_message(
+            tournament_ws_constants.Type.PATCH.value,
             {
-                tournament_ws_constants.Event.key(): tournament_ws_constants.Event.TOURNAMENT_STATE_CHANGE.value
+                tournament_ws_constants.TOURNAMENT_ID: self.tournament_id,
+                tournament_ws_constants.FROM_VERSION: from_version,
+                tournament_ws_constants.VERSION: self.sent_version,
+                tournament_ws_constants.OPS: ops,
             },
         )
-        await self.channel_handler.send_to_group(self.group_name, message)
+
+    async def send_snapshot(self, channel_name: str) -> None:
+        """
+        トーナメントの状態全体をConsumerに送る関数
+        プレーヤーはこれを受け取った後、続くPATCHメッセージの差分を適用して状態を保つ。
+
+        まだ送っていない差分は先にグループに送り、スナップショットのバージョンと揃える。
+        """
+        patch_message = self._take_patch_message()
+        snapshot_message = self._build_tournament_message(
+            tournament_ws_constants.Type.SNAPSHOT.value,
+            {
+                tournament_ws_constants.TOURNAMENT_ID: self.tournament_id,
+                tournament_ws_constants.VERSION: self.sent_version,
+                tournament_ws_constants.TOURNAMENT: self.state.snapshot(),
+            },
+        )
+        if patch_message is not None:
+            await self.channel_handler.send_to_group(
+                self.group_name, patch_message
+            )
+        await self.channel_handler.send_to_consumer(
+            snapshot_message, channel_name
+        )
 
     async def _send_assign_match_message(
         self, match_id: int, player: player_data.PlayerData
@@ -1,7 +1,11 @@
 import asyncio
+import contextlib
 import logging
+import time
+from typing import AsyncIterator, Optional
 
 from ..share import player_data
+from . import constants as tournament_constants
 from . import manager
 
 logger = logging.getLogger(__name__)
@@ -11,16 +15,30 @@ class TournamentManagerRegistry:
     """
     トーナメント進行クラス（TournamentManager）を操作する関数を提供するクラス
     Consumerはこのクラスの関数を通して、自分が参加するトーナメントの進行クラスにアクションを送る。
+
+    ロックはトーナメントごとに持ち、DB操作を待つ参加・退出が他のトーナメントを止めないようにする。
+    チャットや状態の送信は参加者を変えないので、ロックを取らずに送る。
+    ロックを待った時間は計測し、stats()で確認できる。
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        lock_wait_warning: float = tournament_constants.LOCK_WAIT_WARNING,
+    ) -> None:
         self.tournaments: dict[
             int, manager.TournamentManager
         ] = {}  # { tournament_id: TournamentManager }
         self.tasks: dict[
             int, asyncio.Task
         ] = {}  # { tournament_id: asyncio.Task } トーナメントIDと対応するタスクを保持
-        self.lock = asyncio.Lock()
+        self.locks: dict[int, asyncio.Lock] = {}  # { tournament_id: Lock }
+        self.lock_wait_warning = lock_wait_warning
+
+        # 計測値
+        self.lock_acquisitions: int = 0
+        self.contended_acquisitions: int = 0
+        self.total_lock_wait: float = 0.0
+        self.max_lock_wait: float = 0.0
 
     async def create_tournament(
         self, tournament_id: int, participant: player_data.PlayerData
@@ -29,20 +47,20 @@ class TournamentManagerRegistry:
         tournament_id に TournamentManager を作成し、トーナメントを開始。
         終了後に回収する。
         """
-        async with self.lock:
-            if tournament_id in self.tournaments:
-                return  # 既にトーナメントが存在する場合は何もしない
+        if tournament_id in self.tournaments:
+            return  # 既にトーナメントが存在する場合は何もしない
 
-            tournament_manager = manager.TournamentManager(
-                tournament_id, participant
-            )
-            self.tournaments[tournament_id] = tournament_manager
+        tournament_manager = manager.TournamentManager(
+            tournament_id, participant
+        )
+        self.tournaments[tournament_id] = tournament_manager
+        self.locks[tournament_id] = asyncio.Lock()
 
-            # `run()` を非同期タスクとして実行し、並列処理を可能にする
-            task = asyncio.create_task(
-                self._run_tournament(tournament_id, tournament_manager)
-            )
-            self.tasks[tournament_id] = task  # タスクを保存
+        # `run()` を非同期タスクとして実行し、並列処理を可能にする
+        task = asyncio.create_task(
+            self._run_tournament(tournament_id, tournament_manager)
+        )
+        self.tasks[tournament_id] = task  # タスクを保存
 
     async def _run_tournament(
         self, tournament_id: int, tournament_manager: manager.TournamentManager
@@ -61,11 +79,51 @@ class TournamentManagerRegistry:
         """
         tournament_id に対応する TournamentManager を削除
         """
-        async with self.lock:
-            if tournament_id in self.tournaments:
-                del self.tournaments[tournament_id]  # トーナメントを削除
-                if tournament_id in self.tasks:
-                    del self.tasks[tournament_id]  # タスクを削除
+        self.tournaments.pop(tournament_id, None)  # トーナメントを削除
+        self.tasks.pop(tournament_id, None)  # タスクを削除
+        self.locks.pop(tournament_id, None)
+
+    def stats(self) -> dict:
+        """
+        トーナメントの数と、トーナメントごとのロックを待った時間の計測値を返す。
+            - contended_acquisitions: 他の処理がロックを持っていて待たされた回数
+        """
+        return {
+            "tournaments": len(self.tournaments),
+            "lock_acquisitions": self.lock_acquisitions,
+            "contended_acquisitions": self.contended_acquisitions,
+            "total_lock_wait": self.total_lock_wait,
+            "max_lock_wait": self.max_lock_wait,
+        }
+
+    @contextlib.asynccontextmanager
+    async def _lock_tournament(
+        self, tournament_id: int
+    ) -> AsyncIterator[Optional[manager.TournamentManager]]:
+        """
+        トーナメントのロックを取り、TournamentManagerを返す。
+        トーナメントが存在しないか、ロックを待っている間に削除された場合はNoneを返す。
+        """
+        lock = self.locks.get(tournament_id)
+        if lock is None:
+            yield None
+            return
+
+        contended = lock.locked()
+        started_at = time.monotonic()
+        async with lock:
+            waited = time.monotonic() - started_at
+            self.lock_acquisitions += 1
+            if contended:
+                self.contended_acquisitions += 1
+            self.total_lock_wait += waited
+            self.max_lock_wait = max(self.max_lock_wait, waited)
+            if waited >= self.lock_wait_warning:
+                logger.warning(
+                    f"Waited {waited:.3f}s for the lock of tournament "
+                    f"{tournament_id}"
+                )
+            yield self.tournaments.get(tournament_id)
 
     async def add_participant(
         self, tournament_id: int, participant: player_data.PlayerData
@@ -73,11 +131,10 @@ class TournamentManagerRegistry:
         """
         指定した TournamentManager に参加者を追加
         """
-        async with self.lock:
-            if tournament_id not in self.tournaments:
+        async with self._lock_tournament(tournament_id) as tournament_manager:
+            if tournament_manager is None:
                 return False  # トーナメントが存在しない場合は何もしない
 
-            tournament_manager = self.tournaments[tournament_id]
             return await tournament_manager.add_participant(
                 participant
             )  # 参加者を追加
@@ -88,12 +145,10 @@ class TournamentManagerRegistry:
         """
         指定した TournamentManager から参加者を削除
         """
-
-        async with self.lock:
-            if tournament_id not in self.tournaments:
+        async with self._lock_tournament(tournament_id) as tournament_manager:
+            if tournament_manager is None:
                 return  # トーナメントが存在しない場合は何もしない
 
-            tournament_manager = self.tournaments[tournament_id]
             remaining_participants = (
                 await tournament_manager.remove_participant(participant)
             )  # 参加者を削除
@@ -109,22 +164,43 @@ class TournamentManagerRegistry:
         プレーヤーがグループチャットに送信したメッセージを全員に再送信する関数。
         ChatHandlerから呼ばれる。
         """
-        async with self.lock:
-            if tournament_id not in self.tournaments:
-                return  # トーナメントが存在しない場合は何もしない
-
-            tournament_manager = self.tournaments[tournament_id]
-            await tournament_manager.send_group_chat(message)
+        tournament_manager = self.tournaments.get(tournament_id)
+        if tournament_manager is None:
+            return  # トーナメントが存在しない場合は何もしない
+
+        await tournament_manager.send_group_chat(message)
+
+    async def add_match_score(
+        self,
+        tournament_id: int,
+        match_id: int,
+        user_id: int,
+        pos_x: int,
+        pos_y: int,
+    ) -> None:
+        """
+        MatchManagerからスコアが入るたびに、トーナメントの状態に得点を追加するための関数
+        """
+        tournament_manager = self.tournaments.get(tournament_id)
+        if tournament_manager is None:
+            return  # トーナメントが存在しない場合は何もしない
+        await tournament_manager.add_score(match_id, user_id, pos_x, pos_y)
 
-    async def send_match_reload_message(self, tournament_id: int) -> None:
+    async def send_snapshot(
+        self, tournament_id: int, channel_name: str
+    ) -> bool:
         """
-        MatchManagerからスコアが入るたびにリロードメッセージを送るための関数
+        トーナメントの状態全体をConsumerに送る関数。
+        TournamentHandlerから呼ばれる。
+
+        Returns:
+            bool: 送信した場合True、このプロセスにトーナメントが存在しない場合False
         """
-        async with self.lock:
-            if tournament_id not in self.tournaments:
-                return  # トーナメントが存在しない場合は何もしない
-            tournament_manager = self.tournaments[tournament_id]
-            await tournament_manager._send_tournament_reload_message()
+        tournament_manager = self.tournaments.get(tournament_id)
+        if tournament_manager is None:
+            return False
+        await tournament_manager.send_snapshot(channel_name)
+        return True
 
 
 # === グローバルな MatchManagerRegistry インスタンス ===
@@ -0,0 +1,242 @@
+import logging
+from typing import Any, Final, Optional, Sequence
+
+import redis.exceptions
+
+from ws.share.async_redis_client import AsyncRedisClient  # type: ignore
+
+from . import constants as tournament_constants
+
+logger = logging.getLogger(__name__)
+
+OPEN_LOBBIES_KEY: Final[str] = "matchmaking:lobbies:open"
+LOBBY_SEATS_KEY: Final[str] = "matchmaking:lobbies:seats"
+LOBBY_BANDS_KEY: Final[str] = "matchmaking:lobbies:bands"
+
+# 募集中のロビーのscoreは (レーティング帯 * BAND_SCORE_STRIDE + トーナメントID)。
+# 同じレーティング帯のロビーがscoreの連続した範囲に並び、その中では古い順になる。
+BAND_SCORE_STRIDE: Final[int] = 1 << 32
+
+# ARGV[1]は除外するトーナメントIDの数n、ARGV[2]からn個が除外するトーナメントID。
+# 残りのARGVの(最小score, 最大score)の範囲を順に探し、除外されていない一番古いロビーの
+# 空き枠を1つ確保してそのトーナメントIDを返す。空き枠が無くなったロビーは募集中から外す。
+CLAIM_ANY_SCRIPT: Final[str] = """
+local excluded_count = tonumber(ARGV[1])
+local excluded = {}
+for i = 2, excluded_count + 1 do
+    excluded[ARGV[i]] = true
+end
+for i = excluded_count + 2, #ARGV, 2 do
+    local ids = redis.call(
+        'ZRANGEBYSCORE', KEYS[1], ARGV[i], '(' .. ARGV[i + 1],
+        'LIMIT', 0, excluded_count + 1
+    )
+    for _, id in ipairs(ids) do
+        if not excluded[id] then
+            local seats = redis.call('HINCRBY', KEYS[2], id, -1)
+            if seats <= 0 then
+                redis.call('ZREM', KEYS[1], id)
+            end
+            return id
+        end
+    end
+end
+return false
+"""
+
+# 指定したロビーに空き枠があれば1つ確保する。
+# 確保できたら1、空き枠がなければ0、ロビーの空き枠数が記録されていなければ-1を返す。
+CLAIM_SCRIPT: Final[str] = """
+local seats = redis.call('HGET', KEYS[2], ARGV[1])
+if not seats then
+    return -1
+end
+seats = tonumber(seats)
+if seats <= 0 then
+    return 0
+end
+seats = redis.call('HINCRBY', KEYS[2], ARGV[1], -1)
+if seats <= 0 then
+    redis.call('ZREM', KEYS[1], ARGV[1])
+end
+return 1
+"""
+
+# 確保した空き枠をロビーに戻す。閉じたロビーには戻さない。
+RELEASE_SCRIPT: Final[str] = """
+if redis.call('HEXISTS', KEYS[2], ARGV[1]) == 0 then
+    return -1
+end
+local seats = redis.call('HINCRBY', KEYS[2], ARGV[1], 1)
+local band = tonumber(redis.call('HGET', KEYS[3], ARGV[1]) or '0')
+redis.call('ZADD', KEYS[1], band * ARGV[2] + ARGV[1], ARGV[1])
+return seats
+"""
+
+
+def rating_band(rating: float) -> int:
+    """
+    レーティングが属するレーティング帯を返す。
+    """
+    return max(0, int(rating // tournament_constants.RATING_BAND_WIDTH))
+
+
+def nearby_bands(band: int) -> list[int]:
+    """
+    ランダム参加で探すレーティング帯を、近い順に返す。
+    """
+    bands = [band]
+    for distance in range(
+        1, tournament_constants.MATCHMAKING_MAX_BAND_DISTANCE + 1
+    ):
+        if band - distance >= 0:
+            bands.append(band - distance)
+        bands.append(band + distance)
+    return bands
+
+
+class MatchmakingQueue:
+    """
+    ランダム参加で入れるトーナメント(ロビー)と、その空き枠をRedisで管理するクラス。
+    空き枠の確保と返却はLuaスクリプトで原子的に行うので、同時に大量の参加があっても
+    同じトーナメントに定員を超えて参加することはない。
+    ロビーは作成者のレーティング帯に入り、参加者は近いレーティング帯から順に、
+    同じレーティング帯の中ではトーナメントIDの小さい順(作成された順)に埋める。
+    レーティング帯ごとに1回のO(log n)の範囲検索で見つかる。
+
+    keys:
+        matchmaking:lobbies:open: 募集中のトーナメントIDのSorted Set
+        matchmaking:lobbies:seats: トーナメントIDごとの空き枠数のHash
+        matchmaking:lobbies:bands: トーナメントIDごとのレーティング帯のHash
+    """
+
+    def __init__(self) -> None:
+        # AsyncRedisClientと同じく、redis-pyのクライアントとスクリプトは型を付けずに扱う
+        self.client: Any = None
+        self.claim_any_script: Any = None
+        self.claim_script: Any = None
+        self.release_script: Any = None
+
+    async def _get_client(self) -> Any:
+        """
+        Redisクライアントを取得し、初回だけLuaスクリプトを登録する。
+
+        Exceptions：
+            redis.exceptions.ConnectionError: Redisサーバーに接続できない場合。
+        """
+        client = await AsyncRedisClient.get_client()
+        if client is not self.client:
+            self.client = client
+            self.claim_any_script = client.register_script(CLAIM_ANY_SCRIPT)
+            self.claim_script = client.register_script(CLAIM_SCRIPT)
+            self.release_script = client.register_script(RELEASE_SCRIPT)
+        return client
+
+    async def open_lobby(
+        self, tournament_id: int, seats: int, band: int
+    ) -> None:
+        """
+        トーナメントを募集中にする。
+
+        Args:
+            tournament_id (int): トーナメントのID
+            seats (int): 空き枠の数
+            band (int): トーナメントのレーティング帯
+
+        Exceptions：
+            redis.exceptions.RedisError: Redisの操作に失敗した場合。
+        """
+        client = await self._get_client()
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.hset(LOBBY_SEATS_KEY, tournament_id, seats)
+            pipe.hset(LOBBY_BANDS_KEY, tournament_id, band)
+            if seats > 0:
+                pipe.zadd(
+                    OPEN_LOBBIES_KEY,
+                    {tournament_id: band * BAND_SCORE_STRIDE + tournament_id},
+                )
+            await pipe.execute()
+
+    async def close_lobby(self, tournament_id: int) -> None:
+        """
+        トーナメントの募集を終了する。開始・中止したトーナメントに使う。
+        トーナメントの進行を止めないように、Redisのエラーはログに残すだけにする。
+        """
+        try:
+            client = await self._get_client()
+            async with client.pipeline(transaction=True) as pipe:
+                pipe.zrem(OPEN_LOBBIES_KEY, tournament_id)
+                pipe.hdel(LOBBY_SEATS_KEY, tournament_id)
+                pipe.hdel(LOBBY_BANDS_KEY, tournament_id)
+                await pipe.execute()
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Failed to close lobby {tournament_id}: {e}")
+
+    async def claim_any(
+        self, band: int, excluded: Sequence[int] = ()
+    ) -> Optional[int]:
+        """
+        レーティング帯が近いトーナメントの空き枠を1つ確保する。
+        近いレーティング帯から順に探し、同じレーティング帯では一番古いトーナメントを選ぶ。
+
+        Args:
+            band (int): 参加者のレーティング帯
+            excluded (Sequence[int]): 選ばないトーナメントのID。参加に失敗したトーナメントに使う
+
+        Returns:
+            Optional[int]: 確保したトーナメントのID、募集中のトーナメントがなければNone
+
+        Exceptions：
+            redis.exceptions.RedisError: Redisの操作に失敗した場合。
+        """
+        await self._get_client()
+        args = [len(excluded), *excluded]
+        for nearby_band in nearby_bands(band):
+            args += [
+                nearby_band * BAND_SCORE_STRIDE,
+                (nearby_band + 1) * BAND_SCORE_STRIDE,
+            ]
+        tournament_id = await self.claim_any_script(
+            keys=[OPEN_LOBBIES_KEY, LOBBY_SEATS_KEY], args=args
+        )
+        if tournament_id is None:
+            return None
+        return int(tournament_id)
+
+    async def claim(self, tournament_id: int) -> Optional[bool]:
+        """
+        指定したトーナメントの空き枠を1つ確保する。
+
+        Returns:
+            Optional[bool]: 確保できた場合True、空き枠がない場合False、
+                Redisにロビーが無い場合(募集の終了後や、open_lobbyの失敗、Redisの再起動)None
+
+        Exceptions：
+            redis.exceptions.RedisError: Redisの操作に失敗した場合。
+        """
+        await self._get_client()
+        claimed = await self.claim_script(
+            keys=[OPEN_LOBBIES_KEY, LOBBY_SEATS_KEY], args=[tournament_id]
+        )
+        if claimed == -1:
+            return None
+        return claimed == 1
+
+    async def release(self, tournament_id: int) -> None:
+        """
+        確保した空き枠をトーナメントに戻す。
+        参加に失敗した場合や、開始前のトーナメントから参加者が退出した場合に使う。
+        トーナメントの進行を止めないように、Redisのエラーはログに残すだけにする。
+        """
+        try:
+            await self._get_client()
+            await self.release_script(
+                keys=[OPEN_LOBBIES_KEY, LOBBY_SEATS_KEY, LOBBY_BANDS_KEY],
+                args=[tournament_id, BAND_SCORE_STRIDE],
+            )
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Failed to release a seat of {tournament_id}: {e}")
+
+
+# === グローバルな MatchmakingQueue インスタンス ===
+global_matchmaking_queue = MatchmakingQueue()
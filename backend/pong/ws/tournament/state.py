@@ -0,0 +1,243 @@
+import copy
+import datetime
+from typing import Any, Optional
+
+from matches import constants as match_db_constants
+from tournaments import constants as tournament_db_constants
+
+TOURNAMENT_STATUS = tournament_db_constants.TournamentFields.StatusEnum
+ROUND_STATUS = tournament_db_constants.RoundFields.StatusEnum
+MATCH_STATUS = match_db_constants.MatchFields.StatusEnum
+
+
+def _now() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+class TournamentState:
+    """
+    TournamentManagerが持つトーナメントの状態。
+    RESTAPIの GET /tournaments/{id} と同じ形のdictを持ち、
+    変更はJSON Patch(RFC 6902)形式の操作として記録する。
+
+    クライアントは最初にsnapshot()を受け取り、その後は記録した操作を順に適用して同じ状態を保つ。
+    """
+
+    def __init__(self, tournament_id: int) -> None:
+        now = _now()
+        self.data: dict = {
+            tournament_db_constants.TournamentFields.ID: tournament_id,
+            tournament_db_constants.TournamentFields.STATUS: TOURNAMENT_STATUS.NOT_STARTED.value,
+            tournament_db_constants.TournamentFields.CREATED_AT: now,
+            tournament_db_constants.TournamentFields.UPDATED_AT: now,
+            "rounds": [],
+        }
+        self.round_indexes: dict[int, int] = {}  # { round_number: index }
+        # { match_id: (ラウンドのindex, 試合のindex) }
+        self.match_indexes: dict[int, tuple[int, int]] = {}
+        self.pending_ops: list[dict] = []
+
+    def snapshot(self) -> dict:
+        """
+        現在の状態のコピーを返す。
+        """
+        return copy.deepcopy(self.data)
+
+    def take_ops(self) -> list[dict]:
+        """
+        前回から記録した操作を返し、記録を空にする。
+        """
+        ops, self.pending_ops = self.pending_ops, []
+        return ops
+
+    def set_status(self, status: str) -> None:
+        """
+        トーナメントの状態を変更する。
+        """
+        self._replace(
+            self.data,
+            "",
+            tournament_db_constants.TournamentFields.STATUS,
+            status,
+        )
+
+    def add_round(self, round_number: int) -> None:
+        """
+        進行中のラウンドを追加する。
+        """
+        now = _now()
+        self.round_indexes[round_number] = len(self.data["rounds"])
+        self._add(
+            self.data["rounds"],
+            "/rounds",
+            {
+                tournament_db_constants.RoundFields.ROUND_NUMBER: round_number,
+                tournament_db_constants.RoundFields.STATUS: ROUND_STATUS.ON_GOING.value,
+                tournament_db_constants.RoundFields.CREATED_AT: now,
+                tournament_db_constants.RoundFields.UPDATED_AT: now,
+                "matches": [],
+            },
+        )
+
+    def set_round_status(self, round_number: int, status: str) -> None:
+        """
+        ラウンドの状態を変更する。
+        """
+        index = self.round_indexes[round_number]
+        self._replace(
+            self.data["rounds"][index],
+            f"/rounds/{index}",
+            tournament_db_constants.RoundFields.STATUS,
+            status,
+        )
+
+    def add_match(
+        self,
+        round_number: int,
+        round_id: int,
+        match_id: int,
+        user_ids: tuple[int, int],
+    ) -> None:
+        """
+        まだ始まっていない試合を追加する。
+
+        :param user_ids: (チーム1のuser_id, チーム2のuser_id)
+        """
+        now = _now()
+        round_index = self.round_indexes[round_number]
+        matches = self.data["rounds"][round_index]["matches"]
+        self.match_indexes[match_id] = (round_index, len(matches))
+        self._add(
+            matches,
+            f"/rounds/{round_index}/matches",
+            {
+                match_db_constants.MatchFields.ID: match_id,
+                match_db_constants.MatchFields.ROUND_ID: round_id,
+                match_db_constants.MatchFields.STATUS: MATCH_STATUS.NOT_STARTED.value,
+                match_db_constants.MatchFields.CREATED_AT: now,
+                match_db_constants.MatchFields.UPDATED_AT: now,
+                "participations": [
+                    {
+                        "user_id": user_id,
+                        match_db_constants.ParticipationFields.TEAM: team.value,
+                        match_db_constants.ParticipationFields.IS_WIN: False,
+                        "scores": [],
+                    }
+                    for team, user_id in zip(
+                        match_db_constants.ParticipationFields.TeamEnum,
+                        user_ids,
+                    )
+                ],
+            },
+        )
+
+    def set_match_status(self, match_id: int, status: str) -> None:
+        """
+        試合の状態を変更する。
+        """
+        match, path = self._get_match(match_id)
+        if match is None:
+            return
+        self._replace(
+            match, path, match_db_constants.MatchFields.STATUS, status
+        )
+
+    def set_match_winner(self, match_id: int, user_id: int) -> None:
+        """
+        試合の勝者を記録し、試合を終了した状態にする。
+        """
+        match, path = self._get_match(match_id)
+        if match is None:
+            return
+        for i, participation in enumerate(match["participations"]):
+            if participation["user_id"] == user_id:
+                self._replace(
+                    participation,
+                    f"{path}/participations/{i}",
+                    match_db_constants.ParticipationFields.IS_WIN,
+                    True,
+                )
+        self._replace(
+            match,
+            path,
+            match_db_constants.MatchFields.STATUS,
+            MATCH_STATUS.COMPLETED.value,
+        )
+
+    def add_score(
+        self, match_id: int, user_id: int, pos_x: int, pos_y: int
+    ) -> None:
+        """
+        得点を追加する。
+        """
+        match, path = self._get_match(match_id)
+        if match is None:
+            return
+        for i, participation in enumerate(match["participations"]):
+            if participation["user_id"] == user_id:
+                self._add(
+                    participation["scores"],
+                    f"{path}/participations/{i}/scores",
+                    {
+                        match_db_constants.ScoreFields.CREATED_AT: _now(),
+                        match_db_constants.ScoreFields.POS_X: pos_x,
+                        match_db_constants.ScoreFields.POS_Y: pos_y,
+                    },
+                )
+
+    def cancel(self) -> None:
+        """
+        終了していないトーナメント、ラウンド、試合をすべて中止した状態にする。
+        DBのcancel_uncompleted_tournamentと同じ変更をする。
+        """
+        for round_index, round_data in enumerate(self.data["rounds"]):
+            for match_index, match in enumerate(round_data["matches"]):
+                if (
+                    match[match_db_constants.MatchFields.STATUS]
+                    != MATCH_STATUS.COMPLETED.value
+                ):
+                    self._replace(
+                        match,
+                        f"/rounds/{round_index}/matches/{match_index}",
+                        match_db_constants.MatchFields.STATUS,
+                        MATCH_STATUS.CANCELED.value,
+                    )
+            if (
+                round_data[tournament_db_constants.RoundFields.STATUS]
+                != ROUND_STATUS.COMPLETED.value
+            ):
+                self.set_round_status(
+                    round_data[
+                        tournament_db_constants.RoundFields.ROUND_NUMBER
+                    ],
+                    ROUND_STATUS.CANCELED.value,
+                )
+        if (
+            self.data[tournament_db_constants.TournamentFields.STATUS]
+            != TOURNAMENT_STATUS.COMPLETED.value
+        ):
+            self.set_status(TOURNAMENT_STATUS.CANCELED.value)
+
+    def _get_match(self, match_id: int) -> tuple[Optional[dict], str]:
+        indexes = self.match_indexes.get(match_id)
+        if indexes is None:
+            return None, ""
+        round_index, match_index = indexes
+        return (
+            self.data["rounds"][round_index]["matches"][match_index],
+            f"/rounds/{round_index}/matches/{match_index}",
+        )
+
+    def _add(self, target: list, path: str, value: dict) -> None:
+        target.append(value)
+        self.pending_ops.append(
+            {"op": "add", "path": f"{path}/-", "value": copy.deepcopy(value)}
+        )
+
+    def _replace(self, target: dict, path: str, key: str, value: Any) -> None:
+        if target[key] == value:
+            return
+        target[key] = value
+        self.pending_ops.append(
+            {"op": "replace", "path": f"{path}/{key}", "value": value}
+        )
@@ -0,0 +1,198 @@
+import contextlib
+import dataclasses
+from typing import Iterator, Optional
+from unittest import mock
+
+import pytest
+
+from ws.tournament import constants as tournament_constants
+from ws.tournament.handler import TournamentHandler
+
+
+@dataclasses.dataclass
+class HandlerMocks:
+    """
+    ハンドラに差し込んだモック
+    """
+
+    matchmaking: mock.AsyncMock
+    manager_registry: mock.MagicMock
+    send_join_result: mock.AsyncMock
+    handle_create_join: mock.AsyncMock
+
+
+@contextlib.contextmanager
+def create_handler(
+    claimed: list[Optional[int]],
+) -> Iterator[tuple[TournamentHandler, HandlerMocks]]:
+    """
+    Redisのキューとトーナメントの登録先をモックにしたハンドラを作成する
+
+    :param claimed: claim_any()が順に返すトーナメントID
+    """
+    handler = TournamentHandler(mock.MagicMock(), "player.channel")
+    handler.user_id = 1
+    handler.player_data = handler._create_player_data("player")
+    mocks = HandlerMocks(
+        matchmaking=mock.AsyncMock(),
+        manager_registry=mock.MagicMock(),
+        send_join_result=mock.AsyncMock(),
+        handle_create_join=mock.AsyncMock(),
+    )
+    mocks.matchmaking.claim_any.side_effect = claimed
+    mocks.manager_registry.add_participant = mock.AsyncMock(return_value=True)
+    with (
+        mock.patch.object(handler, "matchmaking", new=mocks.matchmaking),
+        mock.patch.object(
+            handler, "manager_registry", new=mocks.manager_registry
+        ),
+        mock.patch.object(
+            handler, "_send_join_result", new=mocks.send_join_result
+        ),
+        mock.patch.object(
+            handler, "_handle_create_join", new=mocks.handle_create_join
+        ),
+        mock.patch.object(
+            handler, "_get_rating_band", new=mock.AsyncMock(return_value=15)
+        ),
+    ):
+        yield handler, mocks
+
+
+@pytest.mark.asyncio
+async def test_random_join_uses_claimed_seat() -> None:
+    """
+    ランダム参加で確保した空き枠のトーナメントに参加するかテスト
+    """
+    with create_handler([7]) as (handler, mocks):
+        await handler._handle_random_join()
+
+    mocks.matchmaking.claim_any.assert_awaited_once_with(15, ())
+    mocks.manager_registry.add_participant.assert_awaited_once_with(
+        7, handler.player_data
+    )
+    mocks.send_join_result.assert_awaited_once_with(
+        tournament_constants.Status.OK.value, 7
+    )
+    assert handler.tournament_id == 7
+
+
+@pytest.mark.asyncio
+async def test_random_join_creates_tournament_when_no_lobby() -> None:
+    """
+    募集中のトーナメントがなければ新しく作成するかテスト
+    """
+    with create_handler([None]) as (handler, mocks):
+        await handler._handle_random_join()
+
+    mocks.handle_create_join.assert_awaited_once_with("player", 15)
+    mocks.manager_registry.add_participant.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_random_join_skips_stale_lobby() -> None:
+    """
+    参加できなかったトーナメントの枠を戻し、そのトーナメントを除いて次のトーナメントに参加するかテスト
+    他のプロセスのトーナメントかもしれないので、募集は終了しない
+    """
+    with create_handler([7, 8]) as (handler, mocks):
+        mocks.manager_registry.add_participant.side_effect = [False, True]
+
+        await handler._handle_random_join()
+
+    mocks.matchmaking.release.assert_awaited_once_with(7)
+    mocks.matchmaking.close_lobby.assert_not_awaited()
+    assert mocks.matchmaking.claim_any.await_args_list == [
+        mock.call(15, ()),
+        mock.call(15, (7,)),
+    ]
+    mocks.send_join_result.assert_awaited_once_with(
+        tournament_constants.Status.OK.value, 8
+    )
+
+
+@pytest.mark.asyncio
+async def test_selected_join_without_seat_fails() -> None:
+    """
+    指定したトーナメントに空き枠がなければ参加せずにエラーを返すかテスト
+    """
+    with create_handler([]) as (handler, mocks):
+        mocks.matchmaking.claim.return_value = False
+
+        await handler._handle_selected_join(
+            {tournament_constants.TOURNAMENT_ID: 7}
+        )
+
+    mocks.manager_registry.add_participant.assert_not_awaited()
+    mocks.send_join_result.assert_awaited_once_with(
+        tournament_constants.Status.ERROR.value, 7
+    )
+
+
+@pytest.mark.asyncio
+async def test_selected_join_without_lobby_joins_directly() -> None:
+    """
+    Redisにロビーが無いトーナメントでも、TournamentManagerに直接参加できるかテスト
+    """
+    with create_handler([]) as (handler, mocks):
+        mocks.matchmaking.claim.return_value = None
+
+        await handler._handle_selected_join(
+            {tournament_constants.TOURNAMENT_ID: 7}
+        )
+
+    mocks.manager_registry.add_participant.assert_awaited_once_with(
+        7, handler.player_data
+    )
+    mocks.send_join_result.assert_awaited_once_with(
+        tournament_constants.Status.OK.value, 7
+    )
+    assert handler.tournament_id == 7
+
+
+@pytest.mark.asyncio
+async def test_failed_join_releases_seat() -> None:
+    """
+    空き枠を確保したが参加に失敗した場合、枠を戻すかテスト
+    """
+    with create_handler([]) as (handler, mocks):
+        mocks.matchmaking.claim.return_value = True
+        mocks.manager_registry.add_participant.return_value = False
+
+        await handler._handle_selected_join(
+            {tournament_constants.TOURNAMENT_ID: 7}
+        )
+
+    mocks.matchmaking.release.assert_awaited_once_with(7)
+    mocks.send_join_result.assert_awaited_once_with(
+        tournament_constants.Status.ERROR.value, 7
+    )
+    assert handler.tournament_id is None
+
+
+@pytest.mark.asyncio
+async def test_snapshot_without_tournament_returns_empty_state() -> None:
+    """
+    このプロセスにトーナメントが無ければ、空の状態を返してRESTAPIでの取得を促すかテスト
+    """
+    with (
+        create_handler([]) as (handler, mocks),
+        mock.patch.object(
+            handler.channel_handler, "send_to_consumer", new=mock.AsyncMock()
+        ) as send_to_consumer,
+    ):
+        mocks.manager_registry.send_snapshot = mock.AsyncMock(
+            return_value=False
+        )
+
+        await handler._handle_snapshot({tournament_constants.TOURNAMENT_ID: 7})
+
+    mocks.manager_registry.send_snapshot.assert_awaited_once_with(
+        7, "player.channel"
+    )
+    assert send_to_consumer.await_args is not None
+    message = send_to_consumer.await_args.args[0]
+    assert message["payload"]["data"] == {
+        tournament_constants.TOURNAMENT_ID: 7,
+        tournament_constants.TOURNAMENT: None,
+    }
@@ -0,0 +1,393 @@
+import asyncio
+import collections
+import contextlib
+from typing import Iterator
+from unittest import mock
+
+import pytest
+
+from utils.result import Result
+from ws.match.match_manager import MatchManager
+from ws.share.player_data import PlayerData
+from ws.tournament import constants as tournament_constants
+from ws.tournament.manager import TournamentManager
+from ws.tournament.tests.test_state import apply_ops
+
+PLAYERS = [
+    PlayerData(channel_name=f"player{i}", user_id=i, participation_name=str(i))
+    for i in range(8)
+]
+
+
+class FakeTournamentDB:
+    """
+    TournamentManagerが使うDB操作を置き換え、呼び出しを記録する
+    """
+
+    def __init__(self) -> None:
+        self.next_match_id = 10
+        self.matches: dict[int, tuple[int, int, int]] = {}
+        self.rankings: dict[int, int] = {}
+        self.completed_rounds: list[int] = []
+        self.ratings: dict[int, float] = {}
+
+    async def create_round(
+        self, tournament_id: int, round_number: int, status: str
+    ) -> Result:
+        return Result.ok({"id": round_number})
+
+    async def update_round_status(self, round_id: int, status: str) -> Result:
+        self.completed_rounds.append(round_id)
+        return Result.ok({})
+
+    async def create_round_matches(
+        self, round_id: int, matchups: list[tuple[int, int]]
+    ) -> Result:
+        match_ids = []
+        for user_id1, user_id2 in matchups:
+            self.matches[self.next_match_id] = (round_id, user_id1, user_id2)
+            match_ids.append(self.next_match_id)
+            self.next_match_id += 1
+        return Result.ok({"match_ids": match_ids})
+
+    async def get_player_ratings(self, user_ids: list[int]) -> Result:
+        return Result.ok(
+            {
+                user_id: rating
+                for user_id, rating in self.ratings.items()
+                if user_id in user_ids
+            }
+        )
+
+    async def update_participation_ranking(
+        self, tournament_id: int, user_id: int, ranking: int
+    ) -> Result:
+        self.rankings[user_id] = ranking
+        return Result.ok({})
+
+    @contextlib.contextmanager
+    def patch(self, manager: TournamentManager) -> Iterator[None]:
+        """
+        DB操作を置き換える
+        """
+        with (
+            mock.patch(
+                "ws.tournament.async_db_service.create_round",
+                new=self.create_round,
+            ),
+            mock.patch(
+                "ws.tournament.async_db_service.update_round_status",
+                new=self.update_round_status,
+            ),
+            mock.patch(
+                "ws.tournament.async_db_service.update_participation_ranking",
+                new=self.update_participation_ranking,
+            ),
+            mock.patch(
+                "ws.tournament.async_db_service.get_player_ratings",
+                new=self.get_player_ratings,
+            ),
+            mock.patch(
+                "ws.match.async_db_service.create_round_matches",
+                new=self.create_round_matches,
+            ),
+        ):
+            yield
+
+
+def create_manager(settings, num_players: int) -> TournamentManager:  # type: ignore
+    settings.GAME_WORKERS = 0
+    manager = TournamentManager(
+        1,
+        PLAYERS[0],
+        match_start_countdown=0.01,
+        bracket_size=num_players,
+        patch_window=0,
+    )
+    manager.participants = PLAYERS[:num_players]
+    manager.channel_handler.send_to_group = mock.AsyncMock()  # type: ignore
+    return manager
+
+
+@pytest.mark.asyncio
+async def test_round_matches_are_assigned_together(settings) -> None:  # type: ignore
+    """
+    ラウンドの全ての試合がカウントダウンの後に同時に割り当てられるかテスト
+    """
+    fake_db = FakeTournamentDB()
+    manager = create_manager(settings, 4)
+    manager.match_start_countdown = 0.05
+    manager.round_ids = {}
+    manager.round_lock = asyncio.Lock()
+    manager.unresolved_slots = {1: 2}
+    manager.bracket_tasks = []
+    loop = asyncio.get_running_loop()
+    assigned_at: dict[str, float] = {}
+
+    async def record_assignment(match_id: int, player: PlayerData) -> None:
+        assigned_at[player.channel_name] = loop.time()
+
+    async def win_as_player1(self: MatchManager) -> PlayerData:
+        return self.player1
+
+    with (
+        fake_db.patch(manager),
+        mock.patch.object(
+            manager, "_send_assign_match_message", new=record_assignment
+        ),
+        mock.patch.object(MatchManager, "run", new=win_as_player1),
+    ):
+        started_at = loop.time()
+        match_tasks = await manager._start_matches(
+            1, [(PLAYERS[0], PLAYERS[1]), (PLAYERS[2], PLAYERS[3])]
+        )
+        winners = await asyncio.gather(*match_tasks)
+
+    assert winners == [PLAYERS[0], PLAYERS[2]]
+    assert fake_db.rankings == {1: 4, 3: 4}
+    assert fake_db.completed_rounds == [1]
+    assert set(assigned_at) == {player.channel_name for player in PLAYERS[:4]}
+    assert min(assigned_at.values()) - started_at >= 0.05
+    assert max(assigned_at.values()) - min(assigned_at.values()) < 0.05
+
+
+@pytest.mark.asyncio
+async def test_bracket_with_byes(settings) -> None:  # type: ignore
+    """
+    2のべき乗でない参加者数で、上位シードが不戦勝になり順位が正しく付くかテスト
+    """
+    fake_db = FakeTournamentDB()
+    manager = create_manager(settings, 6)
+
+    async def win_as_player1(self: MatchManager) -> PlayerData:
+        return self.player1
+
+    with (
+        fake_db.patch(manager),
+        mock.patch.object(
+            manager, "_send_assign_match_message", new=mock.AsyncMock()
+        ),
+        mock.patch.object(MatchManager, "run", new=win_as_player1),
+        mock.patch("random.shuffle"),
+    ):
+        await manager._progress_rounds(list(manager.participants))
+
+    # 8枠に6人なので、シード0と1が1回戦を不戦勝で勝ち上がる
+    first_round = [m[1:] for m in fake_db.matches.values() if m[0] == 1]
+    assert sorted(first_round) == [(2, 5), (3, 4)]
+    assert collections.Counter(fake_db.rankings.values()) == {
+        6: 2,
+        4: 2,
+        2: 1,
+        1: 1,
+    }
+    assert fake_db.rankings[0] == 1
+    assert fake_db.completed_rounds == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_next_match_starts_before_round_ends(settings) -> None:  # type: ignore
+    """
+    2回戦の試合が、ラウンドの他の試合を待たずに始まるかテスト
+    """
+    fake_db = FakeTournamentDB()
+    manager = create_manager(settings, 8)
+    # 枠順 [0, 7, 3, 4, 1, 6, 2, 5] のうち、シード1と6の試合だけ長引く
+    slow_match = asyncio.Event()
+    started: list[tuple[int, int, int]] = []
+
+    async def play(self: MatchManager) -> PlayerData:
+        assert self.match_id is not None and self.player2 is not None
+        started.append(fake_db.matches[self.match_id])
+        if self.player1.user_id == 1 and self.player2.user_id == 6:
+            await slow_match.wait()
+        return self.player1
+
+    with (
+        fake_db.patch(manager),
+        mock.patch.object(
+            manager, "_send_assign_match_message", new=mock.AsyncMock()
+        ),
+        mock.patch.object(MatchManager, "run", new=play),
+        mock.patch("random.shuffle"),
+    ):
+        task = asyncio.create_task(
+            manager._progress_rounds(list(manager.participants))
+        )
+        for _ in range(100):
+            if (2, 0, 3) in started:
+                break
+            await asyncio.sleep(0.01)
+        # 1回戦が終わる前に、勝者の決まった枠同士の2回戦が始まっている
+        assert (2, 0, 3) in started
+        assert fake_db.completed_rounds == []
+        slow_match.set()
+        await task
+
+    assert fake_db.rankings[0] == 1
+    assert collections.Counter(fake_db.rankings.values()) == {
+        8: 4,
+        4: 2,
+        2: 1,
+        1: 1,
+    }
+    assert fake_db.completed_rounds == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_bracket_is_seeded_by_rating(settings) -> None:  # type: ignore
+    """
+    レーティングの高い参加者ほど上位シードになり、1回戦で当たらないかテスト
+    """
+    fake_db = FakeTournamentDB()
+    fake_db.ratings = {0: 1600.0, 1: 1700.0, 2: 1800.0, 3: 1900.0}
+    manager = create_manager(settings, 4)
+
+    async def win_as_player1(self: MatchManager) -> PlayerData:
+        return self.player1
+
+    with (
+        fake_db.patch(manager),
+        mock.patch.object(
+            manager, "_send_assign_match_message", new=mock.AsyncMock()
+        ),
+        mock.patch.object(MatchManager, "run", new=win_as_player1),
+    ):
+        await manager._progress_rounds(list(manager.participants))
+
+    # シード順は 3, 2, 1, 0 で、1回戦は 1位と4位、2位と3位が当たる
+    first_round = [m[1:] for m in fake_db.matches.values() if m[0] == 1]
+    assert sorted(first_round) == [(2, 1), (3, 0)]
+    assert fake_db.matches[max(fake_db.matches)] == (2, 3, 2)
+    assert fake_db.rankings == {3: 1, 2: 2, 1: 4, 0: 4}
+
+
+def record_patches(manager: TournamentManager) -> list[dict]:
+    """
+    グループに送られたPATCHメッセージのデータを記録するようにする
+    """
+    sent: list[dict] = []
+
+    async def record(group_name: str, message: dict) -> None:
+        payload = message["payload"]
+        assert payload["type"] == tournament_constants.Type.PATCH.value
+        sent.append(payload["data"])
+
+    manager.channel_handler.send_to_group = record  # type: ignore
+    return sent
+
+
+@pytest.mark.asyncio
+async def test_patches_are_coalesced(settings) -> None:  # type: ignore
+    """
+    続けて起きた状態の変更が、patch_windowに1回の差分のメッセージにまとまるかテスト
+    """
+    manager = TournamentManager(1, PLAYERS[0], patch_window=0.05)
+    manager.state.add_round(1)
+    manager.state.add_match(1, 1, 10, (0, 1))
+    manager.state.take_ops()
+    sent = record_patches(manager)
+
+    for _ in range(10):
+        await manager.add_score(10, 0, 0, 0)
+    await asyncio.sleep(0.01)
+    # 最初の変更はすぐに送られる
+    assert [(p["from_version"], p["version"]) for p in sent] == [(0, 10)]
+    assert len(sent[0]["ops"]) == 10
+
+    for _ in range(5):
+        await manager.add_score(10, 1, 0, 0)
+    await asyncio.sleep(0.01)
+    # patch_windowが経つまでは送らない
+    assert len(sent) == 1
+
+    await asyncio.sleep(0.06)
+    assert [(p["from_version"], p["version"]) for p in sent] == [
+        (0, 10),
+        (10, 15),
+    ]
+    assert len(sent[1]["ops"]) == 5
+
+    await asyncio.sleep(0.06)
+    assert len(sent) == 2
+    assert manager.sent_patch_count == 2
+
+
+@pytest.mark.asyncio
+async def test_patches_rebuild_tournament(settings) -> None:  # type: ignore
+    """
+    トーナメントの開始から終了までの差分を順に適用すると、TournamentManagerの状態と同じになるかテスト
+    """
+    fake_db = FakeTournamentDB()
+    manager = create_manager(settings, 4)
+    client = manager.state.snapshot()
+    sent = record_patches(manager)
+
+    async def win_as_player1(self: MatchManager) -> PlayerData:
+        return self.player1
+
+    with (
+        mock.patch(
+            "ws.tournament.async_db_service.update_tournament_status",
+            new=mock.AsyncMock(return_value=Result.ok({})),
+        ),
+        mock.patch.object(
+            manager.matchmaking, "close_lobby", new=mock.AsyncMock()
+        ),
+        fake_db.patch(manager),
+        mock.patch.object(
+            manager, "_send_assign_match_message", new=mock.AsyncMock()
+        ),
+        mock.patch.object(MatchManager, "run", new=win_as_player1),
+    ):
+        await manager._start_tournament()
+        await manager._progress_rounds(list(manager.participants))
+        await manager._end_tournament()
+        await manager.patch_task  # type: ignore
+
+    version = 0
+    for patch in sent:
+        assert patch["from_version"] == version
+        client = apply_ops(client, patch["ops"])
+        version = patch["version"]
+    assert version == manager.state_version
+    assert client == manager.state.snapshot()
+    assert client["status"] == "completed"
+    assert [round["status"] for round in client["rounds"]] == [
+        "completed",
+        "completed",
+    ]
+    final = client["rounds"][1]["matches"][0]
+    assert final["status"] == "completed"
+    assert sum(p["is_win"] for p in final["participations"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_snapshot_sends_pending_patch_first(settings) -> None:  # type: ignore
+    """
+    スナップショットを送る前に、まだ送っていない差分を送りバージョンを揃えるかテスト
+    """
+    manager = TournamentManager(1, PLAYERS[0], patch_window=10)
+    sent = record_patches(manager)
+    manager.state.set_status("on_going")
+    await manager._notify_state_change()
+    await asyncio.sleep(0)
+    manager.state.add_round(1)
+    await manager._notify_state_change()
+    snapshots: list[dict] = []
+
+    async def record_snapshot(message: dict, channel_name: str) -> None:
+        snapshots.append(message["payload"]["data"])
+
+    with mock.patch.object(
+        manager.channel_handler, "send_to_consumer", new=record_snapshot
+    ):
+        await manager.send_snapshot("player1")
+
+    assert [(p["from_version"], p["version"]) for p in sent] == [
+        (0, 1),
+        (1, 2),
+    ]
+    assert snapshots[0]["version"] == 2
+    assert snapshots[0]["tournament"] == manager.state.snapshot()
+    assert manager.state.pending_ops == []
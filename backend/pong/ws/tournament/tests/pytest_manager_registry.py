@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from ws.share.player_data import PlayerData
+from ws.tournament.manager_registry import TournamentManagerRegistry
+
+PLAYER = PlayerData(channel_name="player", user_id=1, participation_name="1")
+
+
+class SlowTournamentManager:
+    """
+    参加者の追加でDB操作を待つTournamentManagerの代わり
+    """
+
+    def __init__(self) -> None:
+        self.release = asyncio.Event()
+        self.chats: list[dict] = []
+
+    async def add_participant(self, participant: PlayerData) -> bool:
+        await self.release.wait()
+        return True
+
+    async def send_group_chat(self, message: dict) -> None:
+        self.chats.append(message)
+
+
+def register(
+    registry: TournamentManagerRegistry, tournament_id: int
+) -> SlowTournamentManager:
+    tournament_manager = SlowTournamentManager()
+    registry.tournaments[tournament_id] = tournament_manager  # type: ignore
+    registry.locks[tournament_id] = asyncio.Lock()
+    return tournament_manager
+
+
+@pytest.mark.asyncio
+async def test_slow_tournament_does_not_block_others() -> None:
+    """
+    あるトーナメントの参加処理が、他のトーナメントの参加やチャットを止めないかテスト
+    """
+    registry = TournamentManagerRegistry()
+    slow = register(registry, 1)
+    fast = register(registry, 2)
+    fast.release.set()
+
+    slow_join = asyncio.create_task(registry.add_participant(1, PLAYER))
+    await asyncio.sleep(0)
+
+    assert await asyncio.wait_for(registry.add_participant(2, PLAYER), 0.1)
+    await asyncio.wait_for(registry.send_group_chat(1, {"message": "hi"}), 0.1)
+    assert slow.chats == [{"message": "hi"}]
+    assert not slow_join.done()
+
+    slow.release.set()
+    assert await slow_join
+    assert registry.stats()["contended_acquisitions"] == 0
+
+
+@pytest.mark.asyncio
+async def test_lock_contention_is_measured() -> None:
+    """
+    同じトーナメントのロックを待った回数と時間が記録されるかテスト
+    """
+    registry = TournamentManagerRegistry(lock_wait_warning=0.01)
+    slow = register(registry, 1)
+
+    first = asyncio.create_task(registry.add_participant(1, PLAYER))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(registry.add_participant(1, PLAYER))
+    await asyncio.sleep(0.05)
+    slow.release.set()
+    assert await first
+    assert await second
+
+    stats = registry.stats()
+    assert stats["tournaments"] == 1
+    assert stats["lock_acquisitions"] == 2
+    assert stats["contended_acquisitions"] == 1
+    assert stats["max_lock_wait"] >= 0.05
+    assert stats["total_lock_wait"] >= stats["max_lock_wait"]
+
+
+@pytest.mark.asyncio
+async def test_deleted_tournament_is_not_joined() -> None:
+    """
+    ロックを待っている間に削除されたトーナメントには参加しないかテスト
+    """
+    registry = TournamentManagerRegistry()
+    slow = register(registry, 1)
+
+    first = asyncio.create_task(registry.add_participant(1, PLAYER))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(registry.add_participant(1, PLAYER))
+    await asyncio.sleep(0)
+    await registry.delete_tournament(1)
+    slow.release.set()
+
+    assert await first
+    assert not await second
+    assert not await registry.add_participant(1, PLAYER)
@@ -0,0 +1,117 @@
+import asyncio
+from typing import Any
+
+import fakeredis
+import pytest
+from pytest_mock import MockerFixture
+
+# AsyncRedisClientをtype: ignoreしているのでそのimport先でもtype: ignoreが必要
+from ws.share.async_redis_client import AsyncRedisClient  # type: ignore
+from ws.tournament import matchmaking
+from ws.tournament.matchmaking import MatchmakingQueue
+
+"""
+Luaスクリプトを実際に実行するため、RedisはfakeredisのFakeAsyncRedisで置き換える。
+fakeredisのLuaスクリプトの実行にはlupaが必要(fakeredis[lua])。
+"""
+
+
+@pytest.fixture
+def redis_client(mocker: MockerFixture) -> Any:
+    """
+    テストごとに空のRedisを作り、AsyncRedisClient.get_client()が返すようにする
+    """
+    client = fakeredis.FakeAsyncRedis(
+        server=fakeredis.FakeServer(), decode_responses=True
+    )
+    mocker.patch.object(AsyncRedisClient, "get_client", return_value=client)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_concurrent_claims_fill_lobby_exactly(redis_client: Any) -> None:
+    """
+    claim_any()とclaim()が同時に大量に呼ばれても、空き枠の数だけ確保するかテスト
+    """
+    queue = MatchmakingQueue()
+    await queue.open_lobby(7, 3, 15)
+
+    results = await asyncio.gather(
+        *(queue.claim_any(15) for _ in range(10)),
+        *(queue.claim(7) for _ in range(5)),
+    )
+
+    claimed_any, claimed = results[:10], results[10:]
+    assert claimed_any.count(7) + claimed.count(True) == 3
+    assert claimed_any.count(None) + claimed.count(False) == 12
+    assert await redis_client.hget(matchmaking.LOBBY_SEATS_KEY, 7) == "0"
+    assert await redis_client.zscore(matchmaking.OPEN_LOBBIES_KEY, 7) is None
+
+
+@pytest.mark.asyncio
+async def test_claim_any_picks_nearest_band_and_oldest_lobby(
+    redis_client: Any,
+) -> None:
+    """
+    近いレーティング帯の一番古いロビーを選び、除外したロビーは選ばないかテスト
+    """
+    queue = MatchmakingQueue()
+    await queue.open_lobby(9, 1, 16)
+    await queue.open_lobby(8, 1, 15)
+    await queue.open_lobby(7, 1, 15)
+
+    assert await queue.claim_any(15, (7,)) == 8
+    assert await queue.claim_any(15, (7,)) == 9
+    assert await queue.claim_any(15) == 7
+    assert await queue.claim_any(15) is None
+
+
+@pytest.mark.asyncio
+async def test_full_lobby_is_removed_and_reopened_by_release(
+    redis_client: Any,
+) -> None:
+    """
+    空き枠が無くなったロビーを募集中から外し、枠を戻すと元のscoreで募集中に戻すかテスト
+    """
+    queue = MatchmakingQueue()
+    await queue.open_lobby(7, 1, 15)
+
+    assert await queue.claim(7) is True
+    assert await redis_client.zscore(matchmaking.OPEN_LOBBIES_KEY, 7) is None
+    assert await queue.claim(7) is False
+    assert await queue.claim_any(15) is None
+
+    await queue.release(7)
+
+    assert await redis_client.hget(matchmaking.LOBBY_SEATS_KEY, 7) == "1"
+    assert (
+        await redis_client.zscore(matchmaking.OPEN_LOBBIES_KEY, 7)
+        == 15 * matchmaking.BAND_SCORE_STRIDE + 7
+    )
+    assert await queue.claim_any(15) == 7
+
+
+@pytest.mark.asyncio
+async def test_closed_lobby_cannot_be_claimed_or_released(
+    redis_client: Any,
+) -> None:
+    """
+    募集を終了したロビーは確保できず、枠を戻しても募集中に戻らないかテスト
+    """
+    queue = MatchmakingQueue()
+    await queue.open_lobby(7, 2, 15)
+    assert await queue.claim(7) is True
+
+    await queue.close_lobby(7)
+
+    assert await queue.claim(7) is None
+    assert await queue.claim_any(15) is None
+    await queue.release(7)
+    assert (
+        await redis_client.exists(
+            matchmaking.OPEN_LOBBIES_KEY,
+            matchmaking.LOBBY_SEATS_KEY,
+            matchmaking.LOBBY_BANDS_KEY,
+        )
+        == 0
+    )
@@ -0,0 +1,71 @@
+import unittest
+
+from ..bracket import loser_ranking, num_rounds, num_slots, seed, seed_order
+
+
+class TestBracket(unittest.TestCase):
+    """
+    ブラケットの枠割り当てと順位計算のテスト
+    """
+
+    def test_num_slots(self) -> None:
+        """
+        参加者数を収められる最小の2のべき乗になるか
+        """
+        self.assertEqual(num_slots(2), 2)
+        self.assertEqual(num_slots(4), 4)
+        self.assertEqual(num_slots(5), 8)
+        self.assertEqual(num_slots(64), 64)
+        self.assertEqual(num_slots(65), 128)
+        self.assertEqual(num_rounds(4), 2)
+        self.assertEqual(num_rounds(6), 3)
+        with self.assertRaises(ValueError):
+            num_slots(1)
+
+    def test_seed_order_keeps_top_seeds_apart(self) -> None:
+        """
+        上位シード同士が決勝まで当たらない枠順になるか
+        """
+        self.assertEqual(seed_order(4), [0, 3, 1, 2])
+        self.assertEqual(seed_order(8), [0, 7, 3, 4, 1, 6, 2, 5])
+        order = seed_order(64)
+        self.assertEqual(sorted(order), list(range(64)))
+        # 1回戦の対戦シードの合計は常に枠数-1
+        for i in range(0, 64, 2):
+            self.assertEqual(order[i] + order[i + 1], 63)
+        # 1位と2位のシードはブラケットの別の半分に入る
+        self.assertLess(order.index(0), 32)
+        self.assertGreaterEqual(order.index(1), 32)
+
+    def test_byes_go_to_top_seeds(self) -> None:
+        """
+        不戦勝が上位シードに割り当てられ、不戦勝同士が当たらないか
+        """
+        for num_players in range(2, 65):
+            players = list(range(num_players))
+            slots = seed(players)
+            self.assertEqual(len(slots), num_slots(num_players))
+            self.assertEqual(
+                sorted(p for p in slots if p is not None), players
+            )
+            byes = []
+            for i in range(0, len(slots), 2):
+                pair = (slots[i], slots[i + 1])
+                self.assertNotEqual(pair, (None, None))
+                if None in pair:
+                    byes.append(pair[0] if pair[1] is None else pair[1])
+            self.assertEqual(
+                sorted(byes), list(range(len(slots) - num_players))
+            )
+
+    def test_loser_ranking(self) -> None:
+        """
+        敗退したラウンドに残っていた人数が順位になるか
+        """
+        self.assertEqual(loser_ranking(4, 1), 4)
+        self.assertEqual(loser_ranking(4, 2), 2)
+        self.assertEqual(loser_ranking(6, 1), 6)
+        self.assertEqual(loser_ranking(6, 2), 4)
+        self.assertEqual(loser_ranking(6, 3), 2)
+        self.assertEqual(loser_ranking(64, 1), 64)
+        self.assertEqual(loser_ranking(64, 6), 2)
@@ -0,0 +1,33 @@
+import unittest
+
+from ..constants import MATCHMAKING_MAX_BAND_DISTANCE, RATING_BAND_WIDTH
+from ..matchmaking import nearby_bands, rating_band
+
+
+class TestMatchmaking(unittest.TestCase):
+    """
+    ランダム参加で探すレーティング帯のテスト
+    """
+
+    def test_rating_band(self) -> None:
+        """
+        レーティングがRATING_BAND_WIDTHごとの帯に分かれるか
+        """
+        self.assertEqual(rating_band(0), 0)
+        self.assertEqual(rating_band(RATING_BAND_WIDTH - 0.5), 0)
+        self.assertEqual(rating_band(RATING_BAND_WIDTH), 1)
+        self.assertEqual(rating_band(1500), 1500 // RATING_BAND_WIDTH)
+        self.assertEqual(rating_band(-10), 0)
+
+    def test_nearby_bands_are_ordered_by_distance(self) -> None:
+        """
+        近いレーティング帯から順に、負の帯を含まずに並ぶか
+        """
+        bands = nearby_bands(15)
+        self.assertEqual(bands[0], 15)
+        self.assertEqual(len(bands), 2 * MATCHMAKING_MAX_BAND_DISTANCE + 1)
+        distances = [abs(band - 15) for band in bands]
+        self.assertEqual(distances, sorted(distances))
+
+        bands = nearby_bands(0)
+        self.assertEqual(bands, list(range(MATCHMAKING_MAX_BAND_DISTANCE + 1)))
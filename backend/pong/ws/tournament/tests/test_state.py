@@ -0,0 +1,93 @@
+import copy
+import unittest
+from typing import Any
+
+from ..state import TournamentState
+
+
+def apply_ops(document: dict, ops: list[dict]) -> dict:
+    """
+    クライアントと同じように、add(末尾への追加)とreplaceの操作を適用する
+    """
+    document = copy.deepcopy(document)
+    for op in ops:
+        *parents, key = op["path"].split("/")[1:]
+        target: Any = document
+        for parent in parents:
+            target = (
+                target[int(parent)]
+                if isinstance(target, list)
+                else target[parent]
+            )
+        if op["op"] == "add" and key == "-":
+            target.append(copy.deepcopy(op["value"]))
+        elif op["op"] == "replace":
+            target[key] = copy.deepcopy(op["value"])
+        else:
+            raise ValueError(op)
+    return document
+
+
+class TestTournamentState(unittest.TestCase):
+    """
+    トーナメントの状態と、その差分のテスト
+    """
+
+    def setUp(self) -> None:
+        self.state = TournamentState(1)
+        self.initial = self.state.snapshot()
+        self.state.set_status("on_going")
+        self.state.add_round(1)
+        self.state.add_match(1, 100, 10, (1, 2))
+        self.state.add_match(1, 100, 11, (3, 4))
+
+    def test_ops_rebuild_state(self) -> None:
+        """
+        記録した操作を前の状態に適用すると、現在の状態と同じになるか
+        """
+        client = apply_ops(self.initial, self.state.take_ops())
+        self.assertEqual(client, self.state.snapshot())
+
+        self.state.set_match_status(10, "on_going")
+        self.state.add_score(10, 2, 0, 5)
+        self.state.add_score(10, 1, 100, 5)
+        self.state.set_match_winner(10, 1)
+        self.state.set_round_status(1, "completed")
+        ops = self.state.take_ops()
+        self.assertEqual(len(ops), 6)
+        self.assertEqual(apply_ops(client, ops), self.state.snapshot())
+
+        participations = self.state.snapshot()["rounds"][0]["matches"][0][
+            "participations"
+        ]
+        self.assertEqual([p["user_id"] for p in participations], [1, 2])
+        self.assertEqual([p["is_win"] for p in participations], [True, False])
+        self.assertEqual([len(p["scores"]) for p in participations], [1, 1])
+        self.assertEqual(self.state.take_ops(), [])
+
+    def test_unchanged_value_is_not_recorded(self) -> None:
+        """
+        値が変わらない変更は操作として記録しないか
+        """
+        self.state.take_ops()
+        self.state.set_status("on_going")
+        self.state.add_score(99, 1, 0, 0)
+        self.assertEqual(self.state.take_ops(), [])
+
+    def test_cancel(self) -> None:
+        """
+        終了していない試合とラウンド、トーナメントだけが中止になるか
+        """
+        self.state.set_match_winner(10, 1)
+        self.state.take_ops()
+
+        self.state.cancel()
+
+        snapshot = self.state.snapshot()
+        self.assertEqual(snapshot["status"], "canceled")
+        self.assertEqual(snapshot["rounds"][0]["status"], "canceled")
+        self.assertEqual(
+            [match["status"] for match in snapshot["rounds"][0]["matches"]],
+            ["completed", "canceled"],
+        )
+        self.assertEqual(len(self.state.take_ops()), 3)
@@ -252,9 +252,10 @@ const sendMatchData = (stage, data) => {
 };
 
 const sendInit = (matchId) => {
+  const protocol = MatchEnums.Protocol.BINARY;
   const data = isValidId(matchId)
-    ? { mode: MatchEnums.Mode.REMOTE, match_id: matchId }
-    : { mode: MatchEnums.Mode.LOCAL };
+    ? { mode: MatchEnums.Mode.REMOTE, match_id: matchId, protocol }
+    : { mode: MatchEnums.Mode.LOCAL, protocol };
 
   sendMatchData(MatchEnums.Stage.INIT, data);
 };
@@ -3,6 +3,7 @@ import { BootstrapFlex } from "../../bootstrap/utilities/flex";
 import { Component } from "../../core/Component";
 import { createMatchCanvas } from "../../utils/match/createMatchCanvas";
 import { CanvasEntity } from "../../utils/match/entity/CanvasEntity";
+import { setEntities } from "../../utils/match/entity/setEntities";
 
 export class MatchRenderer extends Component {
   #canvas;
@@ -38,6 +39,7 @@ export class MatchRenderer extends Component {
 
 const animate = (canvas, entities) => {
   const draw = () => {
+    setEntities.extrapolate(entities, performance.now());
     const ctx = canvas.getContext("2d");
     ctx.clearRect(0, 0, canvas.width, canvas.height);
     for (const entity of Object.values(entities)) {
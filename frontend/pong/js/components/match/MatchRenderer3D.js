@@ -3,6 +3,7 @@ import { MatchConstants } from "../../constants/MatchConstants";
 import { Component } from "../../core/Component";
 import { MatchEnums } from "../../enums/MatchEnums";
 import { ThreeUtils } from "../../utils/match/ThreeUtils";
+import { setEntities } from "../../utils/match/entity/setEntities";
 
 export class MatchRenderer3D extends Component {
   #core;
@@ -89,6 +90,7 @@ export class MatchRenderer3D extends Component {
     const adjust_ball_y = (y) => y + MatchConstants.BALL_SIZE / 2;
 
     const animate = () => {
+      setEntities.extrapolate(entities, performance.now());
       paddle1.position.x = adjust_paddle_x(
         entities.paddle1.upperLeft.x,
       );
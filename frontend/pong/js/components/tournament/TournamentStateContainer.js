@@ -1,3 +1,4 @@
+import { convertTournamentData } from "../../api/tournaments/convertTournamentData";
 import { getTournament } from "../../api/tournaments/getTournament";
 import { BootstrapBorders } from "../../bootstrap/utilities/borders";
 import { BootstrapSizing } from "../../bootstrap/utilities/sizing";
@@ -6,25 +7,35 @@ import { Component } from "../../core/Component";
 import { TournamentEnums } from "../../enums/TournamentEnums";
 import { WebSocketEnums } from "../../enums/WebSocketEnums";
 import { UserSessionManager } from "../../session/UserSessionManager";
-import { isTournamentStateReload } from "../../utils/tournament/isTournamentStateReload";
+import { applyTournamentPatch } from "../../utils/tournament/applyTournamentPatch";
+import { TournamentPayload } from "../../websocket/payload/TournamentPayload";
 import { TournamentFinished } from "./TournamentFinished";
 import { TournamentOngoing } from "./TournamentOngoing";
 import { TournamentWaiting } from "./TournamentWaiting";
 
 export class TournamentStateContainer extends Component {
-  #reloadTournamentState;
+  #updateTournamentState;
+  // サーバーから受け取ったままの形のトーナメントの状態とそのバージョン
+  // スナップショットを受け取るまではnull
+  #tournament = null;
+  #version = 0;
 
   constructor(state = {}) {
     super({ tournamentState: null, ...state });
 
-    this.#reloadTournamentState = (payload) => {
-      const {
-        type,
-        data: { event },
-      } = payload;
-      if (!isTournamentStateReload(type, event)) return;
+    this.#updateTournamentState = (payload) => {
+      const { type, data } = payload;
+      const { tournamentId } = this._getState();
+      if (data.tournament_id !== tournamentId) return;
 
-      this.#reload();
+      switch (type) {
+        case WebSocketEnums.Tournament.Type.SNAPSHOT:
+          this.#applySnapshot(data);
+          break;
+        case WebSocketEnums.Tournament.Type.PATCH:
+          this.#applyPatch(data);
+          break;
+      }
     };
   }
 
@@ -35,18 +46,18 @@ export class TournamentStateContainer extends Component {
   }
 
   _onConnect() {
-    this.#reload();
-
     UserSessionManager.getInstance().webSocket.attachHandler(
       WebSocketEnums.Category.TOURNAMENT,
-      this.#reloadTournamentState,
+      this.#updateTournamentState,
     );
+
+    this.#requestSnapshot();
   }
 
   _onDisconnect() {
     UserSessionManager.getInstance().webSocket.detachHandler(
       WebSocketEnums.Category.TOURNAMENT,
-      this.#reloadTournamentState,
+      this.#updateTournamentState,
     );
   }
 
@@ -60,6 +71,43 @@ export class TournamentStateContainer extends Component {
     this.append(currentStatus);
   }
 
+  #requestSnapshot() {
+    const { tournamentId } = this._getState();
+    this.#tournament = null;
+    UserSessionManager.getInstance().webSocket.send(
+      WebSocketEnums.Category.TOURNAMENT,
+      TournamentPayload.createSnapshot({ tournamentId }),
+    );
+  }
+
+  #applySnapshot({ version, tournament }) {
+    // サーバーがトーナメントを管理していない(終了した)場合はRESTAPIで取得する
+    if (tournament === null) {
+      this.#reload();
+      return;
+    }
+    this.#tournament = tournament;
+    this.#version = version;
+    this._updateState({
+      tournamentState: convertTournamentData(tournament),
+    });
+  }
+
+  #applyPatch({ from_version: fromVersion, version, ops }) {
+    // スナップショットを待っている間と、既に適用したバージョンの差分は無視する
+    if (this.#tournament === null || version <= this.#version) return;
+    // 間の差分を受け取り損ねた場合は、スナップショットを取り直す
+    if (fromVersion !== this.#version) {
+      this.#requestSnapshot();
+      return;
+    }
+    this.#tournament = applyTournamentPatch(this.#tournament, ops);
+    this.#version = version;
+    this._updateState({
+      tournamentState: convertTournamentData(this.#tournament),
+    });
+  }
+
   #reload() {
     const { tournamentId } = this._getState();
     getTournament(tournamentId).then(({ tournament, error }) => {
@@ -1,3 +1,5 @@
+const TICK_RATE = 60;
+
 const BOARD_WIDTH = 600;
 const BOARD_HEIGHT = 400;
 
@@ -21,6 +23,7 @@ const SCORE_Y = BOARD_HEIGHT / 12;
 const AFTER_END_LOCAL_MATCH_REDIRECT_MS = 3000;
 
 export const MatchConstants = Object.freeze({
+  TICK_RATE,
   BOARD_WIDTH,
   BOARD_HEIGHT,
   PADDLE_WIDTH,
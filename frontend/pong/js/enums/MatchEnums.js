@@ -21,6 +21,11 @@ const Move = {
   DOWN: "DOWN",
 };
 
+const Protocol = {
+  JSON: "JSON",
+  BINARY: "BINARY",
+};
+
 const Result = {
   WIN: "WIN",
   LOSE: "LOSE",
@@ -33,4 +38,5 @@ export const MatchEnums = Object.freeze({
   Team,
   Move,
   Result,
+  Protocol,
 });
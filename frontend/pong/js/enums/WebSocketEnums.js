@@ -12,10 +12,11 @@ const Tournament = {
     LEAVE: "LEAVE",
     ASSIGNED: "ASSIGNED",
     RELOAD: "RELOAD",
+    SNAPSHOT: "SNAPSHOT",
+    PATCH: "PATCH",
   },
   ReloadEvent: {
     PLAYER_CHANGE: "PLAYER_CHANGE",
-    TOURNAMENT_STATE_CHANGE: "TOURNAMENT_STATE_CHANGE",
   },
 };
 
@@ -8,6 +8,8 @@ const initStage = (entities, data) => {
     paddle1,
     paddle2,
     ball,
+    tick_rate,
+    broadcast_rate,
   } = data;
 
   entities.team = team ?? null;
@@ -16,10 +18,35 @@ const initStage = (entities, data) => {
   entities.paddle1.updateUpperLeft(paddle1);
   entities.paddle2.updateUpperLeft(paddle2);
   entities.ball.updateUpperLeft(ball);
+  entities.keyframe = null;
+  entities.lastSeq = null;
+  entities.tickRate = tick_rate ?? MatchConstants.TICK_RATE;
+  entities.broadcastRate = broadcast_rate ?? entities.tickRate;
+  entities.motion = null;
 };
 
 const playStage = (entities, data) => {
-  const { paddle1, paddle2, ball, score1, score2 } = data;
+  // keyframeがないメッセージは全ての状態を含むものとして扱う
+  const { seq, keyframe = true, ...fields } = data;
+  // 後から届いた古いフレームは、新しい状態を巻き戻さないように捨てる
+  const lastSeq = entities.lastSeq ?? null;
+  if (seq !== undefined) {
+    if (lastSeq !== null && seq <= lastSeq) return;
+    entities.lastSeq = seq;
+  }
+  if (keyframe) entities.keyframe = fields;
+  // 差分はキーフレームに対するものなので、キーフレームを受け取るまでは適用できない
+  if (!entities.keyframe) return;
+
+  const { paddle1, paddle2, ball, ball_speed, score1, score2 } = {
+    ...entities.keyframe,
+    ...fields,
+  };
+  entities.motion = {
+    ball,
+    ballSpeed: ball_speed ?? null,
+    receivedAt: performance.now(),
+  };
 
   entities.paddle1.updateUpperLeft(paddle1);
   entities.paddle2.updateUpperLeft(paddle2);
@@ -34,10 +61,37 @@ const endStage = (entities, data) => {
   entities.score1.updateScore(score1);
   entities.score2.updateScore(score2);
   entities.ball.updateUpperLeft(MatchConstants.BALL_INIT_POS);
+  entities.motion = null;
+};
+
+// 最後に受け取ったフレームからの経過時間だけ、ボールを速度に沿って進める
+// - サーバーはティックごとではなく broadcastRate でしか送らないので、その間を埋める
+// - 次のフレームが遅れてもボールが飛んでいかないよう、1送信間隔分までしか進めない
+// - 上下の壁では反射させる
+const extrapolate = (entities, now) => {
+  const { motion, tickRate, broadcastRate } = entities;
+  if (!motion?.ballSpeed) return;
+
+  const elapsedTicks = ((now - motion.receivedAt) / 1000) * tickRate;
+  const ticks = Math.min(
+    Math.max(elapsedTicks, 0),
+    tickRate / broadcastRate,
+  );
+  const maxY = MatchConstants.BOARD_HEIGHT - MatchConstants.BALL_SIZE;
+
+  let y = motion.ball.y + motion.ballSpeed.y * ticks;
+  if (y < 0) y = -y;
+  else if (y > maxY) y = 2 * maxY - y;
+
+  entities.ball.updateUpperLeft({
+    x: motion.ball.x + motion.ballSpeed.x * ticks,
+    y,
+  });
 };
 
 export const setEntities = Object.freeze({
   initStage,
   playStage,
   endStage,
+  extrapolate,
 });
@@ -0,0 +1,18 @@
+// サーバーから届いたJSON Patch形式の差分をトーナメントの状態に適用した新しい状態を返す。
+// サーバーは配列の末尾への追加(add, "/-")と値の置き換え(replace)だけを送る。
+export const applyTournamentPatch = (tournament, ops) => {
+  const patched = structuredClone(tournament);
+  for (const { op, path, value } of ops) {
+    const keys = path.split("/").slice(1);
+    const lastKey = keys.pop();
+    const target = keys.reduce((parent, key) => parent[key], patched);
+    if (op === "add" && lastKey === "-") {
+      target.push(value);
+    } else if (op === "replace") {
+      target[lastKey] = value;
+    } else {
+      throw new Error(`unsupported patch: ${op} ${path}`);
+    }
+  }
+  return patched;
+};
@@ -1,6 +1,7 @@
 import { Endpoints } from "../constants/Endpoints";
 import { WebSocketEnums } from "../enums/WebSocketEnums";
 import { customDelay } from "../utils/customDelay";
+import { decodeMatchFrame } from "./decodeMatchFrame";
 
 export class WebSocketWrapper {
   #socket;
@@ -15,7 +16,10 @@ export class WebSocketWrapper {
     this.#onClose = onClose;
     this.#onError = onError;
     this.#onMessage = (event) => {
-      const { category, payload } = JSON.parse(event.data);
+      const { category, payload } =
+        event.data instanceof ArrayBuffer
+          ? decodeMatchFrame(event.data)
+          : JSON.parse(event.data);
       for (const handler of this.#handlers[category])
         handler(payload);
     };
@@ -54,6 +58,8 @@ export class WebSocketWrapper {
 
   async connect() {
     const socket = new WebSocket(Endpoints.WEBSOCKET);
+    // 試合のバイナリフレームを ArrayBuffer で受け取る
+    socket.binaryType = "arraybuffer";
     socket.addEventListener("close", this.#onClose);
     socket.addEventListener("error", this.#onError);
     socket.addEventListener("message", this.#onMessage);
@@ -0,0 +1,43 @@
+import { MatchEnums } from "../enums/MatchEnums";
+import { WebSocketEnums } from "../enums/WebSocketEnums";
+
+// バイナリフレームの種類 (先頭1バイト)
+const PLAY_FRAME_TYPE = 1;
+
+// INIT で protocol: BINARY を選んだ場合に届く PLAY ステージのフレームを、
+// JSON の MATCH メッセージと同じ形に変換する関数
+// レイアウト (リトルエンディアン、27バイト)
+// - uint8  フレームの種類
+// - uint32 フレーム番号
+// - uint32 シミュレーションのティック番号
+// - int16  paddle1.x, paddle1.y, paddle2.x, paddle2.y, ball.x, ball.y
+// - int16  ball_speed.x, ball_speed.y
+// - uint8  score1, score2
+export const decodeMatchFrame = (buffer) => {
+  const view = new DataView(buffer);
+  const readPos = (offset) => ({
+    x: view.getInt16(offset, true),
+    y: view.getInt16(offset + 2, true),
+  });
+  const type = view.getUint8(0);
+  if (type !== PLAY_FRAME_TYPE)
+    throw new Error(`Unknown match frame type: ${type}`);
+
+  return {
+    category: WebSocketEnums.Category.MATCH,
+    payload: {
+      stage: MatchEnums.Stage.PLAY,
+      data: {
+        seq: view.getUint32(1, true),
+        keyframe: true,
+        tick: view.getUint32(5, true),
+        paddle1: readPos(9),
+        paddle2: readPos(13),
+        ball: readPos(17),
+        ball_speed: readPos(21),
+        score1: view.getUint8(25),
+        score2: view.getUint8(26),
+      },
+    },
+  };
+};
@@ -1,7 +1,9 @@
 import { createJoin } from "./tournament/createJoin";
 import { createLeave } from "./tournament/createLeave";
+import { createSnapshot } from "./tournament/createSnapshot";
 
 export const TournamentPayload = Object.freeze({
   createJoin,
   createLeave,
+  createSnapshot,
 });
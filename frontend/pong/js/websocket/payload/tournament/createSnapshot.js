@@ -0,0 +1,9 @@
+import { WebSocketEnums } from "../../../enums/WebSocketEnums";
+
+export const createSnapshot = ({ tournamentId }) =>
+  Object.freeze({
+    type: WebSocketEnums.Tournament.Type.SNAPSHOT,
+    data: {
+      tournament_id: tournamentId,
+    },
+  });
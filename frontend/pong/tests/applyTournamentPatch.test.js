@@ -0,0 +1,83 @@
+import { describe, expect, it } from "vitest";
+import { applyTournamentPatch } from "../js/utils/tournament/applyTournamentPatch";
+
+const tournament = {
+  id: 1,
+  status: "on_going",
+  rounds: [
+    {
+      round_number: 1,
+      status: "on_going",
+      matches: [
+        {
+          id: 10,
+          status: "on_going",
+          participations: [
+            { user_id: 1, team: "1", is_win: false, scores: [] },
+            { user_id: 2, team: "2", is_win: false, scores: [] },
+          ],
+        },
+      ],
+    },
+  ],
+};
+
+describe("applies add and replace operations of tournament patches", () => {
+  it("adds a score and finishes the match", () => {
+    const score = { created_at: "now", pos_x: 0, pos_y: 5 };
+    const patched = applyTournamentPatch(tournament, [
+      {
+        op: "add",
+        path: "/rounds/0/matches/0/participations/1/scores/-",
+        value: score,
+      },
+      {
+        op: "replace",
+        path: "/rounds/0/matches/0/participations/1/is_win",
+        value: true,
+      },
+      {
+        op: "replace",
+        path: "/rounds/0/matches/0/status",
+        value: "completed",
+      },
+    ]);
+    const [player1, player2] =
+      patched.rounds[0].matches[0].participations;
+    expect(player2.scores).toStrictEqual([score]);
+    expect(player2.is_win).toBe(true);
+    expect(player1.is_win).toBe(false);
+    expect(patched.rounds[0].matches[0].status).toBe("completed");
+  });
+
+  it("adds a round", () => {
+    const patched = applyTournamentPatch(tournament, [
+      {
+        op: "add",
+        path: "/rounds/-",
+        value: { round_number: 2, status: "on_going", matches: [] },
+      },
+    ]);
+    expect(
+      patched.rounds.map((round) => round.round_number),
+    ).toStrictEqual([1, 2]);
+  });
+
+  it("does not modify the original state", () => {
+    applyTournamentPatch(tournament, [
+      { op: "replace", path: "/status", value: "completed" },
+    ]);
+    expect(tournament.status).toBe("on_going");
+    expect(
+      tournament.rounds[0].matches[0].participations[1].scores,
+    ).toStrictEqual([]);
+  });
+
+  it("rejects unsupported operations", () => {
+    expect(() =>
+      applyTournamentPatch(tournament, [
+        { op: "remove", path: "/status" },
+      ]),
+    ).toThrow();
+  });
+});
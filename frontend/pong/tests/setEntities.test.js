@@ -0,0 +1,58 @@
+import { describe, expect, it } from "vitest";
+import { setEntities } from "../js/utils/match/entity/setEntities";
+
+const createEntities = () => {
+  const position = () => ({
+    pos: null,
+    updateUpperLeft(pos) {
+      this.pos = pos;
+    },
+  });
+  const score = () => ({
+    score: 0,
+    updateScore(value) {
+      this.score = value;
+    },
+  });
+  return {
+    paddle1: position(),
+    paddle2: position(),
+    ball: position(),
+    score1: score(),
+    score2: score(),
+  };
+};
+
+const frame = (seq, ballX) => ({
+  seq,
+  keyframe: true,
+  paddle1: { x: 0, y: 0 },
+  paddle2: { x: 0, y: 0 },
+  ball: { x: ballX, y: 0 },
+  ball_speed: { x: 1, y: 0 },
+  score1: 0,
+  score2: 0,
+});
+
+describe("PLAY frames are applied in sequence order", () => {
+  it("drops a frame older than the last applied one", () => {
+    const entities = createEntities();
+    setEntities.initStage(entities, {});
+
+    setEntities.playStage(entities, frame(0, 10));
+    setEntities.playStage(entities, frame(2, 30));
+    setEntities.playStage(entities, frame(1, 20));
+
+    expect(entities.ball.pos).toStrictEqual({ x: 30, y: 0 });
+    expect(entities.lastSeq).toBe(2);
+  });
+
+  it("applies frames without seq", () => {
+    const entities = createEntities();
+    setEntities.initStage(entities, {});
+
+    setEntities.playStage(entities, { ...frame(0, 10), seq: undefined });
+
+    expect(entities.ball.pos).toStrictEqual({ x: 10, y: 0 });
+  });
+});
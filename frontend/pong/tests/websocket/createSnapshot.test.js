@@ -0,0 +1,14 @@
+import { describe, expect, it } from "vitest";
+import { createSnapshot } from "../../js/websocket/payload/tournament/createSnapshot";
+
+describe("(positive cases) Category: TOURNAMENT, type: SNAPSHOT", () => {
+  it("simple case", () => {
+    const payload = createSnapshot({ tournamentId: 42 });
+    expect(payload).toStrictEqual({
+      type: "SNAPSHOT",
+      data: {
+        tournament_id: 42,
+      },
+    });
+  });
+});
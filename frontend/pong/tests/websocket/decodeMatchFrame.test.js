@@ -0,0 +1,47 @@
+import { describe, expect, it } from "vitest";
+import { decodeMatchFrame } from "../../js/websocket/decodeMatchFrame";
+
+const createFrame = (type) => {
+  const buffer = new ArrayBuffer(27);
+  const view = new DataView(buffer);
+  view.setUint8(0, type);
+  view.setUint32(1, 123456, true);
+  view.setUint32(5, 246912, true);
+  view.setInt16(9, 6, true);
+  view.setInt16(11, 0, true);
+  view.setInt16(13, 584, true);
+  view.setInt16(15, 340, true);
+  view.setInt16(17, -10, true);
+  view.setInt16(19, 195, true);
+  view.setInt16(21, -2, true);
+  view.setInt16(23, 3, true);
+  view.setUint8(25, 3);
+  view.setUint8(26, 4);
+  return buffer;
+};
+
+describe("Category: MATCH, binary PLAY frame", () => {
+  it("(positive case) PLAY frame", () => {
+    expect(decodeMatchFrame(createFrame(1))).toStrictEqual({
+      category: "MATCH",
+      payload: {
+        stage: "PLAY",
+        data: {
+          seq: 123456,
+          keyframe: true,
+          tick: 246912,
+          paddle1: { x: 6, y: 0 },
+          paddle2: { x: 584, y: 340 },
+          ball: { x: -10, y: 195 },
+          ball_speed: { x: -2, y: 3 },
+          score1: 3,
+          score2: 4,
+        },
+      },
+    });
+  });
+
+  it("(negative case) unknown frame type", () => {
+    expect(() => decodeMatchFrame(createFrame(2))).toThrow();
+  });
+});